@@ -0,0 +1,19 @@
+"""This module contains the configuration of the dm_backend application."""
+
+from django.apps import AppConfig
+
+
+class DmBackendConfig(AppConfig):
+    """The configuration of the dm_backend application, connecting the signal receivers of its services."""
+
+    name = "dm_backend"
+
+    def ready(self) -> None:
+        """
+        Import the services whose signal receivers must be connected before any request is served.
+
+        The graph cache is invalidated when the models are written, and the SQL queries of the requests are measured
+        and recorded for the query budgets on every new database connection, including the connections opened before
+        the first view is imported.
+        """
+        from .src.services import graph_cache, metrics, query_budget  # noqa: F401
@@ -13,4 +13,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dm_backend.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Stream the live updates of the graphs from the event loop, and serve the other requests with Django
+from dm_backend.src.views.graph_events import GraphEventsASGIApplication  # noqa: E402
+
+application = GraphEventsASGIApplication(django_application)
+
+# Pre-warm the sampler and the parser before serving the first request, in the master process with --preload
+from dm_backend.src.services.startup import warm_up_server  # noqa: E402
+
+warm_up_server()
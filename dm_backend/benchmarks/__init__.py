@@ -0,0 +1 @@
+"""This is the benchmarks module of the dm_backend package."""
@@ -0,0 +1,67 @@
+"""
+This module contains the expressions parsed by the benchmarks.
+
+The corpus of the API benchmarks is made of the kinds of expressions written in the editor, in the order they are
+usually written: a constant, a function using it, a plot of the function, and a plot of a LaTeX expression. The same
+size always gives the same expressions, so that the results of different commits are comparable.
+
+The corpus of the parser benchmarks groups the expressions by type, each with the definitions it depends on, so that
+the parse cost of every type of expression can be followed over time.
+"""
+
+from typing import Dict, List, Tuple
+
+CorpusGroup = Tuple[List[str], List[str]]
+
+EXPRESSION_TYPES: Dict[str, CorpusGroup] = {
+    "variables": ([], ["a = 2", "b = a + 3", "c = a b - \\frac{b}{2}"]),
+    "function_definitions": (
+        [],
+        [
+            "f(x) = x^{2} + 1",
+            "g(x, y) = \\sin(x) \\cdot \\cos(y)",
+            "h(t) = e^{-t} \\sqrt{t}",
+        ],
+    ),
+    "function_calls": (
+        ["a = 3", "f(x) = x^{2} + 1", "g(x, y) = x y"],
+        ["y = f(x) + 1", "y = f(a)", "y = g(x, a)"],
+    ),
+    "nested_calls": (
+        ["f(x) = x^{2} + 1", "g(x) = 2 f(x)", "h(x) = g(f(x))"],
+        ["y = h(g(x))", "y = f(g(h(x)))"],
+    ),
+    "latex": (
+        [],
+        [
+            "y = \\frac{x}{2} + \\sqrt{x}",
+            "y = \\sin(x)^{2} + \\cos(x)^{2}",
+            "y = \\log(x) + e^{x}",
+            "y = |x| - \\frac{1}{x + 1}",
+        ],
+    ),
+}
+
+
+def expression_corpus(size: int) -> List[str]:
+    """
+    Return a number of expressions, each one depending on the ones before it.
+
+    Args:
+        size (int): The number of expressions.
+
+    Returns:
+        List[str]: The expressions.
+    """
+    expressions = []
+    for index in range(size):
+        kind = index % 4
+        if kind == 0:
+            expressions.append(f"a{index} = {index % 9 + 1}")
+        elif kind == 1:
+            expressions.append(f"f{index}(x) = x^{{2}} + a{index - 1}")
+        elif kind == 2:
+            expressions.append(f"y = f{index - 1}(x) \\cdot \\sin(x)")
+        else:
+            expressions.append(f"\\frac{{x}}{{{index % 9 + 2}}} + \\sqrt{{x}}")
+    return expressions
@@ -0,0 +1,252 @@
+"""
+This module contains the benchmarks of the hot paths of the API.
+
+The benchmarks seed graphs and equations with the model_bakery recipes of the tests, then send requests through the
+whole Django stack with the test client, without a network, so that the results measure the work of the server:
+
+- seed: Creates a number of graphs, each with a number of equations taken from the expression corpus.
+- run_case: Sends a request a number of times, after a warm-up, and returns the throughput and the latencies.
+- run_benchmarks: Runs the list and detail of the graphs, the list and creation of the equations, and the parsing of
+  expression lists of several sizes, and returns the results along with the environment they were measured in.
+
+The parse cache and the prefix store are cleared before every parse request, so that the expressions are parsed
+again, while the graph cache is left as it is in production.
+"""
+
+import itertools
+import math
+import platform
+import random
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import django
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client
+
+from ..src.models.graph import Graph
+from ..src.services.parse_cache import get_parse_cache
+from ..src.services.session_prefix_store import get_prefix_store
+from ..tests.baker_recipes.equation_baker_recipe import equation_recipe
+from ..tests.baker_recipes.graph_baker_recipe import graph_recipe
+from .corpus import expression_corpus
+
+CASES = (
+    "graph_list",
+    "graph_detail",
+    "equation_list",
+    "equation_create",
+    "parse_expressions",
+)
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """
+    Return a percentile of values, with the nearest-rank method.
+
+    Args:
+        values (Sequence[float]): The values.
+        percent (float): The percentile, between 0 and 100.
+
+    Returns:
+        float: The smallest value greater than or equal to the given percent of the values.
+    """
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize_durations(durations: Sequence[float]) -> Dict[str, float]:
+    """
+    Summarize the durations of a benchmark.
+
+    Args:
+        durations (Sequence[float]): The durations, in seconds.
+
+    Returns:
+        Dict[str, float]: The mean, median, 99th percentile and maximal durations in milliseconds.
+    """
+    return {
+        "mean_ms": round(sum(durations) / len(durations) * 1000, 3),
+        "p50_ms": round(percentile(durations, 50) * 1000, 3),
+        "p99_ms": round(percentile(durations, 99) * 1000, 3),
+        "max_ms": round(max(durations) * 1000, 3),
+    }
+
+
+def seed(graphs: int, equations: int) -> List[Graph]:
+    """
+    Create graphs, each with its equations.
+
+    Args:
+        graphs (int): The number of graphs.
+        equations (int): The number of equations of every graph.
+
+    Returns:
+        List[Graph]: The graphs created.
+    """
+    created = graph_recipe.make(_quantity=graphs, _bulk_create=True)
+    corpus = expression_corpus(equations)
+    for graph in created:
+        equation_recipe.make(
+            graph=graph,
+            equation=itertools.cycle(corpus),
+            parsed_equation=itertools.cycle(corpus),
+            color=0,
+            line_width=1,
+            _quantity=equations,
+            _bulk_create=True,
+        )
+    return created
+
+
+def run_case(
+    name: str,
+    request: Callable[[], HttpResponse],
+    requests: int,
+    warmup: int,
+    setup: Optional[Callable[[], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Send a request a number of times, and measure the time taken to answer it.
+
+    Args:
+        name (str): The name of the case.
+        request (Callable[[], HttpResponse]): The function sending the request.
+        requests (int): The number of requests measured.
+        warmup (int): The number of requests sent before the measured ones.
+        setup (Optional[Callable[[], None]]): A function called before every request, which is not measured.
+
+    Returns:
+        Dict[str, Any]: The number of requests answered per second, the mean, median, 99th percentile and maximal
+            latencies in milliseconds, and the number of responses of every status.
+    """
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        request()
+    durations = []
+    statuses = Counter()
+    for _ in range(requests):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        response = request()
+        durations.append(time.perf_counter() - start)
+        statuses[str(response.status_code)] += 1
+    return {
+        "name": name,
+        "requests": requests,
+        "throughput": round(requests / sum(durations), 2),
+        **summarize_durations(durations),
+        "status_codes": dict(statuses),
+    }
+
+
+def clear_parse_caches() -> None:
+    """Clear the parse cache and the prefix store, so that the expressions are parsed again."""
+    get_parse_cache().clear()
+    get_prefix_store().clear()
+
+
+def current_commit() -> Optional[str]:
+    """
+    Return the commit of the working tree.
+
+    Returns:
+        Optional[str]: The hash of the commit, or None outside of a git repository.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    graphs: int = 100,
+    equations: int = 10,
+    requests: int = 200,
+    warmup: int = 10,
+    parse_sizes: Sequence[int] = (1, 10, 50),
+    cases: Sequence[str] = CASES,
+    seed_value: int = 0,
+) -> Dict[str, Any]:
+    """
+    Seed the database and run the benchmarks of the API.
+
+    Args:
+        graphs (int): The number of graphs seeded.
+        equations (int): The number of equations of every graph seeded.
+        requests (int): The number of requests measured by every case.
+        warmup (int): The number of requests sent before the measured ones by every case.
+        parse_sizes (Sequence[int]): The numbers of expressions parsed by a request of the parse_expressions cases.
+        cases (Sequence[str]): The cases run, among the CASES.
+        seed_value (int): The seed of the random values of the seeded objects.
+
+    Returns:
+        Dict[str, Any]: The environment of the benchmarks, and the results of every case.
+    """
+    random.seed(seed_value)
+    seeded = seed(graphs, equations)
+    graph_ids = itertools.cycle([graph.id for graph in seeded])
+    client = Client()
+    requests_of_cases = {
+        "graph_list": lambda: client.get("/api/viewset/graphs/"),
+        "graph_detail": lambda: client.get(
+            f"/api/viewset/graphs/{next(graph_ids)}/", {"nested": "true"}
+        ),
+        "equation_list": lambda: client.get(
+            "/api/viewset/equations/", {"graph": next(graph_ids)}
+        ),
+        "equation_create": lambda: client.post(
+            "/api/viewset/equations/",
+            {
+                "equation": "y = x^{2}",
+                "color": 0,
+                "line_width": 1,
+                "graph": next(graph_ids),
+            },
+            content_type="application/json",
+        ),
+    }
+    results = []
+    for name in cases:
+        if name != "parse_expressions":
+            results.append(run_case(name, requests_of_cases[name], requests, warmup))
+            continue
+        for size in parse_sizes:
+            payload = {"expressions": expression_corpus(size)}
+            results.append(
+                run_case(
+                    f"parse_expressions[{size}]",
+                    lambda: client.post(
+                        "/api/viewset/equations/parser/parse_expressions/",
+                        payload,
+                        content_type="application/json",
+                    ),
+                    requests,
+                    warmup,
+                    setup=clear_parse_caches,
+                )
+            )
+    return {
+        "commit": current_commit(),
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "scale": {
+            "graphs": graphs,
+            "equations": equations,
+            "requests": requests,
+            "warmup": warmup,
+            "seed": seed_value,
+        },
+        "results": results,
+    }
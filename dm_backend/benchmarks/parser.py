@@ -0,0 +1,95 @@
+"""
+This module contains the benchmarks of the equation parser.
+
+The expressions of every type of the corpus are parsed in the calling process, without the parser pool, the parse
+cache or the prefix store, each time in a new graph session after the definitions they depend on. The latencies of the
+expressions are measured without the profiler, then the expressions are parsed once more under cProfile to break the
+time down into the stages of the graph session.
+"""
+
+import cProfile
+import platform
+import pstats
+import time
+from datetime import datetime, timezone
+from importlib.metadata import version
+from typing import Any, Dict, List, Sequence
+
+from sympy.parsing.latex import parse_latex
+
+from ..src.services.expression_parser import new_graph_session, parse_expression
+from ..src.services.parser_profiler import summarize_profile
+from .corpus import EXPRESSION_TYPES, CorpusGroup
+from .harness import current_commit, summarize_durations
+
+
+def parse_group(group: CorpusGroup) -> List[float]:
+    """
+    Parse the expressions of a group of the corpus in a new graph session, after their definitions.
+
+    Args:
+        group (CorpusGroup): The definitions the expressions depend on, and the expressions.
+
+    Returns:
+        List[float]: The number of seconds taken by each expression.
+    """
+    definitions, expressions = group
+    graph_session = new_graph_session()
+    for definition in definitions:
+        parse_expression(graph_session, definition)
+    durations = []
+    for expression in expressions:
+        start = time.perf_counter()
+        parse_expression(graph_session, expression)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def run_parser_benchmarks(
+    repeat: int = 20,
+    types: Sequence[str] = tuple(EXPRESSION_TYPES),
+    functions: int = 10,
+) -> Dict[str, Any]:
+    """
+    Measure the parse time of every type of expression of the corpus.
+
+    Args:
+        repeat (int): The number of times the expressions of every type are parsed.
+        types (Sequence[str]): The types of expressions measured, among the EXPRESSION_TYPES.
+        functions (int): The number of functions listed in the profile of every type.
+
+    Returns:
+        Dict[str, Any]: The environment of the benchmarks, and for every type the latencies of its expressions, the
+            cumulative time of the stages of the graph session and the functions with the greatest cumulative time.
+    """
+    parse_latex("x")
+    results = []
+    for name in types:
+        group = EXPRESSION_TYPES[name]
+        durations = []
+        for _ in range(repeat):
+            durations.extend(parse_group(group))
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            parse_group(group)
+        finally:
+            profiler.disable()
+        results.append(
+            {
+                "type": name,
+                "expressions": len(group[1]),
+                "samples": len(durations),
+                **summarize_durations(durations),
+                **summarize_profile(pstats.Stats(profiler), functions),
+            }
+        )
+    return {
+        "commit": current_commit(),
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "sympy": version("sympy"),
+        "latexvm": version("latexvm"),
+        "repeat": repeat,
+        "results": results,
+    }
@@ -0,0 +1 @@
+"""This is the management module of the dm_backend package."""
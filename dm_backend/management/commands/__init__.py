@@ -0,0 +1 @@
+"""This is the management commands module of the dm_backend package."""
@@ -0,0 +1,114 @@
+"""
+This module contains the benchmark command, measuring the hot paths of the API.
+
+The command creates a database of its own, as the tests do, with the engine of the DATABASES setting: an in-memory
+SQLite database when POSTGRES_ENGINE is django.db.backends.sqlite3, or a test_ database on the PostgreSQL server
+otherwise. It seeds the database, runs the benchmarks and writes their results as JSON, to be compared across commits.
+"""
+
+import json
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from ...benchmarks.harness import CASES, run_benchmarks
+
+
+class Command(BaseCommand):
+    """Seed a database of its own and measure the throughput and latencies of the hot paths of the API."""
+
+    help = "Measure the throughput and the latencies of the hot paths of the API, and write them as JSON."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Add the scale of the benchmarks to the arguments of the command.
+
+        Args:
+            parser (CommandParser): The parser of the arguments.
+        """
+        parser.add_argument(
+            "--graphs", type=int, default=100, help="The number of graphs seeded."
+        )
+        parser.add_argument(
+            "--equations",
+            type=int,
+            default=10,
+            help="The number of equations of every graph.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="The number of requests measured by every case.",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=10,
+            help="The number of requests sent before the measure.",
+        )
+        parser.add_argument(
+            "--parse-sizes",
+            type=lambda value: [int(size) for size in value.split(",")],
+            default=[1, 10, 50],
+            help="The comma-separated numbers of expressions parsed by a request.",
+        )
+        parser.add_argument(
+            "--cases",
+            nargs="+",
+            choices=CASES,
+            default=list(CASES),
+            help="The cases run.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="The seed of the random values of the seeded objects.",
+        )
+        parser.add_argument(
+            "--output",
+            help="The file the results are written to, instead of the standard output.",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the database of the benchmarks, as the tests do.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """
+        Run the benchmarks in a database of their own, and write their results.
+
+        Args:
+            *args (Any): The positional arguments of the command.
+            **options (Any): The options of the command.
+        """
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"]
+        )
+        try:
+            results = run_benchmarks(
+                graphs=options["graphs"],
+                equations=options["equations"],
+                requests=options["requests"],
+                warmup=options["warmup"],
+                parse_sizes=options["parse_sizes"],
+                cases=options["cases"],
+                seed_value=options["seed"],
+            )
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+        content = json.dumps(results, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(content + "\n")
+        else:
+            self.stdout.write(content)
@@ -0,0 +1,71 @@
+"""
+This module contains the benchmark_parser command, measuring the parse cost of every type of expression.
+
+The command parses the expression corpus of the parser benchmarks in the calling process, without any database, and
+writes the latencies and the profile of every type of expression as JSON, to be compared across commits.
+"""
+
+import json
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from ...benchmarks.corpus import EXPRESSION_TYPES
+from ...benchmarks.parser import run_parser_benchmarks
+
+
+class Command(BaseCommand):
+    """Measure the parse time of every type of expression of the corpus, broken down into the graph session stages."""
+
+    help = "Measure the parse time of every type of expression, and write it as JSON along with its profile."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Add the options of the benchmarks to the arguments of the command.
+
+        Args:
+            parser (CommandParser): The parser of the arguments.
+        """
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="The number of times the expressions of every type are parsed.",
+        )
+        parser.add_argument(
+            "--types",
+            nargs="+",
+            choices=list(EXPRESSION_TYPES),
+            default=list(EXPRESSION_TYPES),
+            help="The types of expressions measured.",
+        )
+        parser.add_argument(
+            "--functions",
+            type=int,
+            default=10,
+            help="The number of functions listed in the profile of every type.",
+        )
+        parser.add_argument(
+            "--output",
+            help="The file the results are written to, instead of the standard output.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """
+        Run the parser benchmarks, and write their results.
+
+        Args:
+            *args (Any): The positional arguments of the command.
+            **options (Any): The options of the command.
+        """
+        results = run_parser_benchmarks(
+            repeat=options["repeat"],
+            types=options["types"],
+            functions=options["functions"],
+        )
+        content = json.dumps(results, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(content + "\n")
+        else:
+            self.stdout.write(content)
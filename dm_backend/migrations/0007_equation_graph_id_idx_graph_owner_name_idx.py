@@ -0,0 +1,21 @@
+# Generated by Django 4.1.7 on 2023-04-20 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dm_backend", "0006_alter_graph_options_remove_graph_unique_graph_name"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="equation",
+            index=models.Index(fields=["graph", "id"], name="equation_graph_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="graph",
+            index=models.Index(fields=["owner", "name"], name="graph_owner_name_idx"),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.7 on 2023-04-21 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dm_backend", "0007_equation_graph_id_idx_graph_owner_name_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="graph",
+            index=models.Index(fields=["name", "id"], name="graph_name_id_idx"),
+        ),
+    ]
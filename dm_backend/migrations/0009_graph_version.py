@@ -0,0 +1,18 @@
+# Generated by Django 4.1.7 on 2023-04-22 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dm_backend", "0008_graph_name_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="graph",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
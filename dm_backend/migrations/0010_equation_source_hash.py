@@ -0,0 +1,18 @@
+# Generated by Django 4.1.7 on 2023-04-24 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dm_backend", "0009_graph_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="equation",
+            name="source_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
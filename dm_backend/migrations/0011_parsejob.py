@@ -0,0 +1,57 @@
+# Generated by Django 4.1.7 on 2023-04-25 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dm_backend", "0010_equation_source_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ParseJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=64)),
+                ("expressions", models.JSONField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "PENDING"),
+                            ("running", "RUNNING"),
+                            ("succeeded", "SUCCEEDED"),
+                            ("failed", "FAILED"),
+                        ],
+                        default="pending",
+                        max_length=9,
+                    ),
+                ),
+                ("status_code", models.IntegerField(null=True)),
+                ("result", models.JSONField(null=True)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("started", models.DateTimeField(null=True)),
+                ("finished", models.DateTimeField(null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="parsejob",
+            index=models.Index(fields=["status", "id"], name="parse_job_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="parsejob",
+            index=models.Index(
+                fields=["key", "status"], name="parse_job_key_status_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.7 on 2023-04-27 10:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dm_backend", "0011_parsejob"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="equation",
+            name="parsed_equation",
+            field=models.CharField(max_length=1000),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.1.7 on 2023-04-27 14:32
+
+from django.db import migrations
+
+# The sequence of the ids of the events published by the PostgresGraphEventBroker
+EVENT_ID_SEQUENCE = "dm_backend_graph_event_id"
+
+
+def create_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"CREATE SEQUENCE IF NOT EXISTS {EVENT_ID_SEQUENCE}")
+
+
+def drop_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP SEQUENCE IF EXISTS {EVENT_ID_SEQUENCE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dm_backend", "0012_alter_equation_parsed_equation"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_sequence, drop_sequence),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.7 on 2023-04-28 09:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dm_backend", "0013_graph_event_id_sequence"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="parsejob",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status__in", ["pending", "running"])),
+                fields=("key",),
+                name="unique_active_parse_job",
+            ),
+        ),
+    ]
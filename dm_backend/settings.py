@@ -53,6 +53,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "dm_backend.src.services.metrics.metrics_middleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -101,6 +102,133 @@ DATABASES = {
 }
 
 
+# Equation parser result cache
+
+PARSE_CACHE = {
+    "BACKEND": os.getenv(
+        "PARSE_CACHE_BACKEND",
+        "dm_backend.src.services.parse_cache.LocMemParseCacheBackend",
+    ),
+    "OPTIONS": {
+        "max_entries": int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "1024")),
+        "timeout": int(os.getenv("PARSE_CACHE_TIMEOUT", "300")),
+    },
+}
+
+PARSE_PREFIX_STORE_MAX_ENTRIES = int(
+    os.getenv("PARSE_PREFIX_STORE_MAX_ENTRIES", "4096")
+)
+
+# Equation parser process pool, timeouts are in seconds and the worker memory limit is in KiB
+
+PARSER_POOL = {
+    "workers": int(os.getenv("PARSER_POOL_WORKERS", "2")),
+    "max_pending": int(os.getenv("PARSER_POOL_MAX_PENDING", "8")),
+    "max_tasks_per_worker": int(os.getenv("PARSER_POOL_MAX_TASKS_PER_WORKER", "500")),
+    "max_worker_memory": int(os.getenv("PARSER_POOL_MAX_WORKER_MEMORY", "524288")),
+    "expression_timeout": float(os.getenv("PARSER_EXPRESSION_TIMEOUT", "5")),
+    "request_timeout": float(os.getenv("PARSER_REQUEST_TIMEOUT", "15")),
+}
+
+# Warm-up of the parser when the server starts, so that the first parse request of a server worker is not slowed down by
+# the lazy imports of the sympy LaTeX parser
+PARSER_WARM_UP = os.getenv("PARSER_WARM_UP", "true").lower() == "true"
+
+# Profiling of the parse_expressions requests with cProfile, of every request when enabled, or of the requests setting
+# the X-Parser-Profile header when it is allowed. The profiles are returned in the responses with the given number of
+# functions, and saved in the directory when one is given
+PARSER_PROFILING = {
+    "ENABLED": os.getenv("PARSER_PROFILING_ENABLED", "false").lower() == "true",
+    "ALLOW_HEADER": os.getenv("PARSER_PROFILING_ALLOW_HEADER", "false").lower()
+    == "true",
+    "FUNCTIONS": int(os.getenv("PARSER_PROFILING_FUNCTIONS", "25")),
+    "DIRECTORY": os.getenv("PARSER_PROFILING_DIRECTORY") or None,
+}
+
+# Background parse jobs, the intervals and timeouts are in seconds
+PARSE_JOBS = {
+    "workers": int(os.getenv("PARSE_JOBS_WORKERS", "2")),
+    "poll_interval": float(os.getenv("PARSE_JOBS_POLL_INTERVAL", "0.5")),
+    "max_wait": float(os.getenv("PARSE_JOBS_MAX_WAIT", "30")),
+    "stale_after": float(os.getenv("PARSE_JOBS_STALE_AFTER", "60")),
+    "retention": float(os.getenv("PARSE_JOBS_RETENTION", "86400")),
+    "sweep_interval": float(os.getenv("PARSE_JOBS_SWEEP_INTERVAL", "60")),
+}
+
+# Live graph updates pushed over server-sent events, the keepalive interval is in seconds. The events are shared by the
+# server processes with LISTEN and NOTIFY on PostgreSQL, while the in-memory broker only fans them out to the
+# subscribers of the process that published them.
+GRAPH_EVENTS = {
+    "BACKEND": os.getenv(
+        "GRAPH_EVENTS_BACKEND",
+        "dm_backend.src.services.graph_events.PostgresGraphEventBroker"
+        if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql"
+        else "dm_backend.src.services.graph_events.InMemoryGraphEventBroker",
+    ),
+    "OPTIONS": {
+        "history": int(os.getenv("GRAPH_EVENTS_HISTORY", "100")),
+        "max_graphs": int(os.getenv("GRAPH_EVENTS_MAX_GRAPHS", "1024")),
+        "max_pending": int(os.getenv("GRAPH_EVENTS_MAX_PENDING", "100")),
+    },
+    "KEEPALIVE": float(os.getenv("GRAPH_EVENTS_KEEPALIVE", "15")),
+}
+
+# Encoder of the JSON responses, "orjson" when it is installed, or "json" for the json module of the standard library
+API_JSON_ENCODER = os.getenv("API_JSON_ENCODER", "orjson")
+
+# Caches of the Django cache framework, the graph cache is process-local by default and can be shared by the server
+# processes by setting GRAPH_CACHE_BACKEND to a shared backend, such as django.core.cache.backends.redis.RedisCache
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "graphs": {
+        "BACKEND": os.getenv(
+            "GRAPH_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("GRAPH_CACHE_LOCATION", "graphs"),
+        "TIMEOUT": int(os.getenv("GRAPH_CACHE_TIMEOUT", "300")),
+    },
+}
+
+# Response cache of the graph details and of the equation lists of a graph, invalidated when a graph is written
+GRAPH_CACHE = {
+    "ENABLED": os.getenv("GRAPH_CACHE_ENABLED", "true").lower() == "true",
+    "OPTIONS": {
+        "cache_alias": "graphs",
+    },
+}
+
+# Compiled equation cache of the equation sampler, pre-warmed at startup with the given number of stored equations
+COMPILED_EQUATION_CACHE = {
+    "max_entries": int(os.getenv("COMPILED_EQUATION_CACHE_MAX_ENTRIES", "1024")),
+    "prewarm": int(os.getenv("COMPILED_EQUATION_CACHE_PREWARM", "0")),
+}
+
+# Query budgets of the viewset actions, checked in development and in the tests. The requests over the budget of their
+# action are logged, or fail when QUERY_BUDGET_RAISE is set, along with the SQL made at least REPEATED_QUERIES times
+QUERY_BUDGET = {
+    "ENABLED": os.getenv("QUERY_BUDGET_ENABLED", "false").lower() == "true",
+    "RAISE": os.getenv("QUERY_BUDGET_RAISE", "false").lower() == "true",
+    "REPEATED_QUERIES": int(os.getenv("QUERY_BUDGET_REPEATED_QUERIES", "3")),
+}
+
+# Prometheus metrics. The server processes share their metrics through the snapshots written to DIRECTORY at most once
+# every WRITE_INTERVAL seconds, and /metrics is only served to the ALLOWED_NETWORKS or to the bearers of the TOKEN
+METRICS = {
+    "DIRECTORY": os.getenv("METRICS_DIRECTORY") or None,
+    "WRITE_INTERVAL": float(os.getenv("METRICS_WRITE_INTERVAL", "1")),
+    "ALLOWED_NETWORKS": [
+        network.strip()
+        for network in os.getenv(
+            "METRICS_ALLOWED_NETWORKS", "127.0.0.1/32,::1/128"
+        ).split(",")
+        if network.strip()
+    ],
+    "TOKEN": os.getenv("METRICS_TOKEN") or None,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
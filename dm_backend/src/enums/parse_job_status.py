@@ -0,0 +1,29 @@
+"""Parse job status enum module."""
+from enum import Enum
+from typing import List, Tuple
+
+
+class ParseJobStatus(Enum):
+    """
+    Status of a background parse job.
+
+    Represented by string of the stage the job is at
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    @classmethod
+    def choices(cls: Enum) -> List[Tuple[str, str]]:
+        """
+        Return choices for enum.
+
+        Keywork arguments:
+        cls -- Enum class
+
+        Returns:
+        List of tuples of enum values and names
+        """
+        return [(key.value, key.name) for key in cls]
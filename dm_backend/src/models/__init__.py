@@ -1,5 +1,6 @@
 """This is the models module of the dm_backend package."""
 from dm_backend.src.models.equation import Equation
 from dm_backend.src.models.graph import Graph
+from dm_backend.src.models.parse_job import ParseJob
 
-__all__ = ["Equation", "Graph"]
+__all__ = ["Equation", "Graph", "ParseJob"]
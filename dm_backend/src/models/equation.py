@@ -15,13 +15,26 @@ class Equation(models.Model):
         line_style (str): The line style of the equation.
         graph (Graph): The graph that the equation belongs to.
         line_width (int): The line width of the equation.
+        source_hash (str): The hash of the equation and of the equations before it in the graph, as of the last parse.
     """
 
     equation = models.CharField(max_length=100)
-    parsed_equation = models.CharField(max_length=100)
+    parsed_equation = models.CharField(max_length=1000)
     color = models.IntegerField()
     line_style = models.CharField(
         max_length=8, choices=LineStyle.choices(), default=LineStyle.SOLID.value
     )
     graph = models.ForeignKey("Graph", on_delete=models.CASCADE)
     line_width = models.IntegerField()
+    source_hash = models.CharField(max_length=64, blank=True, default="")
+
+    class Meta:
+        """
+        Meta class for Equation model.
+
+        Attributes:
+            indexes (list): The indexes of the equation
+                -> the equations of a graph are listed in the order they were created.
+        """
+
+        indexes = [models.Index(fields=["graph", "id"], name="equation_graph_id_idx")]
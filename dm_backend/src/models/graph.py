@@ -1,6 +1,21 @@
 """Graph model module."""
 
 from django.db import models
+from django.db.models import F
+from django.utils import timezone
+
+
+class GraphQuerySet(models.QuerySet):
+    """Graph queryset."""
+
+    def touch(self) -> int:
+        """
+        Bump the version and the updated time of the graphs, after their equations were written.
+
+        Returns:
+            int: The number of graphs touched.
+        """
+        return self.update(version=F("version") + 1, updated=timezone.now())
 
 
 class Graph(models.Model):
@@ -12,6 +27,8 @@ class Graph(models.Model):
         owner (str): The firebase uid of the owner of the graph.
         created (datetime): The date and time the graph was created.
         updated (datetime): The date and time the graph was last updated.
+        version (int): The number of times the equations of the graph were written, used to reject stale saves and
+            to answer conditional requests.
     """
 
     name = models.CharField(max_length=100)
@@ -19,6 +36,9 @@ class Graph(models.Model):
     preview = models.CharField(max_length=255, null=True)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=0)
+
+    objects = GraphQuerySet.as_manager()
 
     class Meta:
         """
@@ -28,9 +48,15 @@ class Graph(models.Model):
             ordering (list): The ordering of the graph.
             constraints (list): The constraints of the graph
                 -> one owner should not have multiple graphs under the same name.
+            indexes (list): The indexes of the graph
+                -> the graphs, and the graphs of an owner, are listed by name.
         """
 
         ordering = ["name"]
         constraints = [
             models.UniqueConstraint(fields=["name", "owner"], name="unique_graph_name")
         ]
+        indexes = [
+            models.Index(fields=["owner", "name"], name="graph_owner_name_idx"),
+            models.Index(fields=["name", "id"], name="graph_name_id_idx"),
+        ]
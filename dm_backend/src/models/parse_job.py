@@ -0,0 +1,62 @@
+"""Parse job model module."""
+
+from django.db import models
+
+from dm_backend.src.enums.parse_job_status import ParseJobStatus
+
+
+class ParseJob(models.Model):
+    """Parse job model.
+
+    Attributes:
+        key (str): The parse cache key of the expressions, used to deduplicate the jobs.
+        expressions (list): The expressions to be parsed, in the order they were defined.
+        status (str): The stage the job is at.
+        status_code (int): The HTTP status of the result, once the job is finished.
+        result (dict): The parsed expressions, or the error detail, once the job is finished.
+        created (datetime): The date and time the job was submitted.
+        started (datetime): The date and time a worker started the job.
+        finished (datetime): The date and time the job was finished.
+    """
+
+    key = models.CharField(max_length=64)
+    expressions = models.JSONField()
+    status = models.CharField(
+        max_length=9,
+        choices=ParseJobStatus.choices(),
+        default=ParseJobStatus.PENDING.value,
+    )
+    status_code = models.IntegerField(null=True)
+    result = models.JSONField(null=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True)
+    finished = models.DateTimeField(null=True)
+
+    class Meta:
+        """
+        Meta class for ParseJob model.
+
+        Attributes:
+            constraints (list): The constraints of the parse job
+                -> only one pending or running job parses the same expressions.
+            indexes (list): The indexes of the parse job
+                -> the jobs are claimed by status in the order they were submitted,
+                -> the pending and running jobs are looked up by key to be deduplicated.
+        """
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["key"],
+                condition=models.Q(
+                    status__in=[
+                        ParseJobStatus.PENDING.value,
+                        ParseJobStatus.RUNNING.value,
+                    ]
+                ),
+                name="unique_active_parse_job",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["status", "id"], name="parse_job_status_idx"),
+            models.Index(fields=["key", "status"], name="parse_job_key_status_idx"),
+        ]
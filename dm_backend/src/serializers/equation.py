@@ -8,12 +8,22 @@ The module exports a single class:
 
 - EquationSerializer: A serializer class for the Equation model.
 
+The parsed equation is computed by the server once equations are written and committed, the parsed equation sent by the
+client is only kept when the equation cannot be parsed. The graph of a written equation is touched, so that its version
+and updated time change, and the written equations are published to the subscribers of their graph once committed.
 This module is intended to be used as part of a Django REST API.
 """
 
+from typing import Dict
+
+from django.db import transaction
 from rest_framework import serializers
 
 from ..models.equation import Equation
+from ..models.graph import Graph
+from ..services.graph_cache import invalidate_graph_cache
+from ..services.graph_events import EQUATION_CREATED, EQUATION_DELETED, EQUATION_UPDATED, record_equation_changes
+from ..services.graph_parser import update_parsed_equations
 
 
 class EquationSerializer(serializers.ModelSerializer):
@@ -33,3 +43,73 @@ class EquationSerializer(serializers.ModelSerializer):
             "graph",
         ]
         read_only_fields = ["id"]
+        extra_kwargs = {"parsed_equation": {"required": False}}
+
+    def create(self, validated_data: Dict) -> Equation:
+        """
+        Create an equation, and parse the equations of its graph again.
+
+        Args:
+            validated_data (Dict): The validated fields of the equation.
+
+        Returns:
+            Equation: The created equation, along with its parsed equation.
+        """
+        with transaction.atomic():
+            equation = super().create(validated_data)
+            Graph.objects.filter(id=equation.graph_id).touch()
+            record_equation_changes(equation.graph_id, EQUATION_CREATED, [equation.id])
+        return self.with_parsed_equation(equation)
+
+    def update(self, instance: Equation, validated_data: Dict) -> Equation:
+        """
+        Update an equation, and parse the equations of its graph again.
+
+        An equation moved to another graph is published as deleted from its previous graph and created in the new one,
+        and the equations left in its previous graph, which may have used it, are parsed again as well.
+
+        Args:
+            instance (Equation): The equation to be updated.
+            validated_data (Dict): The validated fields of the equation.
+
+        Returns:
+            Equation: The updated equation, along with its parsed equation.
+        """
+        previous_graph_id = instance.graph_id
+        with transaction.atomic():
+            equation = super().update(instance, validated_data)
+            Graph.objects.filter(id__in=[previous_graph_id, equation.graph_id]).touch()
+            if equation.graph_id == previous_graph_id:
+                record_equation_changes(
+                    equation.graph_id, EQUATION_UPDATED, [equation.id]
+                )
+            else:
+                invalidate_graph_cache(previous_graph_id)
+                record_equation_changes(
+                    previous_graph_id, EQUATION_DELETED, [equation.id]
+                )
+                record_equation_changes(
+                    equation.graph_id, EQUATION_CREATED, [equation.id]
+                )
+        if equation.graph_id != previous_graph_id:
+            update_parsed_equations(Graph(id=previous_graph_id))
+        return self.with_parsed_equation(equation)
+
+    @staticmethod
+    def with_parsed_equation(equation: Equation) -> Equation:
+        """
+        Parse the equations of the graph of a written equation again, and copy the parsed equation onto it.
+
+        The equation must be committed, so that no lock is held while the equations are parsed.
+
+        Args:
+            equation (Equation): The written equation.
+
+        Returns:
+            Equation: The equation, along with its parsed equation.
+        """
+        for parsed in update_parsed_equations(equation.graph):
+            if parsed.id == equation.id:
+                equation.parsed_equation = parsed.parsed_equation
+                equation.source_hash = parsed.source_hash
+        return equation
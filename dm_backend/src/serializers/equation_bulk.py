@@ -0,0 +1,116 @@
+"""
+This module defines the serializer classes used to write many equations of a graph at once.
+
+The module exports the following classes:
+
+- BulkEquationSerializer: A serializer class for an equation of a graph, created without an id or updated with one.
+- EquationBulkSerializer: A serializer class for a list of equation upserts and deletions within one graph, applied
+  with bulk queries in a single transaction.
+
+The graph is given in the context of the serializers, so that it is not looked up again for every equation.
+This module is intended to be used as part of a Django REST API.
+"""
+
+from typing import Dict, List
+
+from django.db import transaction
+from rest_framework import serializers
+
+from ..models.equation import Equation
+from ..models.graph import Graph
+from ..services.graph_cache import invalidate_graph_cache
+from ..services.graph_events import EQUATION_CREATED, EQUATION_DELETED, EQUATION_UPDATED, record_equation_changes
+from ..services.graph_parser import update_parsed_equations
+from .equation import EquationSerializer
+
+
+class BulkEquationSerializer(EquationSerializer):
+    """A class used to represent a serializer for an equation upserted within a graph."""
+
+    id = serializers.IntegerField(required=False)
+
+    class Meta(EquationSerializer.Meta):
+        """A class used to set metadata options for the BulkEquationSerializer class."""
+
+        read_only_fields = ["graph"]
+
+
+class EquationBulkSerializer(serializers.Serializer):
+    """A class used to represent a serializer for the equation upserts and deletions of a graph."""
+
+    equations = BulkEquationSerializer(many=True, default=list)
+    deleted = serializers.ListField(child=serializers.IntegerField(), default=list)
+
+    def validate(self, data: Dict) -> Dict:
+        """
+        Check that the equations to be updated or deleted belong to the graph, and appear only once.
+
+        Args:
+            data (Dict): The equations to be upserted and the ids of the equations to be deleted.
+
+        Returns:
+            Dict: The validated data, along with the equations to be updated.
+
+        Raises:
+            ValidationError: If an id is repeated or does not belong to the graph.
+        """
+        ids = [equation["id"] for equation in data["equations"] if "id" in equation]
+        ids += data["deleted"]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError(
+                "Each equation can only be updated or deleted once."
+            )
+        instances = self.context["graph"].equation_set.in_bulk(ids)
+        unknown_ids = sorted(set(ids) - instances.keys())
+        if unknown_ids:
+            raise serializers.ValidationError(
+                f"Equation(s) not found in the graph: {unknown_ids}"
+            )
+        data["instances"] = instances
+        return data
+
+    def create(self, validated_data: Dict) -> List[Equation]:
+        """
+        Delete, update and create the equations of the graph, and bump its version, in a single transaction.
+
+        Once the write is committed, the changes are published to the subscribers of the graph, and the equations of
+        the graph are parsed again.
+
+        Args:
+            validated_data (Dict): The validated equation upserts and deletions.
+
+        Returns:
+            List[Equation]: The equations of the graph after the write, ordered by id.
+        """
+        graph = self.context["graph"]
+        instances = validated_data["instances"]
+        created, updated = [], []
+        for data in validated_data["equations"]:
+            if "id" in data:
+                equation = instances[data["id"]]
+                for field, value in data.items():
+                    setattr(equation, field, value)
+                updated.append(equation)
+            else:
+                created.append(Equation(graph=graph, **data))
+        fields = [
+            field
+            for field in BulkEquationSerializer.Meta.fields
+            if field not in ["id", "graph"]
+        ]
+        with transaction.atomic():
+            graph.equation_set.filter(id__in=validated_data["deleted"]).delete()
+            Equation.objects.bulk_update(updated, fields)
+            Equation.objects.bulk_create(created)
+            record_equation_changes(
+                graph.id, EQUATION_DELETED, validated_data["deleted"]
+            )
+            record_equation_changes(
+                graph.id, EQUATION_UPDATED, [equation.id for equation in updated]
+            )
+            record_equation_changes(
+                graph.id, EQUATION_CREATED, [equation.id for equation in created]
+            )
+            Graph.objects.filter(id=graph.id).touch()
+            invalidate_graph_cache(graph.id)
+        return update_parsed_equations(graph)
@@ -0,0 +1,71 @@
+"""
+This module defines a serializer class for the requests of the equation sampler.
+
+The EquationSampleSerializer class extends the Serializer class provided by the Django REST framework to validate the
+equations to be sampled, either all the equations of a graph or a single parsed equation, the viewport to sample them
+over, and whether the samples are evenly spaced or adaptive.
+
+The module exports a single class:
+
+- EquationSampleSerializer: A serializer class for the equation sampler requests.
+
+This module is intended to be used as part of a Django REST API.
+"""
+
+import math
+
+from rest_framework import serializers
+
+from ..enums.line_style_type import LineStyle
+from ..models.equation import Equation
+from ..models.graph import Graph
+
+
+class EquationSampleSerializer(serializers.Serializer):
+    """A class used to represent a serializer for the requests of the equation sampler."""
+
+    graph = serializers.PrimaryKeyRelatedField(
+        queryset=Graph.objects.all(), required=False
+    )
+    parsed_equation = serializers.CharField(
+        max_length=Equation._meta.get_field("parsed_equation").max_length,
+        required=False,
+    )
+    line_style = serializers.ChoiceField(
+        choices=LineStyle.choices(), default=LineStyle.SOLID.value
+    )
+    x_min = serializers.FloatField()
+    x_max = serializers.FloatField()
+    y_min = serializers.FloatField(required=False)
+    y_max = serializers.FloatField(required=False)
+    resolution = serializers.IntegerField(min_value=2, max_value=10000, default=500)
+    adaptive = serializers.BooleanField(default=False)
+    tolerance = serializers.FloatField(min_value=0, required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        """
+        Check that exactly one of graph and parsed_equation is given, and that the viewport is finite and not empty.
+
+        Args:
+            attrs (dict): The validated fields.
+
+        Returns:
+            dict: The validated fields.
+
+        Raises:
+            ValidationError: If the request is invalid.
+        """
+        if ("graph" in attrs) == ("parsed_equation" in attrs):
+            raise serializers.ValidationError(
+                "Exactly one of graph and parsed_equation must be given."
+            )
+        for field in ("x_min", "x_max", "y_min", "y_max", "tolerance"):
+            if field in attrs and not math.isfinite(attrs[field]):
+                raise serializers.ValidationError(
+                    {field: "A finite number is required."}
+                )
+        if attrs["x_min"] >= attrs["x_max"]:
+            raise serializers.ValidationError("x_min must be less than x_max.")
+        if "y_min" in attrs and "y_max" in attrs and attrs["y_min"] >= attrs["y_max"]:
+            raise serializers.ValidationError("y_min must be less than y_max.")
+        return attrs
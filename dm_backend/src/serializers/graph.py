@@ -4,15 +4,17 @@ This module defines a serializer class for the Graph model.
 The GraphSerializer class extends the ModelSerializer class provided by the Django REST framework to automatically
 generate serializers for the Graph model's fields.
 
-The module exports a single class:
+The module exports the following classes:
 
 GraphSerializer: A serializer class for the Graph model.
+GraphDetailSerializer: A read-only serializer class for the Graph model nesting the equations of the graph.
 This module is intended to be used as part of a Django REST API.
 """
 
 from rest_framework import serializers
 
 from ..models.graph import Graph
+from .equation import EquationSerializer
 
 
 class GraphSerializer(serializers.ModelSerializer):
@@ -29,5 +31,17 @@ class GraphSerializer(serializers.ModelSerializer):
             "owner",
             "created",
             "updated",
+            "version",
         ]
-        read_only_fields = ["id", "created", "updated"]
+        read_only_fields = ["id", "created", "updated", "version"]
+
+
+class GraphDetailSerializer(GraphSerializer):
+    """A class used to represent a serializer for a Graph along with its equations."""
+
+    equations = EquationSerializer(many=True, read_only=True, source="equation_set")
+
+    class Meta(GraphSerializer.Meta):
+        """A class used to set metadata options for the GraphDetailSerializer class."""
+
+        fields = GraphSerializer.Meta.fields + ["equations"]
@@ -0,0 +1,180 @@
+"""
+This module defines the serializer classes used to save the changes made to the equations of a graph.
+
+A graph is saved by sending the version of the graph the changes were made on, along with the equations added, the
+fields of the equations changed and the ids of the equations removed since then. Only that delta is written, and the
+version of the graph is bumped in the same transaction, so that a save made on an outdated version is rejected instead
+of overwriting the changes saved in between.
+
+The module exports the following classes:
+
+- GraphVersionConflict: An API exception raised when a save is made on an outdated version of the graph.
+- AddedEquationSerializer: A serializer class for an equation added to a graph.
+- ChangedEquationSerializer: A serializer class for the changed fields of an equation of a graph.
+- GraphPatchSerializer: A serializer class for the equations added, changed and removed since a version of a graph.
+
+The graph is given in the context of the serializers, so that it is not looked up again for every equation.
+This module is intended to be used as part of a Django REST API.
+"""
+
+from typing import Dict
+
+from django.db import transaction
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException, NotFound
+
+from ..models.equation import Equation
+from ..models.graph import Graph
+from ..services.graph_cache import invalidate_graph_cache
+from ..services.graph_events import EQUATION_CREATED, EQUATION_DELETED, EQUATION_UPDATED, record_equation_changes
+from ..services.graph_parser import update_parsed_equations
+from .equation import EquationSerializer
+
+
+class GraphVersionConflict(APIException):
+    """Raised when the equations of a graph are saved on an outdated version of the graph."""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The graph was saved since this version."
+    default_code = "conflict"
+
+
+class AddedEquationSerializer(EquationSerializer):
+    """A class used to represent a serializer for an equation added to a graph."""
+
+    class Meta(EquationSerializer.Meta):
+        """A class used to set metadata options for the AddedEquationSerializer class."""
+
+        read_only_fields = ["id", "graph"]
+
+
+class ChangedEquationSerializer(EquationSerializer):
+    """A class used to represent a serializer for the changed fields of an equation of a graph."""
+
+    id = serializers.IntegerField()
+
+    class Meta(EquationSerializer.Meta):
+        """A class used to set metadata options for the ChangedEquationSerializer class."""
+
+        read_only_fields = ["graph"]
+        extra_kwargs = {
+            field: {"required": False}
+            for field in [
+                "equation",
+                "parsed_equation",
+                "color",
+                "line_style",
+                "line_width",
+            ]
+        }
+
+
+class GraphPatchSerializer(serializers.Serializer):
+    """A class used to represent a serializer for the equation changes made since a version of a graph."""
+
+    version = serializers.IntegerField(min_value=0)
+    added = AddedEquationSerializer(many=True, default=list)
+    changed = ChangedEquationSerializer(many=True, default=list)
+    removed = serializers.ListField(child=serializers.IntegerField(), default=list)
+
+    def validate(self, data: Dict) -> Dict:
+        """
+        Check that the equations changed or removed belong to the graph, and appear only once.
+
+        Args:
+            data (Dict): The version of the graph, and the equations added, changed and removed.
+
+        Returns:
+            Dict: The validated data, along with the equations changed or removed.
+
+        Raises:
+            ValidationError: If an id is repeated or does not belong to the graph.
+        """
+        ids = [equation["id"] for equation in data["changed"]] + data["removed"]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError(
+                "Each equation can only be changed or removed once."
+            )
+        instances = self.context["graph"].equation_set.in_bulk(ids)
+        unknown_ids = sorted(set(ids) - instances.keys())
+        if unknown_ids:
+            raise serializers.ValidationError(
+                f"Equation(s) not found in the graph: {unknown_ids}"
+            )
+        data["instances"] = instances
+        return data
+
+    def create(self, validated_data: Dict) -> Dict:
+        """
+        Write the delta of the equations of the graph, and bump its version, in a single transaction.
+
+        The changed fields that are equal to the stored ones are left out, and nothing is written when the delta is
+        empty. Otherwise, once the write is committed, the delta is published to the subscribers of the graph, and the
+        equations of the graph are parsed again.
+
+        Args:
+            validated_data (Dict): The validated version of the graph, and the equations added, changed and removed.
+
+        Returns:
+            Dict: The version of the graph after the save, and the equations added.
+
+        Raises:
+            GraphVersionConflict: If the graph was saved since the given version.
+            NotFound: If the graph was deleted since it was looked up.
+        """
+        graph = self.context["graph"]
+        instances = validated_data["instances"]
+        changed, fields = [], set()
+        for data in validated_data["changed"]:
+            equation = instances[data["id"]]
+            changes = {
+                field: value
+                for field, value in data.items()
+                if getattr(equation, field) != value
+            }
+            for field, value in changes.items():
+                setattr(equation, field, value)
+            if changes:
+                changed.append(equation)
+                fields.update(changes)
+        added = [Equation(graph=graph, **data) for data in validated_data["added"]]
+        removed = validated_data["removed"]
+        version = validated_data["version"]
+        modified = bool(added or changed or removed)
+        with transaction.atomic():
+            graphs = Graph.objects.filter(id=graph.id, version=version)
+            if modified:
+                saved = graphs.touch()
+            else:
+                saved = graphs.exists()
+            if not saved:
+                current_version = (
+                    Graph.objects.filter(id=graph.id)
+                    .values_list("version", flat=True)
+                    .first()
+                )
+                if current_version is None:
+                    raise NotFound("The graph was deleted.")
+                raise GraphVersionConflict(
+                    f"The graph was saved since version {version}, its current version is {current_version}."
+                )
+            graph.equation_set.filter(id__in=removed).delete()
+            if changed:
+                Equation.objects.bulk_update(changed, sorted(fields))
+            Equation.objects.bulk_create(added)
+            record_equation_changes(graph.id, EQUATION_DELETED, removed)
+            record_equation_changes(
+                graph.id, EQUATION_UPDATED, [equation.id for equation in changed]
+            )
+            record_equation_changes(
+                graph.id, EQUATION_CREATED, [equation.id for equation in added]
+            )
+            if not modified:
+                return {"version": version, "added": []}
+            invalidate_graph_cache(graph.id)
+        added_ids = {equation.id for equation in added}
+        equations = update_parsed_equations(graph)
+        return {
+            "version": version + 1,
+            "added": [equation for equation in equations if equation.id in added_ids],
+        }
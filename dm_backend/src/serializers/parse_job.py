@@ -0,0 +1,36 @@
+"""
+This module defines a serializer class for the ParseJob model.
+
+The ParseJobSerializer class extends the ModelSerializer class provided by the Django REST framework to automatically
+generate serializers for the ParseJob model's fields.
+
+The module exports a single class:
+
+- ParseJobSerializer: A read-only serializer class for the ParseJob model.
+
+This module is intended to be used as part of a Django REST API.
+"""
+
+from rest_framework import serializers
+
+from ..models.parse_job import ParseJob
+
+
+class ParseJobSerializer(serializers.ModelSerializer):
+    """A class used to represent a serializer for the ParseJob model in Django."""
+
+    class Meta:
+        """A class used to set metadata options for the ParseJobSerializer class."""
+
+        model = ParseJob
+        fields = [
+            "id",
+            "status",
+            "status_code",
+            "expressions",
+            "result",
+            "created",
+            "started",
+            "finished",
+        ]
+        read_only_fields = fields
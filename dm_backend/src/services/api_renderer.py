@@ -4,11 +4,48 @@ This module contains a custom renderer class, APIRenderer, that formats the API
 The API response contains additional metadata such as the HTTP status code and a success/failure message based
 on the status code. APIRenderer extends the JSONRenderer class from the Django REST Framework and overrides the render
 method to format the data. The render method takes the data, media type, and renderer context as arguments, and returns
-a JSON representation of the data with additional metadata.
+a JSON representation of the data with additional metadata. The responses of paginated lists also carry the links to
+the next and previous pages.
+
+The data is encoded with orjson when it is installed and selected by the API_JSON_ENCODER setting, and the envelope is
+written around the encoded data, so that the data is not copied into a new dictionary. The output is the same as the
+one of the JSONRenderer, except for the exponent of very large or very small floats, written as 1e16 instead of 1e+16,
+and the non-finite floats, written as null where the JSONRenderer fails. The responses indented on request of the
+client, and the data that orjson cannot encode, such as integers over 64 bits, are rendered by the JSONRenderer.
 """
 
+from typing import Any
+
+from django.conf import settings
 from rest_framework.renderers import JSONRenderer
 
+from .metrics import measure
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def wrap_response(data: dict, renderer_context: dict) -> dict:
+    """
+    Wrap the data of a response in the standard format of the API.
+
+    Args:
+        data: The data of the response.
+        renderer_context: A dictionary of metadata that provides context for rendering.
+
+    Returns:
+        A dictionary with the HTTP status code, a success/failure message based on the status code, and the data,
+        along with the next and previous links of a paginated list.
+    """
+    response = {}
+    response["status"] = renderer_context["response"].status_code
+    response["message"] = "success" if response["status"] < 400 else "fail"
+    response["data"] = data
+    response.update(getattr(renderer_context["response"], "pagination", {}))
+    return response
+
 
 class APIRenderer(JSONRenderer):
     """A custom renderer that formats the API response in a standard format."""
@@ -28,9 +65,77 @@ class APIRenderer(JSONRenderer):
             A JSON representation of the data with additional metadata such as the HTTP status code
             and a success/failure message based on the status code.
         """
-        response = {}
-        response["status"] = renderer_context["response"].status_code
-        response["message"] = "success" if response["status"] < 400 else "fail"
-        response["data"] = data
+        with measure("renderer"):
+            return self.render_response(
+                data, accepted_media_type, renderer_context or {}
+            )
+
+    def render_response(
+        self, data: Any, accepted_media_type: str, renderer_context: dict
+    ) -> bytes:
+        """
+        Render the data to JSON format with additional metadata, with orjson when it is selected.
+
+        Args:
+            data: The data to be rendered to JSON.
+            accepted_media_type: The media type that was requested by the client.
+            renderer_context: A dictionary of metadata that provides context for rendering.
+
+        Returns:
+            A JSON representation of the data with additional metadata.
+        """
+        if (
+            orjson is not None
+            and settings.API_JSON_ENCODER == "orjson"
+            and not self.get_indent(accepted_media_type, renderer_context)
+        ):
+            try:
+                return self.render_envelope(data, renderer_context)
+            except orjson.JSONEncodeError:
+                pass
+        response = wrap_response(data, renderer_context)
 
         return super().render(response, accepted_media_type, renderer_context)
+
+    def render_envelope(self, data: Any, renderer_context: dict) -> bytes:
+        """
+        Render the data with orjson, and write the standard format of the API around it.
+
+        The types that the JSONRenderer encodes differently from orjson, such as the dates and times, are passed to
+        the encoder of the JSONRenderer.
+
+        Args:
+            data: The data to be rendered to JSON.
+            renderer_context: A dictionary of metadata that provides context for rendering.
+
+        Returns:
+            The same JSON representation as the one of the render method of the JSONRenderer.
+
+        Raises:
+            orjson.JSONEncodeError: If orjson cannot encode the data.
+        """
+        default = self.encoder_class().default
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        response = renderer_context["response"]
+        message = b'"success"' if response.status_code < 400 else b'"fail"'
+        parts = [b'{"status":%d,"message":%s,"data":' % (response.status_code, message)]
+        parts.append(orjson.dumps(data, default=default, option=option))
+        for key, value in getattr(response, "pagination", {}).items():
+            parts.append(
+                b",%s:%s"
+                % (
+                    orjson.dumps(key),
+                    orjson.dumps(value, default=default, option=option),
+                )
+            )
+        parts.append(b"}")
+        content = b"".join(parts)
+        if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+            content = content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return content
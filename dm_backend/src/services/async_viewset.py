@@ -0,0 +1,253 @@
+"""
+This module contains the viewsets served asynchronously under an ASGI server.
+
+Under an ASGI server, an asynchronous view does not hold a thread while it waits for the database or for the parser
+pool, so that many idle editor connections are served by a few worker processes. Django REST Framework only dispatches
+requests synchronously, so the dispatch is made asynchronous here:
+
+- AsyncViewSetMixin: Dispatches a request asynchronously, awaiting the handlers that are coroutines, and running the
+  synchronous ones, along with the authentication, permissions and throttling of the request, in a thread.
+- AsyncViewSet: A viewset whose actions can be coroutines.
+- AsyncModelViewSet: A model viewset whose list, retrieve, create, update and destroy actions query the database
+  with the asynchronous ORM, and run the validation and the writes of the serializers in a thread. The time spent in
+  the serializers is added to the metrics of the request.
+
+The synchronous actions of the viewsets keep working unchanged, and the views are served under a WSGI server as well,
+where Django runs them in an event loop of their own.
+"""
+
+import asyncio
+from typing import Any, Callable
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db.models import Model
+from django.http import Http404, HttpRequest
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+from rest_framework.viewsets import ModelViewSet, ViewSet
+
+from .metrics import measure
+
+
+class AsyncViewSetMixin:
+    """A viewset mixin dispatching the requests asynchronously."""
+
+    @classmethod
+    def as_view(cls, actions: dict = None, **initkwargs: Any) -> Callable:
+        """
+        Return the view of the given actions as a coroutine function, so that Django serves it asynchronously.
+
+        Args:
+            actions (dict): The actions bound to the HTTP methods.
+            **initkwargs (Any): The attributes set on each instance of the viewset.
+
+        Returns:
+            Callable: The asynchronous view.
+        """
+        view = super().as_view(actions, **initkwargs)
+
+        async def async_view(*args: Any, **kwargs: Any) -> Response:
+            return await view(*args, **kwargs)
+
+        async_view.__dict__.update(view.__dict__)
+        async_view.__name__ = view.__name__
+        async_view.__qualname__ = view.__qualname__
+        async_view.__doc__ = view.__doc__
+        return async_view
+
+    async def dispatch(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> Response:
+        """
+        Dispatch a request to the handler of its method, as the synchronous dispatch of the APIView class does.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            *args (Any): The positional arguments of the URL.
+            **kwargs (Any): The keyword arguments of the URL.
+
+        Returns:
+            Response: The response of the handler, or the error response of the exception it raised.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncViewSet(AsyncViewSetMixin, ViewSet):
+    """A viewset whose actions can be coroutines."""
+
+
+class AsyncModelViewSet(AsyncViewSetMixin, ModelViewSet):
+    """A model viewset querying the database with the asynchronous ORM."""
+
+    async def aget_object(self) -> Model:
+        """
+        Return the object of the URL, as the get_object method does, with an asynchronous query.
+
+        Returns:
+            Model: The object.
+
+        Raises:
+            Http404: If there is no such object.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            instance = await queryset.aget(**filter_kwargs)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404(
+                f"No {queryset.model._meta.object_name} matches the given query."
+            )
+        await sync_to_async(self.check_object_permissions)(self.request, instance)
+        return instance
+
+    @staticmethod
+    async def validate(serializer: BaseSerializer) -> None:
+        """
+        Validate the data of a serializer in a thread, measuring the time spent in the metrics of the request.
+
+        Args:
+            serializer (BaseSerializer): The serializer.
+
+        Raises:
+            ValidationError: If the data is invalid.
+        """
+        with measure("serializer"):
+            await sync_to_async(serializer.is_valid)(raise_exception=True)
+
+    @staticmethod
+    def serializer_data(serializer: BaseSerializer) -> Any:
+        """
+        Return the representation of a serializer, measuring the time spent in the metrics of the request.
+
+        Args:
+            serializer (BaseSerializer): The serializer.
+
+        Returns:
+            Any: The data of the serializer.
+        """
+        with measure("serializer"):
+            return serializer.data
+
+    async def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        """
+        Return a page of the objects.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: A JSON response containing the objects of the page.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await sync_to_async(self.paginate_queryset)(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(self.serializer_data(serializer))
+        serializer = self.get_serializer(
+            [instance async for instance in queryset], many=True
+        )
+        return Response(self.serializer_data(serializer))
+
+    async def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        """
+        Return the object of the URL.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: A JSON response containing the object.
+        """
+        serializer = self.get_serializer(await self.aget_object())
+        return Response(self.serializer_data(serializer))
+
+    async def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        """
+        Create an object.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: A JSON response containing the created object, or an error response if the data is invalid.
+        """
+        serializer = self.get_serializer(data=request.data)
+        await self.validate(serializer)
+        await sync_to_async(self.perform_create)(serializer)
+        data = self.serializer_data(serializer)
+        headers = self.get_success_headers(data)
+        return Response(data, status=status.HTTP_201_CREATED, headers=headers)
+
+    async def update(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        """
+        Update the object of the URL.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: A JSON response containing the updated object, or an error response if the data is invalid.
+        """
+        partial = kwargs.pop("partial", False)
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        await self.validate(serializer)
+        await sync_to_async(self.perform_update)(serializer)
+        if getattr(instance, "_prefetched_objects_cache", None):
+            instance._prefetched_objects_cache = {}
+        return Response(self.serializer_data(serializer))
+
+    async def partial_update(
+        self, request: Request, *args: Any, **kwargs: Any
+    ) -> Response:
+        """
+        Update some of the fields of the object of the URL.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: A JSON response containing the updated object, or an error response if the data is invalid.
+        """
+        kwargs["partial"] = True
+        return await self.update(request, *args, **kwargs)
+
+    async def destroy(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        """
+        Delete the object of the URL.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: An empty response.
+        """
+        instance = await self.aget_object()
+        await sync_to_async(self.perform_destroy)(instance)
+        return Response(status=status.HTTP_204_NO_CONTENT)
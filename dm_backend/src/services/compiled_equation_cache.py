@@ -0,0 +1,168 @@
+"""
+This module contains a process-wide cache for the compiled equations of the equation sampler.
+
+Compiling a parsed equation with sympify and lambdify costs far more than evaluating it over a whole viewport, while
+the same equations are sampled again and again as the viewport is panned and zoomed. The compiled functions are
+therefore kept in a bounded LRU cache, keyed by the parsed equation with its whitespace removed, along with hit, miss
+and eviction counters.
+
+The cache is configured with the COMPILED_EQUATION_CACHE setting, and can be pre-warmed at startup with the parsed
+equations stored the most often in the database.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+WHITESPACE = re.compile(r"\s+")
+
+CompiledEquation = Callable[..., Any]
+
+
+def normalize_equation(parsed_equation: str) -> str:
+    """
+    Normalize a parsed equation into its cache key.
+
+    Args:
+        parsed_equation (str): The parsed equation.
+
+    Returns:
+        str: The parsed equation without whitespace.
+    """
+    return WHITESPACE.sub("", parsed_equation)
+
+
+class CompiledEquationCache:
+    """A bounded LRU cache of compiled equations keyed by their normalized parsed equation."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): The number of compiled equations kept before the least recently used are evicted.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, CompiledEquation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compile(
+        self,
+        parsed_equation: str,
+        compile: Callable[[str], CompiledEquation],
+    ) -> CompiledEquation:
+        """
+        Return the cached compiled equation, or compile and cache it on a miss.
+
+        The normalized parsed equation is the one compiled, so that every equation sharing a key shares its function.
+        Failing compilations raise out of this method and are not cached.
+
+        Args:
+            parsed_equation (str): The parsed equation.
+            compile (Callable[[str], CompiledEquation]): The compiler to call on a miss.
+
+        Returns:
+            CompiledEquation: The compiled equation.
+        """
+        key = normalize_equation(parsed_equation)
+        with self._lock:
+            function = self._entries.get(key)
+            if function is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return function
+            self.misses += 1
+        function = compile(key)
+        with self._lock:
+            self._entries[key] = function
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return function
+
+    def prewarm(
+        self,
+        parsed_equations: Iterable[str],
+        compile: Callable[[str], CompiledEquation],
+    ) -> int:
+        """
+        Compile and cache the given parsed equations, skipping the ones that cannot be compiled.
+
+        Args:
+            parsed_equations (Iterable[str]): The parsed equations, the most frequently sampled first.
+            compile (Callable[[str], CompiledEquation]): The compiler of the equations.
+
+        Returns:
+            int: The number of equations compiled.
+        """
+        compiled = 0
+        for parsed_equation in parsed_equations:
+            if compiled >= self.max_entries:
+                break
+            try:
+                self.get_or_compile(parsed_equation, compile)
+            except Exception:
+                continue
+            compiled += 1
+        return compiled
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return the counters of the cache.
+
+        Returns:
+            Dict[str, float]: The number of entries, hits, misses and evictions, and the hit ratio.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        """Remove every compiled equation and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+_compiled_equation_cache: Optional[CompiledEquationCache] = None
+
+
+def get_compiled_equation_cache() -> CompiledEquationCache:
+    """
+    Return the process-wide compiled equation cache, creating it from the COMPILED_EQUATION_CACHE setting on first use.
+
+    Returns:
+        CompiledEquationCache: The compiled equation cache.
+    """
+    global _compiled_equation_cache
+    if _compiled_equation_cache is None:
+        _compiled_equation_cache = CompiledEquationCache(
+            settings.COMPILED_EQUATION_CACHE["max_entries"]
+        )
+    return _compiled_equation_cache
+
+
+@receiver(setting_changed)
+def reset_compiled_equation_cache(setting: str, **kwargs: Any) -> None:
+    """Drop the compiled equation cache when its setting is overridden, so that it is created again from it."""
+    global _compiled_equation_cache
+    if setting == "COMPILED_EQUATION_CACHE":
+        _compiled_equation_cache = None
@@ -0,0 +1,108 @@
+"""
+This module contains the conditional GET support of the list and retrieve endpoints.
+
+A viewset returns the version of the data it would serialize, computed with a query much cheaper than the listing, and
+the time that data was last modified when that time changes along with the data. They are sent as the ETag and
+Last-Modified headers of the response, and a client sending them back in the If-None-Match and If-Modified-Since
+headers gets an empty 304 response while the data is unchanged, without the data being fetched, serialized or sent
+again. Data whose changes do not all move its modification time forward, such as a list an object can be deleted from,
+is only validated by its ETag.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.request import Request
+
+Validators = Tuple[str, Optional[datetime]]
+
+
+class ConditionalGetMixin:
+    """A viewset mixin answering the conditional GET requests of the list and retrieve actions."""
+
+    def get_validators(self) -> Optional[Validators]:
+        """
+        Return the version of the data of the request and the time it was last modified, None if they are unknown.
+
+        Returns:
+            Optional[Validators]: A key changing whenever the data changes, and the time of the last change, or None if
+                that time does not change whenever the data changes.
+        """
+        return None
+
+    async def list(
+        self, request: Request, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase:
+        """
+        Return a page of the objects, or a 304 response if it is unchanged since the client fetched it.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            HttpResponseBase: The response of the list action, or a 304 response.
+        """
+        return await self.conditional(super().list, request, *args, **kwargs)
+
+    async def retrieve(
+        self, request: Request, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase:
+        """
+        Return the object of the URL, or a 304 response if it is unchanged since the client fetched it.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            HttpResponseBase: The response of the retrieve action, or a 304 response.
+        """
+        return await self.conditional(super().retrieve, request, *args, **kwargs)
+
+    async def conditional(
+        self,
+        handler: Callable[..., Awaitable[HttpResponseBase]],
+        request: Request,
+        *args: Any,
+        **kwargs: Any,
+    ) -> HttpResponseBase:
+        """
+        Run a handler unless the data is unchanged since the client fetched it, and add the validators to the response.
+
+        The ETag depends on the URL and the rendering format, since the pages of a listing and the JSON and
+        MessagePack responses of the same data differ.
+        The response must be revalidated by the client before being reused.
+
+        Args:
+            handler (Callable[..., Awaitable[HttpResponseBase]]): The handler of the action.
+            request (Request): The HTTP request object.
+
+        Returns:
+            HttpResponseBase: The response of the handler, or a 304 response.
+        """
+        validators = await sync_to_async(self.get_validators)()
+        if validators is None:
+            return await handler(request, *args, **kwargs)
+        key, modified = validators
+        etag = quote_etag(
+            hashlib.md5(
+                f"{key}:{request.get_full_path()}:{request.accepted_renderer.format}".encode()
+            ).hexdigest()
+        )
+        last_modified = None if modified is None else int(modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+        if response.status_code in [200, 304]:
+            response.headers["ETag"] = etag
+            if last_modified is not None:
+                response.headers["Last-Modified"] = http_date(last_modified)
+            patch_cache_control(response, no_cache=True)
+            patch_vary_headers(response, ["Accept"])
+        return response
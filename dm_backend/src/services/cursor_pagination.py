@@ -0,0 +1,174 @@
+"""
+This module contains the cursor paginations of the list endpoints.
+
+A cursor pagination seeks the page after the last item of the previous one, along the ordering of the list, instead of
+skipping an offset, so that a deep page is fetched with the same indexed query as the first one. The cursor holds the
+values of every field of the ordering, which ends with the id, so that the items sharing the same first field, such as
+the graphs of different owners with the same name, are sought past rather than skipped with an offset. The paginated
+items are returned as the data of the response, and the links to the next and previous pages are added next to it by
+the renderers of the API:
+
+- GraphCursorPagination: The graphs, ordered by name and id.
+- EquationCursorPagination: The equations, ordered by id.
+"""
+
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+def reverse_ordering(ordering: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Reverse the direction of every field of an ordering.
+
+    Args:
+        ordering (Sequence[str]): The fields of the ordering, prefixed with a minus sign when descending.
+
+    Returns:
+        Tuple[str, ...]: The fields of the reversed ordering.
+    """
+    return tuple(
+        field[1:] if field.startswith("-") else f"-{field}" for field in ordering
+    )
+
+
+def seek(ordering: Sequence[str], position: Sequence[str]) -> Q:
+    """
+    Return the condition of the items after a position along an ordering.
+
+    Args:
+        ordering (Sequence[str]): The fields of the ordering, prefixed with a minus sign when descending.
+        position (Sequence[str]): The values of the fields of the ordering at the position.
+
+    Returns:
+        Q: The condition of the items whose fields come after the values, the first fields first.
+    """
+    condition = None
+    for field, value in reversed(list(zip(ordering, position))):
+        name = field.lstrip("-")
+        after = Q(**{f"{name}__{'lt' if field.startswith('-') else 'gt'}": value})
+        condition = (
+            after if condition is None else after | Q(**{name: value}) & condition
+        )
+    return condition
+
+
+class APICursorPagination(CursorPagination):
+    """A cursor pagination exposing the links to the next and previous pages to the renderers of the API."""
+
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view: Any = None
+    ) -> Optional[List[Any]]:
+        """
+        Return the items of the page of the cursor of the request, sought past its position on every field.
+
+        Args:
+            queryset (QuerySet): The items of the list.
+            request (Request): The HTTP request object.
+            view (Any): The view of the list.
+
+        Returns:
+            Optional[List[Any]]: The items of the page, or None if the list is not paginated.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+        ordering = reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            try:
+                position = json.loads(current_position)
+                if not isinstance(position, list) or len(position) != len(ordering):
+                    raise ValueError(current_position)
+                queryset = queryset.filter(seek(ordering, position))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        results = list(queryset[offset : offset + self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_following_position = len(results) > len(self.page)
+        following_position = None
+        if has_following_position:
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        has_current_position = current_position is not None or offset > 0
+        if reverse:
+            self.page.reverse()
+            self.has_next = has_current_position
+            self.has_previous = has_following_position
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = has_current_position
+            self.next_position = following_position
+            self.previous_position = current_position
+        return self.page
+
+    def _get_position_from_instance(
+        self, instance: Any, ordering: Sequence[str]
+    ) -> str:
+        """
+        Return the position of an item, made of the values of every field of the ordering.
+
+        Args:
+            instance (Any): The item, a model instance or a dictionary.
+            ordering (Sequence[str]): The fields of the ordering.
+
+        Returns:
+            str: The values of the fields as a JSON list of strings.
+        """
+        values = []
+        for field in ordering:
+            name = field.lstrip("-")
+            value = (
+                instance[name]
+                if isinstance(instance, dict)
+                else getattr(instance, name)
+            )
+            values.append(str(value))
+        return json.dumps(values, separators=(",", ":"))
+
+    def get_paginated_response(self, data: List[dict]) -> Response:
+        """
+        Return the response of a page, holding the links to the next and previous pages in its pagination attribute.
+
+        Args:
+            data (List[dict]): The serialized items of the page.
+
+        Returns:
+            Response: The response with the items of the page as its data.
+        """
+        response = Response(data)
+        response.pagination = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+        }
+        return response
+
+
+class GraphCursorPagination(APICursorPagination):
+    """A cursor pagination of the graphs ordered by name and id, the id telling apart the graphs of the same name."""
+
+    ordering = ("name", "id")
+
+
+class EquationCursorPagination(APICursorPagination):
+    """A cursor pagination of the equations ordered by id."""
+
+    ordering = ("id",)
@@ -0,0 +1,413 @@
+"""
+This module contains the equation sampler, which evaluates parsed equations over a viewport on the server.
+
+A parsed equation, as returned by the equation parser, is compiled once into a NumPy function of its variable with
+sympy's lambdify, and then evaluated on every sample of the viewport in a single vectorized call. The following forms of
+parsed equations are supported:
+
+- A function definition, such as "f_func(x) = x^2", sampled over its parameter.
+- An explicit equation, such as "y = 2*x + 1", sampled over x.
+- A bare expression, such as "sin(x)", sampled over x.
+
+The samples are either evenly spaced, or adaptive: starting from a coarse grid, the intervals over which the curve
+deviates from a straight line by more than a tolerance are recursively split, within a budget of points, so that flat
+regions get few points while steep turns and asymptotes get many.
+
+The parsed equations are validated against a whitelist of names before being handed to sympy, as sympy evaluates the
+strings it parses. They are parsed without being evaluated, and the exact powers of constants whose result would have
+more than MAX_POWER_DIGITS digits, such as 9^9^9^2, are rejected before being compiled, as computing them would stall
+the worker. The compiled functions are kept in the compiled equation cache, which can be pre-warmed at startup with
+the parsed equations stored the most often.
+"""
+
+import math
+import re
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.db import DatabaseError
+from django.db.models import Count
+from sympy import E, Expr, Float, Pow, Symbol, lambdify, postorder_traversal, sympify
+
+from ..enums.line_style_type import LineStyle
+from ..models.equation import Equation
+from .compiled_equation_cache import get_compiled_equation_cache
+
+ALLOWED_NAMES = {
+    "Abs",
+    "E",
+    "acos",
+    "acosh",
+    "asin",
+    "asinh",
+    "atan",
+    "atanh",
+    "ceiling",
+    "cos",
+    "cosh",
+    "cot",
+    "csc",
+    "e",
+    "exp",
+    "floor",
+    "ln",
+    "log",
+    "pi",
+    "sec",
+    "sign",
+    "sin",
+    "sinh",
+    "sqrt",
+    "tan",
+    "tanh",
+}
+FUNCTION_DEFINITION = re.compile(r"^\s*(\w+)\(\s*([A-Za-z]\w*)\s*\)\s*$")
+INVALID_CHARACTERS = re.compile(r"[^\w\s.+\-*/^(),]|__|\.(?!\d)")
+NAME = re.compile(r"[A-Za-z_]\w*")
+ADAPTIVE_INITIAL_POINTS = 33
+ADAPTIVE_MIN_WIDTH = 1e-9
+MAX_POWER_DIGITS = 1000
+
+Samples = Dict[str, List[Optional[float]]]
+
+
+class SamplingError(ValueError):
+    """Raised when a parsed equation cannot be sampled."""
+
+
+def split_equation(parsed_equation: str) -> Tuple[str, str]:
+    """
+    Split a parsed equation into its variable and the expression to be sampled.
+
+    Args:
+        parsed_equation (str): The parsed equation.
+
+    Returns:
+        Tuple[str, str]: The name of the variable and the expression of the variable.
+
+    Raises:
+        SamplingError: If the equation is not of a supported form.
+    """
+    sides = parsed_equation.split("=")
+    if len(sides) == 1:
+        return "x", sides[0]
+    if len(sides) != 2:
+        raise SamplingError(f"{parsed_equation} is not a function of a single variable")
+    left, right = sides
+    if left.strip() == "y":
+        return "x", right
+    definition = FUNCTION_DEFINITION.match(left)
+    if definition is None:
+        raise SamplingError(f"{parsed_equation} is not a function of a single variable")
+    return definition.group(2), right
+
+
+def check_power_sizes(expression: Expr) -> None:
+    """
+    Check that the powers of constants of an unevaluated expression are small enough to be computed.
+
+    Only the exact powers are checked, as the powers of floats are computed in constant time. The innermost powers are
+    checked first, so that the value of every exponent checked is known to be bounded.
+
+    Args:
+        expression (Expr): The unevaluated expression.
+
+    Raises:
+        SamplingError: If a power of constants would have more than MAX_POWER_DIGITS digits.
+    """
+    for node in postorder_traversal(expression):
+        if not isinstance(node, Pow) or node.free_symbols or node.has(Float):
+            continue
+        base, exponent = abs(complex(node.base)), abs(complex(node.exp))
+        if base == 0 or exponent == 0:
+            continue
+        if exponent * abs(math.log10(base)) > MAX_POWER_DIGITS:
+            raise SamplingError(f"{node} is too large to be computed")
+
+
+def compile_equation(parsed_equation: str) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Compile a parsed equation into a vectorized function of its variable.
+
+    Args:
+        parsed_equation (str): The parsed equation.
+
+    Returns:
+        Callable[[np.ndarray], np.ndarray]: The NumPy function of the variable.
+
+    Raises:
+        SamplingError: If the equation is not of a supported form, uses unknown names, or powers too large to be
+            computed.
+    """
+    variable, expression = split_equation(parsed_equation)
+    if INVALID_CHARACTERS.search(expression):
+        raise SamplingError(f"{parsed_equation} contains invalid characters")
+    unknown_names = set(NAME.findall(expression)) - ALLOWED_NAMES - {variable}
+    if unknown_names:
+        raise SamplingError(f"Unresolved name(s) found: {sorted(unknown_names)}")
+    symbol = Symbol(variable)
+    try:
+        sympy_expression = sympify(
+            expression, locals={"e": E, variable: symbol}, evaluate=False
+        )
+    except Exception as e:
+        raise SamplingError(f"{parsed_equation} is invalid - {e}") from None
+    check_power_sizes(sympy_expression)
+    return lambdify(symbol, sympy_expression, "numpy")
+
+
+def get_compiled_equation(parsed_equation: str) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Return the compiled equation from the compiled equation cache, compiling it on a miss.
+
+    Args:
+        parsed_equation (str): The parsed equation.
+
+    Returns:
+        Callable[[np.ndarray], np.ndarray]: The NumPy function of the variable.
+
+    Raises:
+        SamplingError: If the equation is not of a supported form, or uses unknown names.
+    """
+    return get_compiled_equation_cache().get_or_compile(
+        parsed_equation, compile_equation
+    )
+
+
+def prewarm_compiled_equations(limit: int) -> int:
+    """
+    Compile the parsed equations stored the most often in the database into the compiled equation cache.
+
+    The parsed equations sent by the clients are stored when their equation cannot be parsed, so the ones that cannot
+    be compiled, such as the powers too large to be computed, are skipped instead of stalling the startup.
+
+    Args:
+        limit (int): The maximum number of distinct parsed equations to compile.
+
+    Returns:
+        int: The number of equations compiled, 0 when the database cannot be queried yet.
+    """
+    try:
+        parsed_equations = [
+            row["parsed_equation"]
+            for row in Equation.objects.values("parsed_equation")
+            .annotate(count=Count("id"))
+            .order_by("-count", "parsed_equation")[:limit]
+        ]
+    except DatabaseError:
+        return 0
+    return get_compiled_equation_cache().prewarm(parsed_equations, compile_equation)
+
+
+def evaluate(function: Callable[[np.ndarray], np.ndarray], x: np.ndarray) -> np.ndarray:
+    """
+    Evaluate a compiled equation, turning every undefined or complex value into NaN.
+
+    Args:
+        function (Callable[[np.ndarray], np.ndarray]): The compiled equation.
+        x (np.ndarray): The values of the variable.
+
+    Returns:
+        np.ndarray: The real values of the equation, with the same shape as x.
+    """
+    with np.errstate(all="ignore"):
+        y = np.asarray(function(x))
+        if np.iscomplexobj(y):
+            y = np.where(np.abs(y.imag) < 1e-12, y.real, np.nan)
+        return np.broadcast_to(y.astype(float), x.shape)
+
+
+def to_samples(
+    x: np.ndarray,
+    y: np.ndarray,
+    line_style: LineStyle,
+    y_min: Optional[float] = None,
+    y_max: Optional[float] = None,
+) -> Samples:
+    """
+    Convert evaluated points into the samples sent to the client.
+
+    A polyline keeps every point, with None in place of undefined values so that the line is broken there. A scatter
+    only keeps the defined points within the vertical bounds of the viewport.
+
+    Args:
+        x (np.ndarray): The values of the variable.
+        y (np.ndarray): The values of the equation.
+        line_style (LineStyle): The line style the samples are rendered with.
+        y_min (Optional[float]): The bottom of the viewport.
+        y_max (Optional[float]): The top of the viewport.
+
+    Returns:
+        Samples: The x and y arrays of the samples.
+    """
+    defined = np.isfinite(y)
+    if line_style == LineStyle.DOTTED:
+        if y_min is not None:
+            defined &= y >= y_min
+        if y_max is not None:
+            defined &= y <= y_max
+        return {"x": x[defined].tolist(), "y": y[defined].tolist()}
+    return {
+        "x": x.tolist(),
+        "y": [
+            value if is_defined else None
+            for value, is_defined in zip(y.tolist(), defined.tolist())
+        ],
+    }
+
+
+def sample_equation(
+    parsed_equation: str,
+    x_min: float,
+    x_max: float,
+    resolution: int,
+    line_style: LineStyle = LineStyle.SOLID,
+    y_min: Optional[float] = None,
+    y_max: Optional[float] = None,
+) -> Samples:
+    """
+    Sample a parsed equation uniformly over the horizontal bounds of a viewport.
+
+    Args:
+        parsed_equation (str): The parsed equation.
+        x_min (float): The left of the viewport.
+        x_max (float): The right of the viewport.
+        resolution (int): The number of samples.
+        line_style (LineStyle): The line style the samples are rendered with.
+        y_min (Optional[float]): The bottom of the viewport.
+        y_max (Optional[float]): The top of the viewport.
+
+    Returns:
+        Samples: The x and y arrays of the samples.
+
+    Raises:
+        SamplingError: If the equation cannot be sampled.
+    """
+    function = get_compiled_equation(parsed_equation)
+    x = np.linspace(x_min, x_max, resolution)
+    try:
+        y = evaluate(function, x)
+    except Exception as e:
+        raise SamplingError(f"{parsed_equation} cannot be evaluated - {e}") from None
+    return to_samples(x, y, line_style, y_min, y_max)
+
+
+def adaptive_sample(
+    function: Callable[[np.ndarray], np.ndarray],
+    x_min: float,
+    x_max: float,
+    max_points: int,
+    tolerance: float,
+    y_min: Optional[float] = None,
+    y_max: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sample a compiled equation, refining the intervals over which it is not linear enough.
+
+    Every round evaluates the midpoints of the intervals split in the previous round in a single vectorized call. An
+    interval is split again when its midpoint deviates from the chord by more than the tolerance, or when the equation
+    becomes defined or undefined inside it. The intervals with the largest deviations are split first when the budget
+    of points runs out. An interval that still deviates once it cannot be split any further is a discontinuity, and a
+    NaN point is inserted inside it so that the line is broken there. When the viewport has vertical bounds, the values
+    far outside of it are clipped before measuring deviations, so that no points are spent on invisible parts.
+
+    Args:
+        function (Callable[[np.ndarray], np.ndarray]): The compiled equation.
+        x_min (float): The left of the viewport.
+        x_max (float): The right of the viewport.
+        max_points (int): The maximum number of samples.
+        tolerance (float): The maximum distance between the curve and the line drawn through the samples.
+        y_min (Optional[float]): The bottom of the viewport.
+        y_max (Optional[float]): The top of the viewport.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The sorted x values of the samples, and the values of the equation.
+    """
+    if y_min is not None and y_max is not None:
+        margin = y_max - y_min
+        clip = partial(np.clip, a_min=y_min - margin, a_max=y_max + margin)
+    else:
+        clip = np.asarray
+    x = np.linspace(x_min, x_max, min(ADAPTIVE_INITIAL_POINTS, max_points))
+    y = evaluate(function, x)
+    min_width = (x_max - x_min) * ADAPTIVE_MIN_WIDTH
+    active = np.ones(len(x) - 1, dtype=bool)
+    discontinuities = []
+    while active.any() and len(x) < max_points:
+        intervals = np.flatnonzero(active)
+        left, right = x[intervals], x[intervals + 1]
+        x_middle = (left + right) / 2
+        y_middle = evaluate(function, x_middle)
+        y_left, y_right = y[intervals], y[intervals + 1]
+        defined = np.isfinite(np.stack([y_left, y_middle, y_right]))
+        with np.errstate(all="ignore"):
+            deviation = np.abs(clip(y_middle) - (clip(y_left) + clip(y_right)) / 2)
+        deviation = np.where(
+            defined.all(axis=0), deviation, np.where(defined.any(axis=0), np.inf, 0)
+        )
+        refine = deviation > tolerance
+        splittable = right - left > min_width
+        discontinuities.append(x_middle[refine & ~splittable & defined.all(axis=0)])
+        refine &= splittable
+        budget = max_points - len(x)
+        if refine.sum() > budget:
+            refine[np.argsort(-np.where(refine, deviation, -1))[budget:]] = False
+        new_x, new_y = x_middle[refine], y_middle[refine]
+        x = np.concatenate([x, new_x])
+        y = np.concatenate([y, new_y])
+        is_new = np.concatenate(
+            [np.zeros(len(x) - len(new_x), dtype=bool), np.ones(len(new_x), dtype=bool)]
+        )
+        order = np.argsort(x, kind="stable")
+        x, y, is_new = x[order], y[order], is_new[order]
+        active = is_new[:-1] | is_new[1:]
+    breaks = np.concatenate(discontinuities) if discontinuities else np.empty(0)
+    if breaks.size:
+        x = np.concatenate([x, breaks])
+        y = np.concatenate([y, np.full(breaks.size, np.nan)])
+        order = np.argsort(x, kind="stable")
+        x, y = x[order], y[order]
+    return x, y
+
+
+def adaptive_sample_equation(
+    parsed_equation: str,
+    x_min: float,
+    x_max: float,
+    resolution: int,
+    line_style: LineStyle = LineStyle.SOLID,
+    y_min: Optional[float] = None,
+    y_max: Optional[float] = None,
+    tolerance: Optional[float] = None,
+) -> Samples:
+    """
+    Sample a parsed equation adaptively over the horizontal bounds of a viewport.
+
+    Args:
+        parsed_equation (str): The parsed equation.
+        x_min (float): The left of the viewport.
+        x_max (float): The right of the viewport.
+        resolution (int): The maximum number of samples.
+        line_style (LineStyle): The line style the samples are rendered with.
+        y_min (Optional[float]): The bottom of the viewport.
+        y_max (Optional[float]): The top of the viewport.
+        tolerance (Optional[float]): The maximum distance between the curve and the line drawn through the samples,
+            a thousandth of the height of the viewport by default, or 1e-3 when the viewport has no vertical bounds.
+
+    Returns:
+        Samples: The x and y arrays of the samples.
+
+    Raises:
+        SamplingError: If the equation cannot be sampled.
+    """
+    if tolerance is None:
+        tolerance = 1e-3 if y_min is None or y_max is None else (y_max - y_min) / 1000
+    function = get_compiled_equation(parsed_equation)
+    try:
+        x, y = adaptive_sample(
+            function, x_min, x_max, resolution, tolerance, y_min, y_max
+        )
+    except Exception as e:
+        raise SamplingError(f"{parsed_equation} cannot be evaluated - {e}") from None
+    return to_samples(x, y, line_style, y_min, y_max)
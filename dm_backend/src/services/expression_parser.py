@@ -0,0 +1,148 @@
+"""
+This module contains the expression parser service used by the equation parser views.
+
+The service wraps the GraphSession class from latexvm. Every expression of a list is executed in order inside a single
+session, so that variables and functions defined by earlier expressions are available to the later ones, and each
+expression is then resolved and parsed as a LaTeX string.
+
+The sessions are cloned from a template holding the substitution rules of the parser, created once per process, and
+the sympy LaTeX parser, whose first use lazily imports its grammar, is warmed up by warm_up_parser when the server
+starts and when a parser worker starts, so that the first request of a worker is not slower than the next ones.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from latexvm.graph_session import GraphSession
+from latexvm.type_defs import EnvironmentVariables, ResultType
+from sympy.parsing.latex import LaTeXParsingError
+
+SUB_RULES: Dict[str, str] = {r"\*\*": "^"}
+
+WARM_UP_EXPRESSIONS: List[str] = [
+    "b = 3",
+    "p(t) = t^{3} - b",
+    "q(s, r) = \\cos(s) \\cdot \\sin(r)",
+    "y = p(x) \\cdot q(x, b) - \\frac{\\sqrt{x}}{3}",
+    "y = |x| + \\ln(x) + e^{2 x}",
+]
+
+Step = Tuple[EnvironmentVariables, str]
+
+_graph_session_template: Optional[GraphSession] = None
+_warmed_up = False
+
+
+def graph_session_template() -> GraphSession:
+    """
+    Return the template of the graph sessions, creating it with the substitution rules of the parser on first use.
+
+    The template is never executed, it is only cloned.
+
+    Returns:
+        GraphSession: The template of the graph sessions.
+    """
+    global _graph_session_template
+    if _graph_session_template is None:
+        template = GraphSession.new(rules={})
+        for pattern, replacement in SUB_RULES.items():
+            template.add_sub_rule(pattern, replacement)
+        _graph_session_template = template
+    return _graph_session_template
+
+
+def new_graph_session(env: Optional[EnvironmentVariables] = None) -> GraphSession:
+    """
+    Create a new graph session by cloning the template of the graph sessions.
+
+    Args:
+        env (Optional[EnvironmentVariables]): The variables and functions to start from, they are copied so that the
+            session never modifies them.
+
+    Returns:
+        GraphSession: A new graph session, with a copy of the substitution rules of the template.
+    """
+    return GraphSession.new(
+        env=dict(env or {}), rules=dict(graph_session_template().get_sub_rules())
+    )
+
+
+def warm_up_parser() -> None:
+    """
+    Pay the first-use costs of the parser in the current process.
+
+    The template of the graph sessions is created, and a few expressions of every kind are parsed, which imports the
+    grammar of the sympy LaTeX parser and the parts of sympy used to resolve and print the expressions. A process
+    forked afterwards, such as a worker of a server started with --preload or a parser worker, inherits the warm
+    parser and does not warm it up again. The warm-up never fails, so that a server or a parser worker starts even if
+    the expressions cannot be parsed.
+    """
+    global _warmed_up
+    if _warmed_up:
+        return
+    _warmed_up = True
+    try:
+        parse_expressions(WARM_UP_EXPRESSIONS)
+    except LaTeXParsingError:
+        pass
+
+
+def parse_expression(graph_session: GraphSession, expression: str) -> str:
+    """
+    Execute a single expression inside a graph session and parse it.
+
+    Args:
+        graph_session (GraphSession): The session holding the variables and functions defined so far.
+        expression (str): The expression to be executed and parsed.
+
+    Returns:
+        str: The parsed expression.
+
+    Raises:
+        LaTeXParsingError: If the expression cannot be resolved or parsed.
+    """
+    graph_session.execute(expression)
+    parsed_expression = graph_session.force_resolve_function(expression)
+    if parsed_expression.result == ResultType.FAILURE:
+        raise LaTeXParsingError(f"{expression} is invalid")
+    return parsed_expression.message
+
+
+def execute_expressions(
+    env: Optional[EnvironmentVariables], expressions: List[str]
+) -> List[Step]:
+    """
+    Parse a given list of expressions in a graph session started from the given environment.
+
+    Args:
+        env (Optional[EnvironmentVariables]): The variables and functions defined by the preceding expressions.
+        expressions (List[str]): The expressions to be parsed, in the order they were defined.
+
+    Returns:
+        List[Step]: The environment of the session after each expression, along with the parsed expression.
+
+    Raises:
+        LaTeXParsingError: If one of the expressions cannot be resolved or parsed.
+    """
+    graph_session = new_graph_session(env)
+    steps = []
+    for expression in expressions:
+        parsed_expression = parse_expression(graph_session, expression)
+        steps.append((dict(graph_session.get_env()), parsed_expression))
+    return steps
+
+
+def parse_expressions(expressions: List[str]) -> List[str]:
+    """
+    Resolve and parse a given list of mathematical expressions.
+
+    Args:
+        expressions (List[str]): The expressions to be parsed, in the order they were defined.
+
+    Returns:
+        List[str]: The parsed expressions.
+
+    Raises:
+        LaTeXParsingError: If one of the expressions cannot be resolved or parsed.
+    """
+    graph_session = new_graph_session()
+    return [parse_expression(graph_session, expression) for expression in expressions]
@@ -0,0 +1,298 @@
+"""
+This module contains the response cache of the graphs and of the equations of a graph.
+
+The graphs and their equations are read far more often than they are written, so the data served by the graph detail
+and by the equation list of a graph is kept in a cache of the Django cache framework, the process-local memory cache by
+default, or a cache shared by the server processes configured with the GRAPH_CACHE_BACKEND setting.
+
+The entries of a graph are stored under a generation token of the graph, which is replaced whenever the graph or one of
+its equations is saved or deleted, so that every cached response of the graph is invalidated at once without listing
+the keys of the cache. The token is replaced when the write is made and again when its transaction is committed, so
+that a response read from the database before the commit is not served afterwards. A response is stored under the
+token read before its data was read from the database, and not stored at all when the token was replaced since then.
+
+- GraphCache: Stores the data of the responses of a graph, and counts the hits and misses of the lookups.
+- GraphCacheMixin: A viewset mixin serving the list and retrieve actions from the cache.
+"""
+
+import hashlib
+import threading
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+CachedResponse = Tuple[Any, Optional[Dict[str, Any]]]
+
+
+class GraphCache:
+    """A cache for the data of the responses of a graph, invalidated with a generation token per graph."""
+
+    key_prefix = "graph_cache"
+
+    def __init__(
+        self, cache_alias: str = "default", timeout: Optional[float] = DEFAULT_TIMEOUT
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            cache_alias (str): The alias of the Django cache to store the responses in.
+            timeout (Optional[float]): The number of seconds a response is kept for, None to keep it until the graph is
+                written, the timeout of the Django cache by default.
+        """
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self) -> BaseCache:
+        """Return the Django cache storing the responses."""
+        return caches[self.cache_alias]
+
+    def generation(self, graph_id: int) -> str:
+        """
+        Return the current generation token of a graph, adding one if the graph has none yet.
+
+        Args:
+            graph_id (int): The id of the graph.
+
+        Returns:
+            str: The generation token of the graph.
+        """
+        generation_key = self._generation_key(graph_id)
+        generation = self.cache.get(generation_key)
+        if generation is None:
+            self.cache.add(generation_key, uuid.uuid4().hex, timeout=None)
+            generation = self.cache.get(generation_key)
+        return generation
+
+    def get(
+        self, graph_id: int, generation: str, variant: str
+    ) -> Optional[CachedResponse]:
+        """
+        Return the data and the pagination links of a response of a graph.
+
+        Args:
+            graph_id (int): The id of the graph.
+            generation (str): The generation token of the graph.
+            variant (str): The key of the response among the responses of the graph.
+
+        Returns:
+            Optional[CachedResponse]: The data and the pagination links of the response, or None on a miss.
+        """
+        cached = self.cache.get(self._key(graph_id, generation, variant))
+        self._count(hit=cached is not None)
+        return cached
+
+    def set(
+        self, graph_id: int, generation: str, variant: str, cached: CachedResponse
+    ) -> bool:
+        """
+        Store the data and the pagination links of a response of a graph, read under a generation of the graph.
+
+        Args:
+            graph_id (int): The id of the graph.
+            generation (str): The generation token of the graph read before the data of the response.
+            variant (str): The key of the response among the responses of the graph.
+            cached (CachedResponse): The data and the pagination links of the response.
+
+        Returns:
+            bool: Whether the response was stored, False if the graph was invalidated since the generation was read.
+        """
+        if self.cache.get(self._generation_key(graph_id)) != generation:
+            return False
+        self.cache.set(
+            self._key(graph_id, generation, variant), cached, timeout=self.timeout
+        )
+        return True
+
+    def invalidate(self, graph_id: int) -> None:
+        """
+        Invalidate every cached response of a graph, by replacing its generation token.
+
+        Args:
+            graph_id (int): The id of the graph.
+        """
+        self.cache.set(self._generation_key(graph_id), uuid.uuid4().hex, timeout=None)
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return the counters of the cache.
+
+        Returns:
+            Dict[str, float]: The number of hits, misses and invalidations, and the hit ratio.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+    def _generation_key(self, graph_id: int) -> str:
+        return f"{self.key_prefix}:{graph_id}"
+
+    def _key(self, graph_id: int, generation: str, variant: str) -> str:
+        digest = hashlib.md5(variant.encode()).hexdigest()
+        return f"{self.key_prefix}:{graph_id}:{generation}:{digest}"
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+class GraphCacheMixin:
+    """A viewset mixin serving the responses of the list and retrieve actions of a graph from the graph cache."""
+
+    def get_cached_graph_id(self) -> Optional[int]:
+        """
+        Return the id of the graph whose data the request reads, None if the response is not cached.
+
+        Returns:
+            Optional[int]: The id of the graph.
+        """
+        return None
+
+    async def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        """
+        Return a page of the objects, from the graph cache when it holds the page.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: The response of the list action.
+        """
+        return await self.cached(super().list, request, *args, **kwargs)
+
+    async def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        """
+        Return the object of the URL, from the graph cache when it holds the object.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: The response of the retrieve action.
+        """
+        return await self.cached(super().retrieve, request, *args, **kwargs)
+
+    async def cached(
+        self,
+        handler: Callable[..., Awaitable[Response]],
+        request: Request,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Response:
+        """
+        Return the cached response of the request, or run the handler and cache its successful response.
+
+        The data is cached rather than the rendered response, so that the JSON and MessagePack clients share the
+        entries. The responses are keyed by the host and the full path of the request, since the pagination links
+        depend on them. The generation of the graph is read before the handler reads the database, so that a response
+        read before a write committed during the request is never stored under the generation of that write.
+
+        Args:
+            handler (Callable[..., Awaitable[Response]]): The handler of the action.
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: The cached response, or the response of the handler.
+        """
+        graph_id = self.get_cached_graph_id()
+        if graph_id is None or not settings.GRAPH_CACHE["ENABLED"]:
+            return await handler(request, *args, **kwargs)
+        graph_cache = get_graph_cache()
+        variant = f"{self.action}:{request.get_host()}{request.get_full_path()}"
+        generation = await sync_to_async(graph_cache.generation)(graph_id)
+        cached = await sync_to_async(graph_cache.get)(graph_id, generation, variant)
+        if cached is not None:
+            data, pagination = cached
+            response = Response(data, status=status.HTTP_200_OK)
+            if pagination is not None:
+                response.pagination = pagination
+            return response
+        response = await handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cached = (response.data, getattr(response, "pagination", None))
+            await sync_to_async(graph_cache.set)(graph_id, generation, variant, cached)
+        return response
+
+
+_graph_cache: Optional[GraphCache] = None
+
+
+def get_graph_cache() -> GraphCache:
+    """
+    Return the process-wide graph cache, creating it from the GRAPH_CACHE setting on first use.
+
+    Returns:
+        GraphCache: The graph cache.
+    """
+    global _graph_cache
+    if _graph_cache is None:
+        _graph_cache = GraphCache(**settings.GRAPH_CACHE["OPTIONS"])
+    return _graph_cache
+
+
+def invalidate_graph_cache(*graph_ids: int) -> None:
+    """
+    Invalidate the cached responses of graphs now, and again when the current transaction is committed.
+
+    The bulk writes of the equations send no model signal, so they invalidate the cache of their graph explicitly.
+
+    Args:
+        *graph_ids (int): The ids of the graphs written.
+    """
+    graph_cache = get_graph_cache()
+
+    def invalidate() -> None:
+        for graph_id in set(graph_ids):
+            graph_cache.invalidate(graph_id)
+
+    invalidate()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender="dm_backend.Graph")
+@receiver(post_delete, sender="dm_backend.Graph")
+def invalidate_saved_graph(sender: type, instance: Any, **kwargs: Any) -> None:
+    """Invalidate the cached responses of a graph saved or deleted."""
+    invalidate_graph_cache(instance.id)
+
+
+@receiver(post_save, sender="dm_backend.Equation")
+@receiver(post_delete, sender="dm_backend.Equation")
+def invalidate_saved_equation(sender: type, instance: Any, **kwargs: Any) -> None:
+    """Invalidate the cached responses of the graph of an equation saved or deleted."""
+    invalidate_graph_cache(instance.graph_id)
+
+
+@receiver(setting_changed)
+def reset_graph_cache(setting: str, **kwargs: Any) -> None:
+    """Drop the graph cache when the GRAPH_CACHE setting is overridden, so that it is created again from it."""
+    global _graph_cache
+    if setting == "GRAPH_CACHE":
+        _graph_cache = None
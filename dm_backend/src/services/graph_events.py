@@ -0,0 +1,580 @@
+"""
+This module contains the fan-out of the live updates of the graphs, pushed to their editors instead of being polled.
+
+The changes made to the equations of a graph are recorded where they are written, and published once the transaction
+writing them is committed, so that a rolled back change is never published:
+
+- The changes recorded within a transaction are coalesced per equation, so that an equation created and then parsed
+  again is published once as created, and an equation created and then deleted is not published at all.
+- The created and updated equations are published with their committed fields, fetched with a single query.
+- The events are fanned out by a pluggable broker, to the subscribers of the graph and to a short history of the graph,
+  so that a subscriber reconnecting with the id of the last event it received replays the events it missed.
+
+The broker is selected with the GRAPH_EVENTS setting:
+
+- GraphEventBroker: A base class for the brokers, delivering the published events to the subscribers of this process.
+- InMemoryGraphEventBroker: An in-process broker. It only receives the events published by the same process, so it is
+  meant for a single server process and for the tests.
+- PostgresGraphEventBroker: A broker sharing the events between the server processes with the LISTEN and NOTIFY
+  commands of PostgreSQL, this is the default broker on PostgreSQL. The ids of the events are taken from a sequence of
+  the database, so that a subscriber reconnecting to another process replays the events it missed from there.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import select
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DatabaseError, connections, transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from ..models.equation import Equation
+
+EQUATION_CREATED = "equation.created"
+EQUATION_UPDATED = "equation.updated"
+EQUATION_DELETED = "equation.deleted"
+GRAPH_DELETED = "graph.deleted"
+GRAPH_RESET = "graph.reset"
+EVENT_ID_SEQUENCE = "dm_backend_graph_event_id"
+
+logger = logging.getLogger(__name__)
+
+EVENT_FIELDS = [
+    "id",
+    "equation",
+    "parsed_equation",
+    "color",
+    "line_style",
+    "line_width",
+]
+
+
+@dataclass(frozen=True)
+class GraphEvent:
+    """
+    An event published to the subscribers of a graph.
+
+    Attributes:
+        id (int): The id of the event, increasing with each event published by the broker.
+        graph_id (int): The id of the graph.
+        type (str): The type of the event, such as equation.created.
+        data (Dict[str, Any]): The fields of the created or updated equation, or the id of the deleted one.
+    """
+
+    id: int
+    graph_id: int
+    type: str
+    data: Dict[str, Any]
+
+
+class GraphEventSubscription:
+    """The events of a graph delivered to a subscriber, consumed from the event loop that subscribed."""
+
+    def __init__(self, graph_id: int, max_pending: int) -> None:
+        """
+        Initialize the subscription in the running event loop.
+
+        Args:
+            graph_id (int): The id of the graph.
+            max_pending (int): The maximum number of events waiting to be consumed before the subscription is closed.
+        """
+        self.graph_id = graph_id
+        self.max_pending = max_pending
+        self.closed = False
+        self._loop = asyncio.get_running_loop()
+        self._queue: "asyncio.Queue[Optional[GraphEvent]]" = asyncio.Queue()
+
+    def deliver(self, event: GraphEvent) -> None:
+        """
+        Deliver an event from any thread, closing the subscription if too many events are waiting to be consumed.
+
+        Args:
+            event (GraphEvent): The event.
+        """
+        try:
+            self._loop.call_soon_threadsafe(self.put, event)
+        except RuntimeError:
+            self.closed = True
+
+    async def get(self) -> Optional[GraphEvent]:
+        """
+        Wait for the next event.
+
+        Returns:
+            Optional[GraphEvent]: The event, or None once the subscription is closed for falling behind, in which case
+                the subscriber reconnects and replays the events it missed from the history of the graph.
+        """
+        if self.closed and self._queue.empty():
+            return None
+        return await self._queue.get()
+
+    def put(self, event: Optional[GraphEvent]) -> None:
+        """
+        Queue an event from the event loop of the subscriber, or the end of the subscription if it fell behind.
+
+        Args:
+            event (Optional[GraphEvent]): The event, or None to close the subscription.
+        """
+        if self.closed:
+            return
+        if self._queue.qsize() >= self.max_pending:
+            event = None
+        self._queue.put_nowait(event)
+        if event is None:
+            self.closed = True
+
+
+class GraphEventBroker(ABC):
+    """A base class for the brokers of the graph events, delivering them to the subscribers of this process."""
+
+    def __init__(
+        self, history: int = 100, max_graphs: int = 1024, max_pending: int = 100
+    ) -> None:
+        """
+        Initialize the broker.
+
+        Args:
+            history (int): The number of latest events kept per graph, to be replayed to reconnecting subscribers.
+            max_graphs (int): The maximum number of graphs whose latest events are kept, the least recently changed
+                ones being dropped first.
+            max_pending (int): The maximum number of events waiting to be consumed by a subscriber.
+        """
+        self.history = history
+        self.max_graphs = max_graphs
+        self.max_pending = max_pending
+        self._subscriptions: Dict[int, Set[GraphEventSubscription]] = {}
+        self._history: "OrderedDict[int, Deque[GraphEvent]]" = OrderedDict()
+        self._evicted: Dict[int, int] = {}
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def publish(self, graph_id: int, type: str, data: Dict[str, Any]) -> None:
+        """Publish an event to the subscribers of a graph, in every process served by the broker."""
+
+    def deliver(self, event: GraphEvent) -> None:
+        """
+        Keep an event in the history of its graph, and deliver it to the subscribers of the graph in this process.
+
+        Args:
+            event (GraphEvent): The event.
+        """
+        with self._lock:
+            self._last_id = max(self._last_id, event.id)
+            events = self._history.setdefault(event.graph_id, deque())
+            self._history.move_to_end(event.graph_id)
+            events.append(event)
+            if len(events) > self.history:
+                self._evicted[event.graph_id] = events.popleft().id
+            while len(self._history) > self.max_graphs:
+                graph_id, _ = self._history.popitem(last=False)
+                self._evicted.pop(graph_id, None)
+            subscriptions = list(self._subscriptions.get(event.graph_id, ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+    def subscribe(
+        self, graph_id: int, last_event_id: Optional[int] = None
+    ) -> GraphEventSubscription:
+        """
+        Subscribe to the events of a graph from the running event loop.
+
+        Args:
+            graph_id (int): The id of the graph.
+            last_event_id (Optional[int]): The id of the last event received before reconnecting, to replay the events
+                published since then. A graph.reset event is delivered instead when they are no longer all kept, so
+                that the subscriber fetches the graph again.
+
+        Returns:
+            GraphEventSubscription: The subscription, to be closed with unsubscribe.
+        """
+        subscription = GraphEventSubscription(graph_id, self.max_pending)
+        with self._lock:
+            self._subscriptions.setdefault(graph_id, set()).add(subscription)
+            if last_event_id is None:
+                return subscription
+            events = self._history.get(graph_id)
+            if (
+                events is None
+                or last_event_id > self._last_id
+                or last_event_id < self._evicted.get(graph_id, 0)
+            ):
+                missed = [GraphEvent(self._last_id, graph_id, GRAPH_RESET, {})]
+            else:
+                missed = [event for event in events if event.id > last_event_id]
+        for event in missed:
+            subscription.put(event)
+        return subscription
+
+    def unsubscribe(self, subscription: GraphEventSubscription) -> None:
+        """
+        Stop delivering the events of a graph to a subscription.
+
+        Args:
+            subscription (GraphEventSubscription): The subscription.
+        """
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.graph_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.graph_id, None)
+        subscription.closed = True
+
+    def subscribers(self, graph_id: int) -> int:
+        """
+        Return the number of subscribers of a graph in this process.
+
+        Args:
+            graph_id (int): The id of the graph.
+
+        Returns:
+            int: The number of subscribers.
+        """
+        with self._lock:
+            return len(self._subscriptions.get(graph_id, ()))
+
+
+class InMemoryGraphEventBroker(GraphEventBroker):
+    """An in-process broker of the graph events, delivering them to the subscribers of the publishing process."""
+
+    def __init__(
+        self, history: int = 100, max_graphs: int = 1024, max_pending: int = 100
+    ) -> None:
+        """
+        Initialize the broker.
+
+        Args:
+            history (int): The number of latest events kept per graph, to be replayed to reconnecting subscribers.
+            max_graphs (int): The maximum number of graphs whose latest events are kept.
+            max_pending (int): The maximum number of events waiting to be consumed by a subscriber.
+        """
+        super().__init__(history, max_graphs, max_pending)
+        self._ids = itertools.count(1)
+
+    def publish(self, graph_id: int, type: str, data: Dict[str, Any]) -> None:
+        """
+        Publish an event to the subscribers of a graph in this process.
+
+        Args:
+            graph_id (int): The id of the graph.
+            type (str): The type of the event.
+            data (Dict[str, Any]): The data of the event.
+        """
+        with self._lock:
+            event_id = next(self._ids)
+        self.deliver(GraphEvent(event_id, graph_id, type, data))
+
+
+class PostgresGraphEventBroker(GraphEventBroker):
+    """
+    A broker of the graph events shared by the server processes through the LISTEN and NOTIFY commands of PostgreSQL.
+
+    Every process listening on the channel of the broker receives every event, including the ones it published, from a
+    thread holding a database connection of its own, and delivers them to its subscribers. The notifications are sent
+    when the transaction publishing them is committed, and are lost while a process is not connected.
+    """
+
+    def __init__(
+        self,
+        history: int = 100,
+        max_graphs: int = 1024,
+        max_pending: int = 100,
+        channel: str = "dm_backend_graph_events",
+        alias: str = "default",
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        """
+        Initialize the broker, without connecting until it is first used.
+
+        Args:
+            history (int): The number of latest events kept per graph, to be replayed to reconnecting subscribers.
+            max_graphs (int): The maximum number of graphs whose latest events are kept.
+            max_pending (int): The maximum number of events waiting to be consumed by a subscriber.
+            channel (str): The channel of the notifications.
+            alias (str): The alias of the PostgreSQL database in the DATABASES setting.
+            reconnect_delay (float): The number of seconds waited before listening again after losing the connection.
+        """
+        super().__init__(history, max_graphs, max_pending)
+        self.channel = channel
+        self.alias = alias
+        self.reconnect_delay = reconnect_delay
+        self._listener: Optional[threading.Thread] = None
+        self._listening = threading.Event()
+        self._stopped = threading.Event()
+
+    def publish(self, graph_id: int, type: str, data: Dict[str, Any]) -> None:
+        """
+        Notify every process listening on the channel of an event of a graph, with an id taken from the sequence.
+
+        Args:
+            graph_id (int): The id of the graph.
+            type (str): The type of the event.
+            data (Dict[str, Any]): The data of the event.
+        """
+        self.listen()
+        payload = json.dumps(
+            {"graph_id": graph_id, "type": type, "data": data}, separators=(",", ":")
+        )
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, nextval(%s)::text || ':' || %s)",
+                [self.channel, EVENT_ID_SEQUENCE, payload],
+            )
+
+    def subscribe(
+        self, graph_id: int, last_event_id: Optional[int] = None
+    ) -> GraphEventSubscription:
+        """
+        Subscribe to the events of a graph from the running event loop, listening to the channel first.
+
+        Args:
+            graph_id (int): The id of the graph.
+            last_event_id (Optional[int]): The id of the last event received before reconnecting.
+
+        Returns:
+            GraphEventSubscription: The subscription, to be closed with unsubscribe.
+        """
+        self.listen()
+        return super().subscribe(graph_id, last_event_id)
+
+    def listen(self, timeout: Optional[float] = None) -> bool:
+        """
+        Start the thread listening to the channel in this process, unless it is already started.
+
+        Args:
+            timeout (Optional[float]): The number of seconds waited for the thread to listen, 0 to not wait.
+
+        Returns:
+            bool: Whether the thread listens to the channel.
+        """
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._stopped.clear()
+                self._listener = threading.Thread(
+                    target=self._listen_forever,
+                    name="graph-events-listener",
+                    daemon=True,
+                )
+                self._listener.start()
+        return self._listening.wait(0 if timeout is None else timeout)
+
+    def stop(self) -> None:
+        """Stop the thread listening to the channel, once its current wait is over."""
+        self._stopped.set()
+
+    def _listen_forever(self) -> None:
+        """Listen to the channel until the broker is stopped, connecting again whenever the connection is lost."""
+        connection = connections[self.alias]
+        while not self._stopped.is_set():
+            try:
+                connection.ensure_connection()
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                self._listening.set()
+                self._receive(connection.connection)
+            except DatabaseError:
+                logger.exception("Lost the connection listening to the graph events")
+            except Exception:
+                logger.exception("Failed to receive the graph events")
+            finally:
+                self._listening.clear()
+                connection.close()
+            self._stopped.wait(self.reconnect_delay)
+
+    def _receive(self, raw_connection: Any) -> None:
+        """
+        Deliver the notifications received on a connection until the broker is stopped.
+
+        Args:
+            raw_connection (Any): The psycopg2 connection listening to the channel.
+        """
+        while not self._stopped.is_set():
+            if select.select([raw_connection], [], [], 1.0) == ([], [], []):
+                continue
+            raw_connection.poll()
+            while raw_connection.notifies:
+                notification = raw_connection.notifies.pop(0)
+                self.deliver(parse_notification(notification.payload))
+
+
+def parse_notification(payload: str) -> GraphEvent:
+    """
+    Parse the payload of a notification sent by a PostgresGraphEventBroker.
+
+    Args:
+        payload (str): The id of the event, and its graph, type and data as JSON, separated by a colon.
+
+    Returns:
+        GraphEvent: The event.
+    """
+    event_id, _, content = payload.partition(":")
+    event = json.loads(content)
+    return GraphEvent(int(event_id), event["graph_id"], event["type"], event["data"])
+
+
+class GraphChanges:
+    """The changes made to the equations of the graphs within a transaction, coalesced per equation."""
+
+    def __init__(self) -> None:
+        """Initialize the empty changes."""
+        self.equations: Dict[int, Dict[int, str]] = {}
+        self.deleted_graphs: List[int] = []
+
+    def record(self, graph_id: int, type: str, equation_ids: Iterable[int]) -> None:
+        """
+        Record a change made to equations of a graph, merged with the previous change of each equation.
+
+        Args:
+            graph_id (int): The id of the graph.
+            type (str): The type of the change, equation.created, equation.updated or equation.deleted.
+            equation_ids (Iterable[int]): The ids of the changed equations.
+        """
+        changes = self.equations.setdefault(graph_id, {})
+        for equation_id in equation_ids:
+            previous = changes.get(equation_id)
+            if previous == EQUATION_CREATED and type == EQUATION_DELETED:
+                del changes[equation_id]
+            elif previous != EQUATION_CREATED:
+                changes[equation_id] = type
+
+    def on_commit(self) -> None:
+        """Publish the changes once the transaction that made them is committed, and start new ones afterwards."""
+        if getattr(_local, "changes", None) is self:
+            _local.changes = None
+        self.publish(get_graph_event_broker())
+
+    def publish(self, broker: GraphEventBroker) -> None:
+        """
+        Publish the changes, with the committed fields of the created and updated equations.
+
+        Args:
+            broker (GraphEventBroker): The broker of the graph events.
+        """
+        equation_ids = [
+            equation_id
+            for changes in self.equations.values()
+            for equation_id, type in changes.items()
+            if type != EQUATION_DELETED
+        ]
+        equations = Equation.objects.in_bulk(equation_ids) if equation_ids else {}
+        for graph_id, changes in self.equations.items():
+            for equation_id, type in changes.items():
+                if type == EQUATION_DELETED:
+                    broker.publish(graph_id, type, {"id": equation_id})
+                elif equation_id in equations:
+                    broker.publish(
+                        graph_id, type, equation_event_data(equations[equation_id])
+                    )
+        for graph_id in self.deleted_graphs:
+            broker.publish(graph_id, GRAPH_DELETED, {"id": graph_id})
+
+
+_local = threading.local()
+
+
+def equation_event_data(equation: Equation) -> Dict[str, Any]:
+    """
+    Return the fields of an equation published in an event, as serialized by the equation views.
+
+    Args:
+        equation (Equation): The equation.
+
+    Returns:
+        Dict[str, Any]: The fields of the equation.
+    """
+    return {field: getattr(equation, field) for field in EVENT_FIELDS} | {
+        "graph": equation.graph_id
+    }
+
+
+def current_changes() -> GraphChanges:
+    """
+    Return the changes of the current transaction, publishing them once it is committed.
+
+    The changes are dropped with the transaction when it is rolled back, since they are only published by its commit
+    callback, and a new list of changes is started when that callback is no longer registered.
+
+    Returns:
+        GraphChanges: The changes of the current transaction.
+    """
+    connection = transaction.get_connection()
+    changes = getattr(_local, "changes", None)
+    if changes is not None and any(
+        callback == changes.on_commit for _, callback, *_ in connection.run_on_commit
+    ):
+        return changes
+    changes = _local.changes = GraphChanges()
+    transaction.on_commit(changes.on_commit)
+    return changes
+
+
+def record_equation_changes(
+    graph_id: int, type: str, equation_ids: Iterable[int]
+) -> None:
+    """
+    Record a change made to equations of a graph, to be published once the current transaction is committed.
+
+    Args:
+        graph_id (int): The id of the graph.
+        type (str): The type of the change, equation.created, equation.updated or equation.deleted.
+        equation_ids (Iterable[int]): The ids of the changed equations.
+    """
+    equation_ids = list(equation_ids)
+    if not equation_ids:
+        return
+    if not transaction.get_connection().in_atomic_block:
+        changes = GraphChanges()
+        changes.record(graph_id, type, equation_ids)
+        changes.publish(get_graph_event_broker())
+        return
+    current_changes().record(graph_id, type, equation_ids)
+
+
+def record_graph_deleted(graph_id: int) -> None:
+    """
+    Record the deletion of a graph, to be published once the current transaction is committed.
+
+    Args:
+        graph_id (int): The id of the graph.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        get_graph_event_broker().publish(graph_id, GRAPH_DELETED, {"id": graph_id})
+        return
+    changes = current_changes()
+    changes.equations.pop(graph_id, None)
+    changes.deleted_graphs.append(graph_id)
+
+
+_graph_event_broker: Optional[GraphEventBroker] = None
+
+
+def get_graph_event_broker() -> GraphEventBroker:
+    """
+    Return the graph event broker of the current process, creating it from the GRAPH_EVENTS setting on first use.
+
+    Returns:
+        GraphEventBroker: The broker of the graph events.
+    """
+    global _graph_event_broker
+    if _graph_event_broker is None:
+        config = settings.GRAPH_EVENTS
+        broker_class = import_string(config["BACKEND"])
+        _graph_event_broker = broker_class(**config.get("OPTIONS", {}))
+    return _graph_event_broker
+
+
+@receiver(setting_changed)
+def reset_graph_event_broker(setting: str, **kwargs: Any) -> None:
+    """Drop the broker when the GRAPH_EVENTS setting is overridden, so that it is created again from it."""
+    global _graph_event_broker
+    if setting == "GRAPH_EVENTS":
+        _graph_event_broker = None
@@ -0,0 +1,158 @@
+"""
+This module keeps the parsed equations stored in the database consistent with the equations of their graph.
+
+The parsed form of an equation depends on the equation and on every equation defined before it in the graph, so each
+equation stores the key of the prefix of the graph ending with it, as computed by the session prefix store. Once the
+equations of a graph are written and committed, only the graphs holding an equation whose key changed are parsed
+again, with the parse cache and the parser pool used by the equation parser views, and only the equations whose key
+changed are updated.
+
+The equations are parsed outside of any transaction, under a single deadline, so that the rows of the graph are not
+locked while the parser pool works. The parsed equations are then written in a short transaction holding the locks of
+the graph and of its equations, and only to the equations whose key is still the one parsed, since the equations
+changed in between are parsed again by the write that changed them.
+
+An equation that cannot be parsed keeps its previous parsed equation, and is left out of the graph session so that the
+equations after it are still parsed. An equation whose parsed equation does not fit in its column keeps its previous
+parsed equation as well. An equation whose parse timed out is not invalid, so neither it nor the equations after it,
+which may depend on it, are updated, and they are parsed again on the next write. The equations whose parsed equation
+changed are published as updated to the subscribers of the graph.
+"""
+
+from functools import partial
+from typing import List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+from sympy.parsing.latex import LaTeXParsingError
+
+from ..models.equation import Equation
+from ..models.graph import Graph
+from .graph_cache import invalidate_graph_cache
+from .graph_events import EQUATION_UPDATED, record_equation_changes
+from .parse_cache import get_parse_cache
+from .parser_pool import ParserPoolError, ParserTimeoutError, get_parser_pool
+from .session_prefix_store import SessionPrefixStore
+
+
+def parse_expressions(
+    expressions: List[str], deadline: Optional[float] = None
+) -> List[str]:
+    """
+    Resolve and parse a given list of expressions with the parse cache and the parser pool.
+
+    Args:
+        expressions (List[str]): The expressions to be parsed, in the order they were defined.
+        deadline (Optional[float]): The deadline of the parse, computed from the request timeout by default.
+
+    Returns:
+        List[str]: The parsed expressions.
+
+    Raises:
+        LaTeXParsingError: If one of the expressions cannot be resolved or parsed.
+        ParserPoolError: If the pool cannot parse the expressions in time.
+    """
+    return get_parse_cache().get_or_parse(
+        expressions, partial(get_parser_pool().parse_expressions, deadline=deadline)
+    )
+
+
+def parse_valid_expressions(
+    expressions: List[str], deadline: Optional[float] = None
+) -> List[Optional[str]]:
+    """
+    Resolve and parse a given list of expressions, skipping the ones that cannot be parsed.
+
+    The whole list is parsed at once first. When it fails, the expressions are parsed one by one after the valid ones
+    before them, which only executes one more expression each time thanks to the session prefix store. Every parse
+    shares the same deadline, so that the whole list takes at most the request timeout, and the expressions are only
+    parsed up to the first one that times out, since the ones after it may depend on it.
+
+    Args:
+        expressions (List[str]): The expressions to be parsed, in the order they were defined.
+        deadline (Optional[float]): The deadline of the parses, computed from the request timeout by default.
+
+    Returns:
+        List[Optional[str]]: The parsed expressions up to the first one that timed out, with None in place of the ones
+            that cannot be parsed.
+
+    Raises:
+        ParserPoolError: If the pool is unavailable.
+    """
+    if deadline is None:
+        deadline = get_parser_pool().deadline()
+    try:
+        return parse_expressions(expressions, deadline)
+    except (LaTeXParsingError, ParserTimeoutError):
+        pass
+    valid_expressions, parsed_expressions = [], []
+    for expression in expressions:
+        try:
+            parsed_expressions.append(
+                parse_expressions(valid_expressions + [expression], deadline)[-1]
+            )
+            valid_expressions.append(expression)
+        except LaTeXParsingError:
+            parsed_expressions.append(None)
+        except ParserTimeoutError:
+            break
+    return parsed_expressions
+
+
+def update_parsed_equations(graph: Graph) -> List[Equation]:
+    """
+    Parse the equations of a graph again when their source changed, and store the parsed equations that changed.
+
+    Nothing is parsed when the source of every equation is unchanged, and nothing is updated when the parser pool is
+    unavailable, so that the equations are parsed again on the next write. This function must be called once the
+    write of the equations is committed, so that no lock is held while they are parsed.
+
+    Args:
+        graph (Graph): The graph whose equations were written.
+
+    Returns:
+        List[Equation]: The equations of the graph, ordered by id.
+    """
+    equations = list(graph.equation_set.order_by("id"))
+    keys = SessionPrefixStore.prefix_keys([equation.equation for equation in equations])
+    if all(equation.source_hash == key for equation, key in zip(equations, keys)):
+        return equations
+    try:
+        parsed_equations = parse_valid_expressions(
+            [equation.equation for equation in equations]
+        )
+    except ParserPoolError:
+        return equations
+    max_length = Equation._meta.get_field("parsed_equation").max_length
+    parsed_by_key = {
+        key: None if parsed is not None and len(parsed) > max_length else parsed
+        for key, parsed in zip(keys, parsed_equations)
+    }
+    with transaction.atomic():
+        equations = list(
+            graph.equation_set.select_related("graph")
+            .select_for_update()
+            .order_by("id")
+        )
+        keys = SessionPrefixStore.prefix_keys(
+            [equation.equation for equation in equations]
+        )
+        updated, reparsed = [], []
+        for equation, key in zip(equations, keys):
+            if equation.source_hash == key or key not in parsed_by_key:
+                continue
+            equation.source_hash = key
+            parsed_equation = parsed_by_key[key]
+            if (
+                parsed_equation is not None
+                and parsed_equation != equation.parsed_equation
+            ):
+                equation.parsed_equation = parsed_equation
+                reparsed.append(equation.id)
+            updated.append(equation)
+        Equation.objects.bulk_update(updated, ["parsed_equation", "source_hash"])
+        if reparsed:
+            Graph.objects.filter(id=graph.id).update(updated=timezone.now())
+            invalidate_graph_cache(graph.id)
+            record_equation_changes(graph.id, EQUATION_UPDATED, reparsed)
+    return equations
@@ -0,0 +1,679 @@
+"""
+This module contains the performance metrics of the server, exposed in the text format of Prometheus.
+
+The metrics are kept in the memory of the server process, without any dependency, and are rendered by the metrics view:
+
+- Gauge and Histogram: The metric types, whose samples are labelled by the names given to the metric.
+- MetricsRegistry: The metrics of the process, rendered in the Prometheus text exposition format, along with the ones
+  of the other server processes sharing its metrics directory.
+- metrics_middleware: Records the latency of every request along with the number and time of its SQL queries, and
+  the time spent in the serializers and in the renderers, labelled by the name of the view of the URL.
+
+The SQL queries are counted by a wrapper installed on every database connection, and the serializer and renderer times
+are measured by the views and renderers with the measure context manager. They are added to the metrics of the current
+request, which follow the request into the threads of sync_to_async. The parse time of every expression is recorded by
+the parser pool.
+
+When the server is run by several processes, each process writes a snapshot of its metrics to the metrics directory
+at most once every write interval, and when it exits. The process answering the scrape adds up the snapshots of every
+process, so the histograms count the requests answered by any process, dead or alive, while the gauges only count the
+processes still running. The directory must be emptied when the server starts, which the entrypoint of the image does.
+
+The metrics are only served to the addresses of the allowed networks, or to the requests bearing the metrics token.
+"""
+
+import asyncio
+import atexit
+import hmac
+import ipaddress
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse
+from django.utils.decorators import sync_and_async_middleware
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+Labels = Tuple[str, ...]
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """
+    Format the labels of a sample.
+
+    Args:
+        names (Sequence[str]): The names of the labels.
+        values (Sequence[str]): The values of the labels.
+
+    Returns:
+        str: The labels between braces, with their values escaped, or an empty string if there are none.
+    """
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def format_value(value: float) -> str:
+    """
+    Format the value of a sample.
+
+    Args:
+        value (float): The value.
+
+    Returns:
+        str: The value, with the infinities written as +Inf and -Inf.
+    """
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """A base class for the metrics, whose samples are labelled by the values of the label names."""
+
+    type = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        """
+        Initialize the metric.
+
+        Args:
+            name (str): The name of the metric.
+            documentation (str): The help text of the metric.
+            labelnames (Sequence[str]): The names of the labels of the samples.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, Any] = {}
+        self._lock = threading.Lock()
+
+    def labels_of(self, labels: Dict[str, str]) -> Labels:
+        """
+        Return the values of the labels of a sample, in the order of the label names.
+
+        Args:
+            labels (Dict[str, str]): The labels of the sample.
+
+        Returns:
+            Labels: The values of the labels.
+
+        Raises:
+            ValueError: If the labels are not the label names of the metric.
+        """
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects the labels {', '.join(self.labelnames)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def values(self) -> Dict[Labels, Any]:
+        """Return a copy of the value of every sample of the metric, by the values of its labels."""
+        with self._lock:
+            return {
+                labels: list(value) if isinstance(value, list) else value
+                for labels, value in self._values.items()
+            }
+
+    def combine(self, value: Any, other: Any) -> Any:
+        """
+        Add up the values of a sample in two processes.
+
+        Args:
+            value (Any): The value of the sample in a process.
+            other (Any): The value of the sample in another process.
+
+        Returns:
+            Any: The value of the sample in both processes.
+        """
+        return value + other
+
+    def samples(
+        self, values: Optional[Dict[Labels, Any]] = None
+    ) -> List[Tuple[str, str, float]]:
+        """Return the name suffix, the formatted labels and the value of every sample, or of the given values."""
+        if values is None:
+            values = self.values()
+        return [
+            ("", format_labels(self.labelnames, labels), value)
+            for labels, value in values.items()
+        ]
+
+    def render(self, values: Optional[Dict[Labels, Any]] = None) -> str:
+        """
+        Render the metric in the Prometheus text exposition format.
+
+        Args:
+            values (Optional[Dict[Labels, Any]]): The values of the samples, the ones of the metric by default.
+
+        Returns:
+            str: The help and type lines of the metric, followed by its samples.
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for suffix, labels, value in self.samples(values):
+            lines.append(f"{self.name}{suffix}{labels} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Remove every sample of the metric."""
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Metric):
+    """A metric whose value goes up and down."""
+
+    type = "gauge"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """
+        Increment the gauge of the labels.
+
+        Args:
+            amount (float): The amount to add, negative to decrement the gauge.
+            **labels (str): The labels of the sample.
+        """
+        key = self.labels_of(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        """
+        Decrement the gauge of the labels.
+
+        Args:
+            amount (float): The amount to subtract.
+            **labels (str): The labels of the sample.
+        """
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """A metric counting observations in cumulative buckets, along with their sum."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        """
+        Initialize the histogram.
+
+        Args:
+            name (str): The name of the metric.
+            documentation (str): The help text of the metric.
+            labelnames (Sequence[str]): The names of the labels of the samples.
+            buckets (Sequence[float]): The upper bounds of the buckets, a last +Inf bucket is always added.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Count an observation in the buckets of the labels.
+
+        Args:
+            value (float): The observed value.
+            **labels (str): The labels of the sample.
+        """
+        key = self.labels_of(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * len(self.buckets) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-1] += value
+
+    def combine(self, value: List[float], other: List[float]) -> List[float]:
+        """Add up the bucket counts and the sums of the observations of a label in two processes."""
+        return [count + other_count for count, other_count in zip(value, other)]
+
+    def samples(
+        self, values: Optional[Dict[Labels, Any]] = None
+    ) -> List[Tuple[str, str, float]]:
+        """Return the cumulative buckets, the sum and the count of the observations of every label, or of given ones."""
+        if values is None:
+            values = self.values()
+        samples = []
+        labelnames = self.labelnames + ("le",)
+        for labels, counts in values.items():
+            for bound, count in zip(self.buckets, counts):
+                samples.append(
+                    (
+                        "_bucket",
+                        format_labels(
+                            labelnames, labels + (format_value(float(bound)),)
+                        ),
+                        count,
+                    )
+                )
+            samples.append(("_sum", format_labels(self.labelnames, labels), counts[-1]))
+            samples.append(
+                ("_count", format_labels(self.labelnames, labels), counts[-2])
+            )
+        return samples
+
+
+def process_running(pid: int) -> bool:
+    """
+    Return whether a process is running.
+
+    Args:
+        pid (int): The id of the process.
+
+    Returns:
+        bool: Whether a process with the id exists.
+    """
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class MetricsRegistry:
+    """The metrics of the process, shared with the other processes through the files of a metrics directory."""
+
+    def __init__(self) -> None:
+        """Initialize the registry, without any metric."""
+        self.metrics: List[Metric] = []
+        self._pid: Optional[int] = None
+        self._filename = ""
+        self._written = 0.0
+        self._write_lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Add a metric to the registry.
+
+        Args:
+            metric (Metric): The metric.
+
+        Returns:
+            Metric: The metric.
+        """
+        self.metrics.append(metric)
+        return metric
+
+    def snapshot(self) -> Dict[str, List[Tuple[Labels, Any]]]:
+        """Return the samples of every metric, by the name of the metric."""
+        return {metric.name: list(metric.values().items()) for metric in self.metrics}
+
+    def filename(self) -> str:
+        """
+        Return the name of the snapshot file of the process.
+
+        The name holds the id of the process, and a random part which is drawn again when the process is forked, so that
+        two processes never share the same file even when a process id is reused.
+
+        Returns:
+            str: The name of the file.
+        """
+        pid = os.getpid()
+        if self._pid != pid:
+            self._pid = pid
+            self._filename = f"metrics-{pid}-{uuid.uuid4().hex}.json"
+        return self._filename
+
+    def write(self, directory: str) -> None:
+        """
+        Write the snapshot of the metrics of the process to the metrics directory, atomically replacing the last one.
+
+        Args:
+            directory (str): The metrics directory.
+        """
+        with self._write_lock:
+            if self._pid != os.getpid():
+                atexit.register(self.write, directory)
+            path = os.path.join(directory, self.filename())
+            os.makedirs(directory, exist_ok=True)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+                json.dump(self.snapshot(), file)
+            os.replace(f"{path}.tmp", path)
+            self._written = time.monotonic()
+
+    def sync(self, directory: Optional[str], interval: float) -> None:
+        """
+        Write the snapshot of the metrics of the process if the last one is older than the write interval.
+
+        Args:
+            directory (Optional[str]): The metrics directory, or None when the metrics are not shared.
+            interval (float): The write interval, in seconds.
+        """
+        if directory is None or time.monotonic() - self._written < interval:
+            return
+        self.write(directory)
+
+    def collect(self, directory: str) -> Dict[str, Dict[Labels, Any]]:
+        """
+        Add up the snapshots of the metrics directory, skipping the gauges of the processes which are not running.
+
+        Args:
+            directory (str): The metrics directory.
+
+        Returns:
+            Dict[str, Dict[Labels, Any]]: The values of the samples of every metric, by the name of the metric.
+        """
+        collected: Dict[str, Dict[Labels, Any]] = {
+            metric.name: {} for metric in self.metrics
+        }
+        for filename in sorted(os.listdir(directory)):
+            if not (filename.startswith("metrics-") and filename.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(directory, filename), encoding="utf-8") as file:
+                    snapshot = json.load(file)
+            except (OSError, ValueError):
+                continue
+            running = process_running(int(filename.split("-")[1]))
+            for metric in self.metrics:
+                if isinstance(metric, Gauge) and not running:
+                    continue
+                values = collected[metric.name]
+                for labels, value in snapshot.get(metric.name, []):
+                    labels = tuple(labels)
+                    values[labels] = (
+                        metric.combine(values[labels], value)
+                        if labels in values
+                        else value
+                    )
+        return collected
+
+    def render(self, directory: Optional[str] = None) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Args:
+            directory (Optional[str]): The metrics directory whose snapshots are added up, after writing the one of the
+                process, or None to render the metrics of the process only.
+
+        Returns:
+            str: The metrics.
+        """
+        if directory is None:
+            return "".join(metric.render() for metric in self.metrics)
+        self.write(directory)
+        collected = self.collect(directory)
+        return "".join(metric.render(collected[metric.name]) for metric in self.metrics)
+
+    def clear(self) -> None:
+        """Remove every sample of the metrics."""
+        for metric in self.metrics:
+            metric.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "The time taken to answer a request, by view, method and status.",
+        ["view", "method", "status"],
+    )
+)
+REQUESTS_IN_PROGRESS = REGISTRY.register(
+    Gauge("http_requests_in_progress", "The number of requests being answered.")
+)
+REQUEST_QUERIES = REGISTRY.register(
+    Histogram(
+        "http_request_db_queries",
+        "The number of SQL queries made to answer a request, by view.",
+        ["view"],
+        QUERY_COUNT_BUCKETS,
+    )
+)
+REQUEST_DB_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_db_duration_seconds",
+        "The time spent in the SQL queries made to answer a request, by view.",
+        ["view"],
+    )
+)
+REQUEST_SERIALIZER_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_serializer_duration_seconds",
+        "The time spent validating and serializing data to answer a request, by view.",
+        ["view"],
+    )
+)
+REQUEST_RENDERER_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_renderer_duration_seconds",
+        "The time spent rendering the response of a request, by view.",
+        ["view"],
+    )
+)
+PARSE_EXPRESSION_DURATION = REGISTRY.register(
+    Histogram(
+        "parser_expression_duration_seconds",
+        "The time taken by the parser to execute and parse a single expression, in the parser workers.",
+    )
+)
+
+
+@dataclass
+class RequestMetrics:
+    """The resources used to answer a request."""
+
+    queries: int = 0
+    db_time: float = 0.0
+    serializer_time: float = 0.0
+    renderer_time: float = 0.0
+
+
+_request_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+def current_request_metrics() -> Optional[RequestMetrics]:
+    """
+    Return the metrics of the request being answered.
+
+    Returns:
+        Optional[RequestMetrics]: The metrics of the request, or None outside of a request.
+    """
+    return _request_metrics.get()
+
+
+@contextmanager
+def measure(stage: str) -> Iterator[None]:
+    """
+    Add the time spent in the block to a stage of the metrics of the current request.
+
+    Args:
+        stage (str): The stage, serializer or renderer.
+    """
+    metrics = current_request_metrics()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        attribute = f"{stage}_time"
+        setattr(
+            metrics,
+            attribute,
+            getattr(metrics, attribute) + time.perf_counter() - start,
+        )
+
+
+def instrument_queries(
+    execute: Callable, sql: str, params: Any, many: bool, context: Dict[str, Any]
+) -> Any:
+    """
+    Count a SQL query and its time in the metrics of the current request, as an execute wrapper of the connections.
+
+    Args:
+        execute (Callable): The function executing the query.
+        sql (str): The SQL of the query.
+        params (Any): The parameters of the query.
+        many (bool): Whether the query is executed for many sets of parameters.
+        context (Dict[str, Any]): The connection and cursor of the query.
+
+    Returns:
+        Any: The result of the query.
+    """
+    metrics = current_request_metrics()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+@receiver(connection_created)
+def install_query_instrumentation(sender: type, connection: Any, **kwargs: Any) -> None:
+    """Install the query instrumentation on a new database connection."""
+    if instrument_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(instrument_queries)
+
+
+def view_name(request: HttpRequest) -> str:
+    """
+    Return the name of the view of a request, used as a label so that the URLs of the same view are aggregated.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        str: The name of the URL pattern of the request, or unmatched when no pattern matched.
+    """
+    resolver_match = getattr(request, "resolver_match", None)
+    if resolver_match is None:
+        return "unmatched"
+    return resolver_match.view_name or resolver_match.route
+
+
+def record_request(
+    request: HttpRequest, status: int, duration: float, metrics: RequestMetrics
+) -> None:
+    """
+    Record the metrics of an answered request.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+        status (int): The status of the response.
+        duration (float): The number of seconds taken to answer the request.
+        metrics (RequestMetrics): The resources used to answer the request.
+    """
+    view = view_name(request)
+    REQUEST_DURATION.observe(
+        duration, view=view, method=request.method, status=str(status)
+    )
+    REQUEST_QUERIES.observe(metrics.queries, view=view)
+    REQUEST_DB_DURATION.observe(metrics.db_time, view=view)
+    REQUEST_SERIALIZER_DURATION.observe(metrics.serializer_time, view=view)
+    REQUEST_RENDERER_DURATION.observe(metrics.renderer_time, view=view)
+    REGISTRY.sync(settings.METRICS["DIRECTORY"], settings.METRICS["WRITE_INTERVAL"])
+
+
+def metrics_allowed(request: HttpRequest) -> bool:
+    """
+    Return whether a request may read the metrics.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        bool: Whether the request bears the metrics token, or comes from an address of the allowed networks.
+    """
+    token = settings.METRICS["TOKEN"]
+    if token and hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS["ALLOWED_NETWORKS"]
+    )
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response: Callable) -> Callable:
+    """
+    Return a middleware recording the metrics of every request, synchronous or asynchronous like the next handler.
+
+    Args:
+        get_response (Callable): The next handler.
+
+    Returns:
+        Callable: The middleware.
+    """
+    if asyncio.iscoroutinefunction(get_response):
+
+        async def middleware(request: HttpRequest) -> HttpResponse:
+            metrics = RequestMetrics()
+            token = _request_metrics.set(metrics)
+            REQUESTS_IN_PROGRESS.inc()
+            start = time.perf_counter()
+            status = 500
+            try:
+                response = await get_response(request)
+                status = response.status_code
+                return response
+            finally:
+                REQUESTS_IN_PROGRESS.dec()
+                _request_metrics.reset(token)
+                record_request(request, status, time.perf_counter() - start, metrics)
+
+        return middleware
+
+    def middleware(request: HttpRequest) -> HttpResponse:
+        metrics = RequestMetrics()
+        token = _request_metrics.set(metrics)
+        REQUESTS_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+            _request_metrics.reset(token)
+            record_request(request, status, time.perf_counter() - start, metrics)
+
+    return middleware
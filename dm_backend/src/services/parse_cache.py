@@ -0,0 +1,312 @@
+"""
+This module contains a content-addressed cache for the results of the equation parser.
+
+The parser results only depend on the ordered list of expressions and on the substitution rules of the graph session,
+so a hash of both is used as the cache key. The storage is delegated to a pluggable backend:
+
+- LocMemParseCacheBackend: An in-process LRU cache with a time to live, this is the default backend.
+- DjangoParseCacheBackend: A backend storing the results in one of the caches of the Django cache framework, under a
+  generation number of its own, so that clearing the results leaves the other entries of a shared cache alone.
+
+The backend is selected with the PARSE_CACHE setting, and the ParseResultCache keeps hit/miss counters on top of it.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .expression_parser import SUB_RULES
+
+ParsedExpressions = List[str]
+
+
+class ParseCacheBackend(ABC):
+    """A base class for the storages of the parse result cache."""
+
+    def __init__(self, max_entries: int = 1024, timeout: Optional[float] = 300) -> None:
+        """
+        Initialize the backend.
+
+        Args:
+            max_entries (int): The maximum number of results kept by the backend.
+            timeout (Optional[float]): The number of seconds a result is kept for, None to keep it forever.
+        """
+        self.max_entries = max_entries
+        self.timeout = timeout
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[ParsedExpressions]:
+        """Return the parsed expressions stored under the key, or None if there is none."""
+
+    @abstractmethod
+    def set(self, key: str, value: ParsedExpressions) -> None:
+        """Store the parsed expressions under the key."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every stored result."""
+
+
+class LocMemParseCacheBackend(ParseCacheBackend):
+    """An in-process parse result storage with LRU and TTL eviction."""
+
+    def __init__(self, max_entries: int = 1024, timeout: Optional[float] = 300) -> None:
+        """
+        Initialize the backend.
+
+        Args:
+            max_entries (int): The maximum number of results kept by the backend.
+            timeout (Optional[float]): The number of seconds a result is kept for, None to keep it forever.
+        """
+        super().__init__(max_entries, timeout)
+        self._entries: "OrderedDict[str, Tuple[Optional[float], ParsedExpressions]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[ParsedExpressions]:
+        """
+        Return the parsed expressions stored under the key, and mark them as recently used.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[ParsedExpressions]: The parsed expressions, or None if there is no live entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: ParsedExpressions) -> None:
+        """
+        Store the parsed expressions under the key, evicting the least recently used entries if needed.
+
+        Args:
+            key (str): The cache key.
+            value (ParsedExpressions): The parsed expressions.
+        """
+        expires_at = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every stored result."""
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoParseCacheBackend(ParseCacheBackend):
+    """
+    A parse result storage backed by the Django cache framework.
+
+    The results are stored with the current generation of the backend as their cache version, and the generation is
+    kept in the cache too, so that every process sharing the cache sees the results cleared at once. The results of
+    the previous generations are left to expire.
+    """
+
+    key_prefix = "parse_cache"
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        timeout: Optional[float] = 300,
+        cache_alias: str = "default",
+    ) -> None:
+        """
+        Initialize the backend.
+
+        The eviction policy and the maximum number of entries are the ones configured on the Django cache itself.
+
+        Args:
+            max_entries (int): Unused, kept for a common backend signature.
+            timeout (Optional[float]): The number of seconds a result is kept for, None to keep it forever.
+            cache_alias (str): The alias of the Django cache to store the results in.
+        """
+        super().__init__(max_entries, timeout)
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self) -> BaseCache:
+        """Return the Django cache used by the backend."""
+        return caches[self.cache_alias]
+
+    @property
+    def generation_key(self) -> str:
+        """Return the cache key of the generation of the backend."""
+        return f"{self.key_prefix}:generation"
+
+    def generation(self) -> int:
+        """
+        Return the current generation of the results, starting at 1.
+
+        Returns:
+            int: The cache version of the results that are not cleared.
+        """
+        return self.cache.get_or_set(self.generation_key, 1, timeout=None)
+
+    def get(self, key: str) -> Optional[ParsedExpressions]:
+        """
+        Return the parsed expressions stored under the key.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[ParsedExpressions]: The parsed expressions, or None if there is no live entry.
+        """
+        return self.cache.get(f"{self.key_prefix}:{key}", version=self.generation())
+
+    def set(self, key: str, value: ParsedExpressions) -> None:
+        """
+        Store the parsed expressions under the key.
+
+        Args:
+            key (str): The cache key.
+            value (ParsedExpressions): The parsed expressions.
+        """
+        self.cache.set(
+            f"{self.key_prefix}:{key}",
+            value,
+            timeout=self.timeout,
+            version=self.generation(),
+        )
+
+    def clear(self) -> None:
+        """Remove every stored result by starting a new generation, the other entries of the Django cache are kept."""
+        self.cache.add(self.generation_key, 1, timeout=None)
+        self.cache.incr(self.generation_key)
+
+
+class ParseResultCache:
+    """A cache for the parser results keyed by a hash of the expressions and of the substitution rules."""
+
+    def __init__(self, backend: ParseCacheBackend) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            backend (ParseCacheBackend): The storage of the cached results.
+        """
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(expressions: List[str], sub_rules: Dict[str, str] = SUB_RULES) -> str:
+        """
+        Compute the cache key of a list of expressions.
+
+        Args:
+            expressions (List[str]): The ordered expressions to be parsed.
+            sub_rules (Dict[str, str]): The substitution rules of the graph session.
+
+        Returns:
+            str: The hex digest identifying the expressions and the substitution rules.
+        """
+        content = json.dumps(
+            [sorted(sub_rules.items()), expressions], separators=(",", ":")
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get_or_parse(
+        self, expressions: List[str], parse: Callable[[List[str]], ParsedExpressions]
+    ) -> ParsedExpressions:
+        """
+        Return the cached parsed expressions, or parse and cache them on a miss.
+
+        Failing parses raise out of this method and are not cached.
+
+        Args:
+            expressions (List[str]): The ordered expressions to be parsed.
+            parse (Callable[[List[str]], ParsedExpressions]): The parser to call on a miss.
+
+        Returns:
+            ParsedExpressions: The parsed expressions.
+        """
+        key = self.make_key(expressions)
+        parsed_expressions = self.backend.get(key)
+        if parsed_expressions is not None:
+            self._count(hit=True)
+            return parsed_expressions
+        self._count(hit=False)
+        parsed_expressions = parse(expressions)
+        self.backend.set(key, parsed_expressions)
+        return parsed_expressions
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return the counters of the cache.
+
+        Returns:
+            Dict[str, float]: The number of hits and misses, and the hit ratio.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        """Remove every cached result and reset the counters."""
+        self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+_parse_cache: Optional[ParseResultCache] = None
+
+
+def get_parse_cache() -> ParseResultCache:
+    """
+    Return the process-wide parse result cache, creating it from the PARSE_CACHE setting on first use.
+
+    Returns:
+        ParseResultCache: The parse result cache.
+    """
+    global _parse_cache
+    if _parse_cache is None:
+        config = settings.PARSE_CACHE
+        backend_class = import_string(config["BACKEND"])
+        _parse_cache = ParseResultCache(backend_class(**config.get("OPTIONS", {})))
+    return _parse_cache
+
+
+@receiver(setting_changed)
+def reset_parse_cache(setting: str, **kwargs: Any) -> None:
+    """Drop the parse result cache when the PARSE_CACHE setting is overridden, so that it is created again from it."""
+    global _parse_cache
+    if setting == "PARSE_CACHE":
+        _parse_cache = None
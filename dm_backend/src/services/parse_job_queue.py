@@ -0,0 +1,409 @@
+"""
+This module contains the background queue of parse jobs, used to parse large lists of expressions outside of a request.
+
+The jobs are stored in the database, so that the queue runs without an external broker and a job can be polled from
+any web server process:
+
+- A submitted job is deduplicated against the pending and running jobs with the same parse cache key, which a
+  conditional unique constraint enforces across concurrent submissions.
+- Once the job is committed, the threads of a local worker pool claim the pending jobs in the order they were
+  submitted, with a conditional update so that a job is only claimed once, and parse them with the parse cache and the
+  parser pool. A job still running after a while, left behind by a stopped process, is claimed again.
+- The status of a job can be long-polled without holding a thread, and the queue reports its depth and the time jobs
+  wait before running.
+- Once started, a sweeper thread dispatches the pending and abandoned jobs at startup and at every sweep interval, so
+  that the jobs left behind by a stopped process are run without waiting for another submission, and deletes the
+  jobs finished for longer than the retention period.
+
+The queue is configured with the PARSE_JOBS setting. With 0 workers the jobs are run in the submitting thread, once
+the transaction that submitted them is committed. The sweeper is started in every server worker by the gunicorn
+configuration.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework import status
+from sympy.parsing.latex import LaTeXParsingError
+
+from ..enums.parse_job_status import ParseJobStatus
+from ..models.parse_job import ParseJob
+from .parse_cache import ParseResultCache, get_parse_cache
+from .parser_pool import ParserPoolSaturatedError, ParserTimeoutError, get_parser_pool
+
+ACTIVE_STATUSES = [ParseJobStatus.PENDING.value, ParseJobStatus.RUNNING.value]
+FINISHED_STATUSES = [ParseJobStatus.SUCCEEDED.value, ParseJobStatus.FAILED.value]
+
+logger = logging.getLogger(__name__)
+
+
+def execute_parse_job(expressions: List[str]) -> Tuple[int, Dict[str, Any]]:
+    """
+    Resolve and parse the expressions of a job with the parse cache and the parser pool.
+
+    Args:
+        expressions (List[str]): The expressions to be parsed, in the order they were defined.
+
+    Returns:
+        Tuple[int, Dict[str, Any]]: The HTTP status of the result, and the original and parsed expressions or the
+            error detail.
+
+    Raises:
+        ParserPoolSaturatedError: If every worker of the parser pool is busy, so that the job is run again later.
+    """
+    try:
+        parsed_expressions = get_parse_cache().get_or_parse(
+            expressions, get_parser_pool().parse_expressions
+        )
+        data = {"expressions": expressions, "parsed_expressions": parsed_expressions}
+        return status.HTTP_200_OK, data
+    except LaTeXParsingError as e:
+        return status.HTTP_400_BAD_REQUEST, {"detail": f"LaTeX parsing error - {e}"}
+    except ParserTimeoutError as e:
+        return status.HTTP_408_REQUEST_TIMEOUT, {
+            "detail": f"LaTeX parsing timeout - {e}"
+        }
+    except ParserPoolSaturatedError:
+        raise
+    except Exception as e:
+        return status.HTTP_500_INTERNAL_SERVER_ERROR, {
+            "detail": f"Internal server error - {e}"
+        }
+
+
+class ParseJobQueue:
+    """A database-backed queue of parse jobs, run by a local pool of worker threads."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        poll_interval: float = 0.5,
+        max_wait: float = 30,
+        stale_after: float = 60,
+        retention: float = 86400,
+        sweep_interval: float = 60,
+    ) -> None:
+        """
+        Initialize the queue, the worker threads are only started on first use and the sweeper once started.
+
+        Args:
+            workers (int): The number of worker threads, 0 to run the jobs in the submitting thread.
+            poll_interval (float): The number of seconds between two checks of the database while waiting.
+            max_wait (float): The maximum number of seconds the status of a job can be long-polled for.
+            stale_after (float): The number of seconds after which a running job is considered abandoned.
+            retention (float): The number of seconds a finished job is kept for.
+            sweep_interval (float): The number of seconds between two sweeps, 0 to never sweep.
+        """
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_wait = max_wait
+        self.stale_after = stale_after
+        self.retention = retention
+        self.sweep_interval = sweep_interval
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._sweeper: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._draining = 0
+        self._requested = False
+        self._lock = threading.Lock()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    def submit(self, expressions: List[str]) -> ParseJob:
+        """
+        Submit a list of expressions to be parsed, or return the pending or running job parsing the same list.
+
+        When the same list is submitted concurrently, the unique constraint of the active jobs rejects every job but the
+        first one committed, and the other submissions return that job instead.
+
+        Args:
+            expressions (List[str]): The expressions to be parsed, in the order they were defined.
+
+        Returns:
+            ParseJob: The job parsing the expressions.
+        """
+        key = ParseResultCache.make_key(expressions)
+        with transaction.atomic():
+            while True:
+                job = self.find_active(key)
+                if job is not None:
+                    return job
+                try:
+                    with transaction.atomic():
+                        job = ParseJob.objects.create(key=key, expressions=expressions)
+                except IntegrityError:
+                    continue
+                transaction.on_commit(self.dispatch)
+                return job
+
+    def find_active(self, key: str) -> Optional[ParseJob]:
+        """
+        Return the pending or running job parsing the expressions of a parse cache key.
+
+        Args:
+            key (str): The parse cache key of the expressions.
+
+        Returns:
+            Optional[ParseJob]: The job, or None if there is no such job.
+        """
+        return ParseJob.objects.filter(key=key, status__in=ACTIVE_STATUSES).first()
+
+    def dispatch(self) -> None:
+        """Make sure that the pending jobs are being run, starting a worker thread if one is idle."""
+        if self.workers <= 0:
+            self.drain()
+            return
+        with self._lock:
+            if self._draining >= self.workers:
+                self._requested = True
+                return
+            self._draining += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="parse-job"
+                )
+            self._executor.submit(self._drain_in_thread)
+
+    def drain(self) -> None:
+        """Run the pending jobs until there are none left."""
+        while True:
+            job = self.claim()
+            if job is None:
+                return
+            self.run(job)
+
+    def claim(self) -> Optional[ParseJob]:
+        """
+        Claim the oldest pending job, or an abandoned running job.
+
+        Returns:
+            Optional[ParseJob]: The claimed job, or None if there are no jobs to run.
+        """
+        now = timezone.now()
+        stale = now - timedelta(seconds=self.stale_after)
+        claimable = ParseJob.objects.filter(
+            Q(status=ParseJobStatus.PENDING.value)
+            | Q(status=ParseJobStatus.RUNNING.value, started__lt=stale)
+        ).order_by("id")
+        for job in claimable[: self.workers + 1]:
+            claimed = ParseJob.objects.filter(
+                id=job.id, status=job.status, started=job.started
+            ).update(status=ParseJobStatus.RUNNING.value, started=now)
+            if claimed:
+                job.status, job.started = ParseJobStatus.RUNNING.value, now
+                return job
+        return None
+
+    def run(self, job: ParseJob) -> None:
+        """
+        Run a claimed job and store its result, or put it back in the queue if the parser pool is saturated.
+
+        Args:
+            job (ParseJob): The claimed job.
+        """
+        try:
+            status_code, result = execute_parse_job(job.expressions)
+        except ParserPoolSaturatedError:
+            ParseJob.objects.filter(id=job.id).update(
+                status=ParseJobStatus.PENDING.value, started=None
+            )
+            time.sleep(self.poll_interval)
+            return
+        job_status = (
+            ParseJobStatus.SUCCEEDED
+            if status_code == status.HTTP_200_OK
+            else ParseJobStatus.FAILED
+        )
+        ParseJob.objects.filter(id=job.id).update(
+            status=job_status.value,
+            status_code=status_code,
+            result=result,
+            finished=timezone.now(),
+        )
+        self._notify_waiters()
+
+    async def wait(self, job_id: int, timeout: float) -> ParseJob:
+        """
+        Wait until a job is finished, or until the timeout is reached, without holding a thread while waiting.
+
+        The jobs finished by this process wake the waiting coroutines up at once, the ones finished by other processes
+        are noticed by checking the database at every poll interval.
+
+        Args:
+            job_id (int): The id of the job.
+            timeout (float): The number of seconds to wait for, capped by the maximum wait of the queue, and not waited
+                for when it is not positive or not a number.
+
+        Returns:
+            ParseJob: The job, finished or not.
+
+        Raises:
+            ParseJob.DoesNotExist: If there is no job with the id.
+        """
+        deadline = time.monotonic() + (
+            min(timeout, self.max_wait) if timeout > 0 else 0.0
+        )
+        finished = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), finished)
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            while True:
+                finished.clear()
+                job = await ParseJob.objects.aget(id=job_id)
+                remaining = deadline - time.monotonic()
+                if job.status not in ACTIVE_STATUSES or remaining <= 0:
+                    return job
+                try:
+                    await asyncio.wait_for(
+                        finished.wait(), min(self.poll_interval, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return the depth of the queue and the waiting times of its jobs.
+
+        Returns:
+            Dict[str, float]: The number of pending and running jobs, the number of seconds the oldest pending job has
+                been waiting for, and the average number of seconds the last 100 started jobs waited for.
+        """
+        now = timezone.now()
+        pending = ParseJob.objects.filter(status=ParseJobStatus.PENDING.value)
+        oldest = pending.order_by("id").values_list("created", flat=True).first()
+        waits = [
+            (started - created).total_seconds()
+            for created, started in ParseJob.objects.filter(started__isnull=False)
+            .order_by("-id")
+            .values_list("created", "started")[:100]
+        ]
+        return {
+            "pending": pending.count(),
+            "running": ParseJob.objects.filter(
+                status=ParseJobStatus.RUNNING.value
+            ).count(),
+            "oldest_pending_wait": (now - oldest).total_seconds() if oldest else 0.0,
+            "average_wait": sum(waits) / len(waits) if waits else 0.0,
+        }
+
+    def purge(self) -> int:
+        """
+        Delete the jobs finished for longer than the retention period.
+
+        Returns:
+            int: The number of jobs deleted.
+        """
+        expired = timezone.now() - timedelta(seconds=self.retention)
+        deleted, _ = ParseJob.objects.filter(
+            status__in=FINISHED_STATUSES, finished__lt=expired
+        ).delete()
+        return deleted
+
+    def sweep(self) -> None:
+        """Delete the expired jobs, and make sure that the pending and abandoned jobs are being run."""
+        self.purge()
+        self.dispatch()
+
+    def start(self) -> None:
+        """Start the sweeper thread of the process, which sweeps the queue at once and then at every sweep interval."""
+        with self._lock:
+            if self.sweep_interval <= 0 or self._sweeper is not None:
+                return
+            self._stopping.clear()
+            self._sweeper = threading.Thread(
+                target=self._sweep_forever, name="parse-job-sweeper", daemon=True
+            )
+            self._sweeper.start()
+
+    def shutdown(self) -> None:
+        """Stop the sweeper, and the worker threads once the jobs being run are finished."""
+        self._stopping.set()
+        with self._lock:
+            sweeper, self._sweeper = self._sweeper, None
+            executor, self._executor = self._executor, None
+        if sweeper is not None:
+            sweeper.join()
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _notify_waiters(self) -> None:
+        """Wake the coroutines waiting for a job up, from the thread that finished it, so that they check it again."""
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, finished in waiters:
+            try:
+                loop.call_soon_threadsafe(finished.set)
+            except RuntimeError:
+                pass
+
+    def _drain_in_thread(self) -> None:
+        """
+        Run the pending jobs in a worker thread, closing the database connection of the thread afterwards.
+
+        The thread keeps running the jobs as long as jobs were dispatched while every thread was busy.
+        """
+        try:
+            while True:
+                self.drain()
+                with self._lock:
+                    if not self._requested:
+                        self._draining -= 1
+                        return
+                    self._requested = False
+        except BaseException:
+            with self._lock:
+                self._draining -= 1
+            raise
+        finally:
+            connection.close()
+
+    def _sweep_forever(self) -> None:
+        """Sweep the queue until it is shut down, closing the database connection of the thread after every sweep."""
+        while True:
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("The sweep of the parse jobs failed")
+            finally:
+                connection.close()
+            if self._stopping.wait(self.sweep_interval):
+                return
+
+
+_parse_job_queue: Optional[ParseJobQueue] = None
+
+
+def get_parse_job_queue() -> ParseJobQueue:
+    """
+    Return the parse job queue of the current process, creating it from the PARSE_JOBS setting on first use.
+
+    Returns:
+        ParseJobQueue: The parse job queue.
+    """
+    global _parse_job_queue
+    if _parse_job_queue is None:
+        _parse_job_queue = ParseJobQueue(**settings.PARSE_JOBS)
+    return _parse_job_queue
+
+
+@receiver(setting_changed)
+def reset_parse_job_queue(setting: str, **kwargs: Any) -> None:
+    """Stop the parse job queue when the PARSE_JOBS setting is overridden, so that it is created again from it."""
+    global _parse_job_queue
+    if setting == "PARSE_JOBS" and _parse_job_queue is not None:
+        _parse_job_queue.shutdown()
+        _parse_job_queue = None
@@ -0,0 +1,349 @@
+"""
+This module contains the process pool executing the equation parser outside of the web server workers.
+
+Parsing LaTeX with sympy can take an unbounded amount of time on pathological expressions, so the graph sessions are
+executed in a bounded pool of warm worker processes:
+
+- Each expression is interrupted by an alarm signal when it exceeds the expression timeout, or when the deadline of the
+  request is reached, with the timeout_decorator package.
+- A request is rejected with ParserPoolSaturatedError when every worker is busy and the queue of pending requests is
+  full, and with ParserTimeoutError when its deadline is reached.
+- Workers are recycled after a given number of tasks, or as soon as one of them grows past the memory limit.
+- The time taken by every expression is measured in the worker, and recorded in the metrics of the calling process.
+
+The pool is configured with the PARSER_POOL setting. With 0 workers the expressions are executed in the calling
+process, which is only interrupted by the timeouts when running in the main thread.
+"""
+
+import os
+import resource
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+import timeout_decorator
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from latexvm.type_defs import EnvironmentVariables
+
+from .expression_parser import Step, new_graph_session, parse_expression, warm_up_parser
+from .metrics import PARSE_EXPRESSION_DURATION
+from .session_prefix_store import get_prefix_store
+
+
+class ParserPoolError(Exception):
+    """Raised when the parser pool cannot execute a request."""
+
+
+class ParserPoolSaturatedError(ParserPoolError):
+    """Raised when every worker of the parser pool is busy and no more requests can be queued."""
+
+
+class ParserTimeoutError(ParserPoolError):
+    """Raised when parsing an expression or a request exceeds its timeout."""
+
+
+class _ExpressionTimeout(BaseException):
+    """
+    Raised by the alarm signal inside a worker.
+
+    It does not extend Exception, so that it is not swallowed by the catch-all error handling of latexvm.
+    """
+
+
+def _max_rss() -> int:
+    """Return the peak resident set size of the current process, in KiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def execute_with_deadline(
+    env: Optional[EnvironmentVariables],
+    expressions: List[str],
+    expression_timeout: Optional[float],
+    deadline: Optional[float],
+) -> Tuple[List[Step], int, List[float]]:
+    """
+    Parse a given list of expressions, interrupting the parse when a timeout is exceeded.
+
+    The timeouts rely on the alarm signal, so they are only applied when running in the main thread.
+
+    Args:
+        env (Optional[EnvironmentVariables]): The variables and functions defined by the preceding expressions.
+        expressions (List[str]): The expressions to be parsed, in the order they were defined.
+        expression_timeout (Optional[float]): The number of seconds a single expression may take.
+        deadline (Optional[float]): The time, as given by time.time(), at which the whole request must be done.
+
+    Returns:
+        Tuple[List[Step], int, List[float]]: The environment of the session after each expression along with the
+            parsed expression, the peak memory of the process in KiB, and the number of seconds taken by each
+            expression.
+
+    Raises:
+        LaTeXParsingError: If one of the expressions cannot be resolved or parsed.
+        ParserTimeoutError: If a timeout is exceeded.
+    """
+    use_signals = threading.current_thread() is threading.main_thread()
+    graph_session = new_graph_session(env)
+    steps, durations = [], []
+    for expression in expressions:
+        timeout = expression_timeout
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise ParserTimeoutError("request deadline exceeded")
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        if use_signals and timeout is not None:
+            parse = timeout_decorator.timeout(
+                timeout, timeout_exception=_ExpressionTimeout
+            )(parse_expression)
+        else:
+            parse = parse_expression
+        start = time.perf_counter()
+        try:
+            parsed_expression = parse(graph_session, expression)
+        except _ExpressionTimeout:
+            raise ParserTimeoutError(
+                f"{expression} took more than {timeout:.2f}s"
+            ) from None
+        durations.append(time.perf_counter() - start)
+        steps.append((dict(graph_session.get_env()), parsed_expression))
+    return steps, _max_rss(), durations
+
+
+class ParserPool:
+    """A bounded pool of worker processes parsing expressions with timeouts."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_pending: int = 8,
+        max_tasks_per_worker: int = 500,
+        max_worker_memory: Optional[int] = None,
+        expression_timeout: Optional[float] = 5,
+        request_timeout: Optional[float] = 15,
+    ) -> None:
+        """
+        Initialize the pool, the worker processes are only started on first use.
+
+        Args:
+            workers (int): The number of worker processes, 0 to parse in the calling process.
+            max_pending (int): The number of requests that may wait for a worker before the pool is saturated.
+            max_tasks_per_worker (int): The average number of tasks per worker after which the workers are recycled.
+            max_worker_memory (Optional[int]): The peak memory in KiB past which the workers are recycled.
+            expression_timeout (Optional[float]): The number of seconds a single expression may take.
+            request_timeout (Optional[float]): The number of seconds a whole request may take.
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_worker_memory = max_worker_memory
+        self.expression_timeout = expression_timeout
+        self.request_timeout = request_timeout
+        self.recycled = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._tasks = 0
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+
+    def deadline(self) -> Optional[float]:
+        """
+        Return the deadline of a request starting now.
+
+        Returns:
+            Optional[float]: The time, as given by time.time(), at which the request must be done.
+        """
+        return (
+            None if self.request_timeout is None else time.time() + self.request_timeout
+        )
+
+    def parse_expressions(
+        self, expressions: List[str], deadline: Optional[float] = None
+    ) -> List[str]:
+        """
+        Resolve and parse a given list of expressions in the pool, reusing the longest already parsed prefix.
+
+        Args:
+            expressions (List[str]): The expressions to be parsed, in the order they were defined.
+            deadline (Optional[float]): The deadline of the request, computed from the request timeout by default.
+
+        Returns:
+            List[str]: The parsed expressions.
+
+        Raises:
+            LaTeXParsingError: If one of the expressions cannot be resolved or parsed.
+            ParserPoolError: If the pool cannot parse the expressions in time.
+        """
+        return get_prefix_store().parse_expressions(
+            expressions, partial(self.execute_expressions, deadline=deadline)
+        )
+
+    def map(self, function: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """
+        Call a function using the pool on every item concurrently, with at most one call per worker at a time.
+
+        Args:
+            function (Callable[[Any], Any]): The function to be called in threads of the calling process.
+            items (Iterable[Any]): The arguments of the calls.
+
+        Returns:
+            List[Any]: The results of the calls, in the order of the items.
+        """
+        items = list(items)
+        if self.workers <= 0 or len(items) <= 1:
+            return [function(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(len(items), self.workers)) as executor:
+            return list(executor.map(function, items))
+
+    def execute_expressions(
+        self,
+        env: Optional[EnvironmentVariables],
+        expressions: List[str],
+        deadline: Optional[float] = None,
+    ) -> List[Step]:
+        """
+        Parse a given list of expressions in the pool.
+
+        Args:
+            env (Optional[EnvironmentVariables]): The variables and functions defined by the preceding expressions.
+            expressions (List[str]): The expressions to be parsed, in the order they were defined.
+            deadline (Optional[float]): The deadline of the request, computed from the request timeout by default.
+
+        Returns:
+            List[Step]: The environment of the session after each expression, along with the parsed expression.
+
+        Raises:
+            LaTeXParsingError: If one of the expressions cannot be resolved or parsed.
+            ParserPoolSaturatedError: If no worker is available and the queue is full.
+            ParserTimeoutError: If a timeout is exceeded.
+        """
+        deadline = self.deadline() if deadline is None else deadline
+        if self.workers <= 0:
+            steps, _, durations = execute_with_deadline(
+                env, expressions, self.expression_timeout, deadline
+            )
+        else:
+            future = self.submit(
+                execute_with_deadline,
+                env,
+                expressions,
+                self.expression_timeout,
+                deadline,
+            )
+            steps, max_rss, durations = self.result(future, deadline)
+            if self.max_worker_memory is not None and max_rss > self.max_worker_memory:
+                self.recycle()
+        for duration in durations:
+            PARSE_EXPRESSION_DURATION.observe(duration)
+        return steps
+
+    def submit(self, function: Any, *args: Any) -> Future:
+        """
+        Submit a task to the worker processes, taking one of the slots of the pool.
+
+        The slot is given back once the task is done.
+
+        Args:
+            function (Any): The picklable function to be called in a worker.
+            *args (Any): The picklable arguments of the function.
+
+        Returns:
+            Future: The future of the task.
+
+        Raises:
+            ParserPoolSaturatedError: If no worker is available and the queue is full.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ParserPoolSaturatedError("all parser workers are busy")
+        try:
+            future = self._get_executor().submit(function, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self.recycle()
+            raise ParserPoolError("parser workers were terminated")
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def result(self, future: Future, deadline: Optional[float]) -> Any:
+        """
+        Wait for the result of a task until the deadline.
+
+        Args:
+            future (Future): The future of the task.
+            deadline (Optional[float]): The time, as given by time.time(), at which the task must be done.
+
+        Returns:
+            Any: The result of the task.
+
+        Raises:
+            ParserTimeoutError: If the deadline is reached.
+            ParserPoolError: If the worker running the task died.
+        """
+        timeout = None if deadline is None else max(deadline - time.time(), 0)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise ParserTimeoutError("request deadline exceeded") from None
+        except BrokenProcessPool:
+            self.recycle()
+            raise ParserPoolError("parser workers were terminated") from None
+
+    def recycle(self) -> None:
+        """Replace the worker processes with new ones, letting the running tasks finish first."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._tasks = 0
+            self.recycled += 1
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the executor of the pool, starting it in the current process and recycling it when due."""
+        if self._tasks >= self.max_tasks_per_worker * self.workers:
+            self.recycle()
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=warm_up_parser
+                )
+                self._pid = os.getpid()
+            self._tasks += 1
+            return self._executor
+
+
+_parser_pool: Optional[ParserPool] = None
+
+
+def get_parser_pool() -> ParserPool:
+    """
+    Return the parser pool of the current process, creating it from the PARSER_POOL setting on first use.
+
+    Returns:
+        ParserPool: The parser pool.
+    """
+    global _parser_pool
+    if _parser_pool is None:
+        _parser_pool = ParserPool(**settings.PARSER_POOL)
+    return _parser_pool
+
+
+@receiver(setting_changed)
+def reset_parser_pool(setting: str, **kwargs: Any) -> None:
+    """Stop the parser pool when the PARSER_POOL setting is overridden, so that it is created again from it."""
+    global _parser_pool
+    if setting == "PARSER_POOL" and _parser_pool is not None:
+        _parser_pool.shutdown()
+        _parser_pool = None
@@ -0,0 +1,173 @@
+"""
+This module contains the profiling mode of the equation parser.
+
+A profiled parse request parses its expressions from scratch in a worker of the parser pool under cProfile, without
+the parse cache and the prefix store, and returns where the time was spent:
+
+- The total time, and the time taken by each expression.
+- The cumulative time of the stages of the graph session: its creation by GraphSession.new, the substitution rules
+  added by add_sub_rule, and the execute and force_resolve_function calls made for every expression.
+- The functions with the greatest cumulative time, as sorted by pstats.
+
+The requests are profiled when the PARSER_PROFILING setting enables it for every request, or when it allows the
+X-Parser-Profile header and the request sets it. The profiles are saved in the directory of the setting when one is
+given, so that they can be read with pstats or snakeviz. The profiled parses are not recorded in the metrics, since the
+profiler slows them down.
+"""
+
+import cProfile
+import os
+import pstats
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from rest_framework.request import Request
+
+from .parser_pool import execute_with_deadline, get_parser_pool
+
+STAGES: Dict[str, str] = {
+    "new": "GraphSession.new",
+    "add_sub_rule": "GraphSession.add_sub_rule",
+    "execute": "GraphSession.execute",
+    "force_resolve_function": "GraphSession.force_resolve_function",
+}
+PROFILE_HEADER = "X-Parser-Profile"
+
+ParseProfile = Dict[str, Any]
+
+
+def profiling_requested(request: Request) -> bool:
+    """
+    Return whether a parse request must be profiled.
+
+    Args:
+        request (Request): The HTTP request object.
+
+    Returns:
+        bool: True when every request is profiled, or when the header is allowed and set by the request.
+    """
+    profiling = settings.PARSER_PROFILING
+    if profiling["ENABLED"]:
+        return True
+    return profiling["ALLOW_HEADER"] and request.headers.get(
+        PROFILE_HEADER, ""
+    ).lower() in ("1", "true")
+
+
+def summarize_profile(stats: pstats.Stats, limit: int) -> ParseProfile:
+    """
+    Summarize the statistics of a profiled parse.
+
+    Args:
+        stats (pstats.Stats): The statistics of the profiler.
+        limit (int): The number of functions listed.
+
+    Returns:
+        ParseProfile: The cumulative seconds of the stages of the graph session, and the functions with the greatest
+            cumulative time along with their number of calls and the seconds spent in the function itself.
+    """
+    stages = dict.fromkeys(STAGES.values(), 0.0)
+    for (filename, _, name), (_, _, _, cumulative, _) in stats.stats.items():
+        if name in STAGES and filename.endswith(
+            os.path.join("latexvm", "graph_session.py")
+        ):
+            stages[STAGES[name]] += cumulative
+    ranked = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    functions = [
+        {
+            "function": pstats.func_std_string(pstats.func_strip_path(function)),
+            "calls": calls,
+            "own": round(own, 6),
+            "cumulative": round(cumulative, 6),
+        }
+        for function, (_, calls, own, cumulative, _) in ranked[:limit]
+    ]
+    return {
+        "stages": {stage: round(seconds, 6) for stage, seconds in stages.items()},
+        "functions": functions,
+    }
+
+
+def profile_with_deadline(
+    expressions: List[str],
+    expression_timeout: Optional[float],
+    deadline: Optional[float],
+    limit: int,
+    directory: Optional[str],
+) -> Tuple[List[str], ParseProfile]:
+    """
+    Parse a given list of expressions from scratch under cProfile, interrupting the parse when a timeout is exceeded.
+
+    Args:
+        expressions (List[str]): The expressions to be parsed, in the order they were defined.
+        expression_timeout (Optional[float]): The number of seconds a single expression may take.
+        deadline (Optional[float]): The time, as given by time.time(), at which the whole request must be done.
+        limit (int): The number of functions listed in the profile.
+        directory (Optional[str]): The directory the profile is saved to, None to not save it.
+
+    Returns:
+        Tuple[List[str], ParseProfile]: The parsed expressions, and the profile of the parse.
+
+    Raises:
+        LaTeXParsingError: If one of the expressions cannot be resolved or parsed.
+        ParserTimeoutError: If a timeout is exceeded.
+    """
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        steps, _, durations = execute_with_deadline(
+            None, expressions, expression_timeout, deadline
+        )
+    finally:
+        profiler.disable()
+    total = time.perf_counter() - start
+    stats = pstats.Stats(profiler)
+    path = None
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"parse-{uuid.uuid4().hex}.prof")
+        stats.dump_stats(path)
+    profile = {
+        "total": round(total, 6),
+        "expressions": [
+            {"expression": expression, "seconds": round(duration, 6)}
+            for expression, duration in zip(expressions, durations)
+        ],
+        **summarize_profile(stats, limit),
+        "file": path,
+    }
+    return [parsed_expression for _, parsed_expression in steps], profile
+
+
+def profile_expressions(
+    expressions: List[str], deadline: Optional[float] = None
+) -> Tuple[List[str], ParseProfile]:
+    """
+    Parse a given list of expressions under cProfile in the parser pool, or in the calling process without workers.
+
+    Args:
+        expressions (List[str]): The expressions to be parsed, in the order they were defined.
+        deadline (Optional[float]): The deadline of the request, computed from the request timeout by default.
+
+    Returns:
+        Tuple[List[str], ParseProfile]: The parsed expressions, and the profile of the parse.
+
+    Raises:
+        LaTeXParsingError: If one of the expressions cannot be resolved or parsed.
+        ParserPoolError: If the pool cannot parse the expressions in time.
+    """
+    pool = get_parser_pool()
+    deadline = pool.deadline() if deadline is None else deadline
+    args = (
+        expressions,
+        pool.expression_timeout,
+        deadline,
+        settings.PARSER_PROFILING["FUNCTIONS"],
+        settings.PARSER_PROFILING["DIRECTORY"],
+    )
+    if pool.workers <= 0:
+        return profile_with_deadline(*args)
+    return pool.result(pool.submit(profile_with_deadline, *args), deadline)
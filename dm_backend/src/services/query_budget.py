@@ -0,0 +1,183 @@
+"""
+This module contains the query budgets of the viewset actions, checked in development and in the tests.
+
+A viewset lists the greatest number of SQL queries each of its actions may make in its query_budgets, whatever the
+number of objects it returns, so that a nested field or a relation left out of the prefetching of a serializer, which
+makes a query for every object, is noticed before it reaches production:
+
+- normalize_sql: Reduces a SQL query to its shape, without its literals, so that the queries made for every object of a
+  list are recognized as the same query.
+- QueryRecorder: The SQL queries made to answer a request, recorded by a wrapper installed on every database connection.
+- QueryBudgetMixin: A viewset mixin recording the queries of every request when the QUERY_BUDGET setting enables it.
+  A request whose queries exceed the budget of its action is logged, or fails with a QueryBudgetExceeded error when
+  the setting raises, and the shapes repeated in a request, the likely N+1 queries, are logged along with it.
+
+The savepoints are not counted, since the tests run every request in a transaction of their own, where the atomic
+blocks of the views make savepoints they do not make in production.
+"""
+
+import logging
+import re
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpRequest
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\(\s*%s(?:\s*,\s*%s)*\s*\)")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SAVEPOINT = re.compile(
+    r"^\s*(?:SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b", re.IGNORECASE
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a request makes more SQL queries than the budget of its action."""
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Reduce a SQL query to its shape, with its literals and the placeholders of its IN lists replaced.
+
+    Args:
+        sql (str): The SQL of the query.
+
+    Returns:
+        str: The shape of the query.
+    """
+    sql = _IN_LIST.sub("(...)", sql)
+    sql = _STRING.sub("?", sql)
+    return _NUMBER.sub("?", sql)
+
+
+@dataclass
+class QueryRecorder:
+    """The SQL queries made to answer a request."""
+
+    queries: List[str] = field(default_factory=list)
+
+    def record(self, sql: str) -> None:
+        """
+        Record a query, unless it is a savepoint.
+
+        Args:
+            sql (str): The SQL of the query.
+        """
+        if not _SAVEPOINT.match(sql):
+            self.queries.append(sql)
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """
+        Return the shapes of the queries made at least a number of times.
+
+        Args:
+            threshold (int): The number of times.
+
+        Returns:
+            Dict[str, int]: The number of queries of every repeated shape, the most repeated first.
+        """
+        counts = Counter(normalize_sql(sql) for sql in self.queries)
+        return {
+            shape: count for shape, count in counts.most_common() if count >= threshold
+        }
+
+
+_query_recorder: ContextVar[Optional[QueryRecorder]] = ContextVar(
+    "query_recorder", default=None
+)
+
+
+def record_queries(
+    execute: Callable, sql: str, params: Any, many: bool, context: Dict[str, Any]
+) -> Any:
+    """
+    Record a SQL query in the recorder of the current request, as an execute wrapper of the connections.
+
+    Args:
+        execute (Callable): The function executing the query.
+        sql (str): The SQL of the query.
+        params (Any): The parameters of the query.
+        many (bool): Whether the query is executed for many sets of parameters.
+        context (Dict[str, Any]): The connection and cursor of the query.
+
+    Returns:
+        Any: The result of the query.
+    """
+    recorder = _query_recorder.get()
+    if recorder is not None:
+        recorder.record(sql)
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender: type, connection: Any, **kwargs: Any) -> None:
+    """Install the query recorder on a new database connection."""
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
+
+
+class QueryBudgetMixin:
+    """A viewset mixin checking the number of SQL queries of every request against the budget of its action."""
+
+    query_budgets: Dict[str, int] = {}
+
+    async def dispatch(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> Response:
+        """
+        Dispatch a request, and check its queries when the query budgets are enabled.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+            *args (Any): The positional arguments of the URL.
+            **kwargs (Any): The keyword arguments of the URL.
+
+        Returns:
+            Response: The response of the request.
+
+        Raises:
+            QueryBudgetExceeded: If the request exceeds the budget of its action and the setting raises.
+        """
+        if not settings.QUERY_BUDGET["ENABLED"]:
+            return await super().dispatch(request, *args, **kwargs)
+        recorder = QueryRecorder()
+        token = _query_recorder.set(recorder)
+        try:
+            response = await super().dispatch(request, *args, **kwargs)
+        finally:
+            _query_recorder.reset(token)
+        self.check_query_budget(recorder)
+        return response
+
+    def check_query_budget(self, recorder: QueryRecorder) -> None:
+        """
+        Report the repeated queries of a request, and the requests exceeding the budget of their action.
+
+        Args:
+            recorder (QueryRecorder): The queries of the request.
+
+        Raises:
+            QueryBudgetExceeded: If the request exceeds the budget of its action and the setting raises.
+        """
+        repeated = recorder.repeated(settings.QUERY_BUDGET["REPEATED_QUERIES"])
+        name = f"{type(self).__name__}.{self.action}"
+        for shape, count in repeated.items():
+            logger.warning("%s made the same query %d times: %s", name, count, shape)
+        budget = self.query_budgets.get(self.action)
+        if budget is None or len(recorder.queries) <= budget:
+            return
+        message = (
+            f"{name} made {len(recorder.queries)} queries, over its budget of {budget}:\n"
+            + "\n".join(recorder.queries)
+        )
+        if settings.QUERY_BUDGET["RAISE"]:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
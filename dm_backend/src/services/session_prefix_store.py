@@ -0,0 +1,162 @@
+"""
+This module contains a store of graph session snapshots, used to parse a list of expressions incrementally.
+
+Parsing an expression only depends on the expressions executed before it, so the environment of the graph session is
+snapshotted after each expression under a hash chained over the expressions so far. A new list of expressions restores
+the session from the longest prefix that was already computed and only executes the remaining expressions, which keeps
+the sympy work per keystroke constant when only the last expressions of a graph change.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from latexvm.type_defs import EnvironmentVariables
+
+from .expression_parser import SUB_RULES, Step, execute_expressions
+
+Snapshot = Tuple[EnvironmentVariables, Tuple[str, ...]]
+
+
+class SessionPrefixStore:
+    """An LRU store of the graph session environment after each parsed prefix of expressions."""
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            max_entries (int): The maximum number of snapshots kept by the store.
+        """
+        self.max_entries = max_entries
+        self._snapshots: "OrderedDict[str, Snapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def prefix_keys(expressions: List[str]) -> List[str]:
+        """
+        Compute the key of every prefix of a list of expressions.
+
+        Args:
+            expressions (List[str]): The ordered expressions.
+
+        Returns:
+            List[str]: The keys, where the i-th key identifies the first i + 1 expressions.
+        """
+        key = hashlib.sha256(json.dumps(sorted(SUB_RULES.items())).encode()).hexdigest()
+        keys = []
+        for expression in expressions:
+            key = hashlib.sha256(f"{key}\0{expression}".encode()).hexdigest()
+            keys.append(key)
+        return keys
+
+    def get(self, key: str) -> Optional[Snapshot]:
+        """
+        Return the snapshot stored under the key, and mark it as recently used.
+
+        Args:
+            key (str): The prefix key.
+
+        Returns:
+            Optional[Snapshot]: The session environment and the parsed expressions of the prefix, or None if there is
+                none.
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None:
+                self._snapshots.move_to_end(key)
+            return snapshot
+
+    def set(self, key: str, snapshot: Snapshot) -> None:
+        """
+        Store a snapshot under the key, evicting the least recently used snapshots if needed.
+
+        Args:
+            key (str): The prefix key.
+            snapshot (Snapshot): The session environment and the parsed expressions of the prefix.
+        """
+        with self._lock:
+            self._snapshots[key] = snapshot
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self.max_entries:
+                self._snapshots.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every stored snapshot."""
+        with self._lock:
+            self._snapshots.clear()
+
+    def longest_prefix(self, keys: List[str]) -> Tuple[int, Optional[Snapshot]]:
+        """
+        Find the longest prefix that has a stored snapshot.
+
+        Args:
+            keys (List[str]): The prefix keys of the expressions.
+
+        Returns:
+            Tuple[int, Optional[Snapshot]]: The length of the prefix and its snapshot, (0, None) if there is none.
+        """
+        for index in reversed(range(len(keys))):
+            snapshot = self.get(keys[index])
+            if snapshot is not None:
+                return index + 1, snapshot
+        return 0, None
+
+    def parse_expressions(
+        self,
+        expressions: List[str],
+        execute: Callable[
+            [Optional[EnvironmentVariables], List[str]], List[Step]
+        ] = execute_expressions,
+    ) -> List[str]:
+        """
+        Resolve and parse a given list of expressions, reusing the longest already parsed prefix.
+
+        Args:
+            expressions (List[str]): The expressions to be parsed, in the order they were defined.
+            execute (Callable): The function parsing the remaining expressions from the environment of the prefix.
+
+        Returns:
+            List[str]: The parsed expressions.
+
+        Raises:
+            LaTeXParsingError: If one of the expressions cannot be resolved or parsed.
+        """
+        keys = self.prefix_keys(expressions)
+        length, snapshot = self.longest_prefix(keys)
+        env, parsed_expressions = snapshot or (None, ())
+        if length < len(expressions):
+            steps = execute(env, expressions[length:])
+            for key, (env, parsed_expression) in zip(keys[length:], steps):
+                parsed_expressions += (parsed_expression,)
+                self.set(key, (env, parsed_expressions))
+        return list(parsed_expressions)
+
+
+_prefix_store: Optional[SessionPrefixStore] = None
+
+
+def get_prefix_store() -> SessionPrefixStore:
+    """
+    Return the process-wide session prefix store, creating it from the PARSE_PREFIX_STORE_MAX_ENTRIES setting.
+
+    Returns:
+        SessionPrefixStore: The session prefix store.
+    """
+    global _prefix_store
+    if _prefix_store is None:
+        _prefix_store = SessionPrefixStore(settings.PARSE_PREFIX_STORE_MAX_ENTRIES)
+    return _prefix_store
+
+
+@receiver(setting_changed)
+def reset_prefix_store(setting: str, **kwargs: Any) -> None:
+    """Drop the session prefix store when its setting is overridden, so that it is created again from it."""
+    global _prefix_store
+    if setting == "PARSE_PREFIX_STORE_MAX_ENTRIES":
+        _prefix_store = None
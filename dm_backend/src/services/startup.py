@@ -0,0 +1,28 @@
+"""
+This module contains the warm-up of a server process, run by the ASGI and WSGI entry points before the first request.
+
+The equations stored the most often are compiled for the equation sampler, and the sympy LaTeX parser is warmed up,
+as configured by the COMPILED_EQUATION_CACHE and PARSER_WARM_UP settings. Under gunicorn with --preload, this is done
+once in the master process, and every server worker forked from it starts warm.
+"""
+
+from django.conf import settings
+from django.db import connections
+
+
+def warm_up_server() -> None:
+    """
+    Pre-warm the compiled equation cache and the parser, as configured by the settings.
+
+    The database connections opened by the pre-warm are closed afterwards, so that the workers forked with --preload
+    do not share them.
+    """
+    if settings.COMPILED_EQUATION_CACHE["prewarm"]:
+        from .equation_sampler import prewarm_compiled_equations
+
+        prewarm_compiled_equations(settings.COMPILED_EQUATION_CACHE["prewarm"])
+        connections.close_all()
+    if settings.PARSER_WARM_UP:
+        from .expression_parser import warm_up_parser
+
+        warm_up_parser()
@@ -2,23 +2,123 @@
 EquationAPIViewSet is a view that creates a new equation with the specified data.
 
 The view accepts GET, POST, PUT and DELETE requests with equation data in the request body.
-- With GET request, all the equations in the database are fetched and returned as a list of equation objects.
+- With GET request, all the equations in the database are fetched and returned as a list of equation objects,
+  paginated with a cursor along their id.
 - With POST request, the equation data is validated using the EquationSerializer, and if valid, a new equation object is
   created and saved to the database.
 - With PUT request, the equation with the specified equation_id will be updated according to the new equation data.
 - With DELETE request, the equation with the specified equation_id will be deleted from the database.
+
+The equations can be filtered by graph with the graph query parameter. The parsed equations of a graph are computed
+again whenever one of its equations is written or deleted, and the changes are published to the subscribers of the
+graph. The equations of a graph are listed with the ETag and Last-Modified headers of the graph, and a conditional
+request on an unchanged graph gets a 304 response without the equations being fetched again, and the equation lists of
+a graph are served from the graph cache until the graph or one of its equations is written.
+
+The view is asynchronous: the equations are listed, fetched and deleted with the asynchronous ORM, and the serializers
+validate and write in a thread, so that a request waiting for the database does not hold a worker.
+
+The number of SQL queries of every action is bounded by its query budget, checked in the tests.
 """
 
-from rest_framework.viewsets import ModelViewSet
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import QuerySet
+from rest_framework.exceptions import ValidationError
 
 from ..models.equation import Equation
+from ..models.graph import Graph
 from ..serializers.equation import EquationSerializer
 from ..services.api_renderer import APIRenderer
+from ..services.async_viewset import AsyncModelViewSet
+from ..services.conditional_get import ConditionalGetMixin, Validators
+from ..services.cursor_pagination import EquationCursorPagination
+from ..services.graph_cache import GraphCacheMixin
+from ..services.graph_events import EQUATION_DELETED, record_equation_changes
+from ..services.graph_parser import update_parsed_equations
+from ..services.msgpack_renderer import MessagePackRenderer
+from ..services.query_budget import QueryBudgetMixin
 
 
-class EquationAPIViewSet(ModelViewSet):
+class EquationAPIViewSet(
+    QueryBudgetMixin, ConditionalGetMixin, GraphCacheMixin, AsyncModelViewSet
+):
     """A class used to represent a view for equation."""
 
     queryset = Equation.objects.all()
     serializer_class = EquationSerializer
-    renderer_classes = [APIRenderer]
+    renderer_classes = [APIRenderer, MessagePackRenderer]
+    pagination_class = EquationCursorPagination
+    query_budgets = {
+        "list": 2,
+        "retrieve": 1,
+        "create": 7,
+        "update": 8,
+        "partial_update": 8,
+        "destroy": 8,
+    }
+
+    def get_queryset(self) -> QuerySet:
+        """
+        Return the equations, only the ones of the given graph when the graph query parameter is set.
+
+        Returns:
+            QuerySet: The equations.
+
+        Raises:
+            ValidationError: If the graph query parameter is not an integer.
+        """
+        queryset = super().get_queryset()
+        graph = self.request.query_params.get("graph")
+        if graph is not None:
+            if not graph.isdigit():
+                raise ValidationError({"graph": ["A valid integer is required."]})
+            queryset = queryset.filter(graph_id=int(graph))
+        return queryset
+
+    def get_cached_graph_id(self) -> Optional[int]:
+        """
+        Return the id of the graph whose equations are listed, so that the list is served from the graph cache.
+
+        Returns:
+            Optional[int]: The id of the graph, or None when the equations of every graph are listed.
+        """
+        graph = self.request.query_params.get("graph")
+        if self.action != "list" or graph is None or not graph.isdigit():
+            return None
+        return int(graph)
+
+    def get_validators(self) -> Optional[Validators]:
+        """
+        Return the version and the updated time of the graph whose equations are listed.
+
+        Returns:
+            Optional[Validators]: The validators of the graph, or None when the equations of every graph are listed.
+        """
+        graph = self.request.query_params.get("graph")
+        if self.action != "list" or graph is None or not graph.isdigit():
+            return None
+        row = (
+            Graph.objects.filter(id=int(graph))
+            .values_list("version", "updated")
+            .first()
+        )
+        if row is None:
+            return None
+        version, updated = row
+        return f"equations:{graph}:{version}:{updated.isoformat()}", updated
+
+    def perform_destroy(self, instance: Equation) -> None:
+        """
+        Delete an equation, touch its graph, and parse the equations of the graph again once committed.
+
+        Args:
+            instance (Equation): The equation to be deleted.
+        """
+        equation_id = instance.id
+        with transaction.atomic():
+            instance.delete()
+            Graph.objects.filter(id=instance.graph_id).touch()
+            record_equation_changes(instance.graph_id, EQUATION_DELETED, [equation_id])
+        update_parsed_equations(instance.graph)
@@ -3,28 +3,49 @@ EquationParserAPI is a view that simplifies a LaTeX equation and returns the res
 
 The view accepts GET requests with equation data in the query parameters.
 - With POST request, the equation data is parsed using the simplify_latex_expression method of the Expression class,
-  from latexvm, and if successful, a new data object is returned in the response.
+  from latexvm, and if successful, a new data object is returned in the response. Results are cached by a hash of the
+  expressions, so that a repeated list of expressions is returned without being parsed again, and the graph session
+  is restored from the longest list of leading expressions parsed before, so that only the changed ones are parsed.
+  The expressions are parsed in a pool of worker processes, and the request fails with a 408 status when it takes too
+  long, or with a 503 status when every worker is busy. A batch of independent lists of expressions, one per graph,
+  can also be parsed concurrently in a single request, with a result or an error for every graph. When profiling is
+  enabled, or allowed and requested with the X-Parser-Profile header, the expressions are parsed from scratch under
+  cProfile and the profile of the parse is returned along with the parsed expressions.
+- With POST request on the jobs, the expressions are parsed in the background and the job is returned at once, so that
+  its status can be polled, or long-polled with the wait query parameter, until its result is ready.
+
+The parsing and long-polling views are asynchronous: the parsing is offloaded to a thread that waits for the parser
+pool, and a long-polled job is checked with the asynchronous ORM, so that neither holds a worker under an ASGI server.
 """
 
-from latexvm.graph_session import GraphSession
-from latexvm.type_defs import ResultType
+import math
+from typing import List, Optional
+
+from asgiref.sync import sync_to_async
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.viewsets import ViewSet
 from sympy.parsing.latex import LaTeXParsingError
 
+from ..models.parse_job import ParseJob
+from ..serializers.parse_job import ParseJobSerializer
 from ..services.api_renderer import APIRenderer
+from ..services.async_viewset import AsyncViewSet
+from ..services.msgpack_renderer import MessagePackRenderer
+from ..services.parse_cache import get_parse_cache
+from ..services.parse_job_queue import get_parse_job_queue
+from ..services.parser_pool import ParserPoolError, ParserPoolSaturatedError, ParserTimeoutError, get_parser_pool
+from ..services.parser_profiler import profile_expressions, profiling_requested
 
 
-class EquationParserAPIViewSet(ViewSet):
+class EquationParserAPIViewSet(AsyncViewSet):
     """A class used to represent a view for equation parser."""
 
-    renderer_classes = [APIRenderer]
+    renderer_classes = [APIRenderer, MessagePackRenderer]
 
     @action(detail=False, methods=["post"])
-    def parse_expressions(self, request: Request) -> Response:
+    async def parse_expressions(self, request: Request) -> Response:
         """
         Resolve and parse a given list of a mathematical expressions containing a function call.
 
@@ -40,25 +61,179 @@ class EquationParserAPIViewSet(ViewSet):
         """
         try:
             expressions = request.data["expressions"]
-            graph_session = GraphSession.new()
-            graph_session.add_sub_rule(r"\*\*", "^")
-            parsed_expressions = []
-            for expression in expressions:
-                graph_session.execute(expression)
-                parsed_expression = graph_session.force_resolve_function(expression)
-                if parsed_expression.result == ResultType.FAILURE:
-                    raise LaTeXParsingError(f"{expression} is invalid")
-                parsed_expressions.append(parsed_expression.message)
+        except Exception as e:
+            return Response(
+                {"detail": f"Internal server error - {e}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        return await sync_to_async(self.parse_group, thread_sensitive=False)(
+            expressions, profile=profiling_requested(request)
+        )
+
+    @action(detail=False, methods=["post"])
+    async def parse_batch(self, request: Request) -> Response:
+        """
+        Resolve and parse many independent lists of mathematical expressions, one per graph.
+
+        The lists are parsed concurrently in the parser pool, and a failing list does not fail the others: every graph
+        gets its own status along with either its parsed expressions or the error detail.
+
+        Args:
+            request (Request): The HTTP request object, whose "graphs" maps graph ids to lists of expressions.
+
+        Returns:
+            Response: A JSON response mapping each graph id to its result,
+                or an error response if there was a problem with the input or server.
+        """
+        try:
+            graphs = request.data["graphs"]
+            pool = get_parser_pool()
+            deadline = pool.deadline()
+            responses = await sync_to_async(pool.map, thread_sensitive=False)(
+                lambda expressions: self.parse_group(expressions, deadline),
+                graphs.values(),
+            )
             data = {
-                "expressions": expressions,
-                "parsed_expressions": parsed_expressions,
+                "results": {
+                    graph_id: {"status": response.status_code, **response.data}
+                    for graph_id, response in zip(graphs.keys(), responses)
+                }
             }
             return Response(data, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response(
+                {"detail": f"Internal server error - {e}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["post"], url_path="jobs")
+    def submit_job(self, request: Request) -> Response:
+        """
+        Submit a list of mathematical expressions to be parsed in the background.
+
+        A list of expressions that is already pending or running is not submitted again, and its job is returned.
+
+        Args:
+            request (Request): The HTTP request object, whose "expressions" is the list of expressions.
+
+        Returns:
+            Response: A JSON response containing the job, whose status can then be polled,
+                or an error response if there was a problem with the input or server.
+        """
+        try:
+            expressions = request.data["expressions"]
+            if not isinstance(expressions, list) or not all(
+                isinstance(expression, str) for expression in expressions
+            ):
+                return Response(
+                    {"detail": "Bad request - expressions must be a list of strings"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            job = get_parse_job_queue().submit(expressions)
+            return Response(
+                ParseJobSerializer(job).data, status=status.HTTP_202_ACCEPTED
+            )
+        except Exception as e:
+            return Response(
+                {"detail": f"Internal server error - {e}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["get"], url_path=r"jobs/(?P<job_id>[0-9]+)")
+    async def job_status(self, request: Request, job_id: str) -> Response:
+        """
+        Return the status of a parse job, along with its result once it is finished.
+
+        With the wait query parameter, the response is only sent once the job is finished, or after waiting for the
+        given number of seconds.
+
+        Args:
+            request (Request): The HTTP request object.
+            job_id (str): The id of the job.
+
+        Returns:
+            Response: A JSON response containing the job, or an error response if there is no such job.
+        """
+        try:
+            wait = float(request.query_params.get("wait", 0))
+            if not math.isfinite(wait):
+                raise ValueError(wait)
+        except ValueError:
+            return Response(
+                {"detail": "Bad request - wait must be a number of seconds"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            job = await get_parse_job_queue().wait(int(job_id), wait)
+        except ParseJob.DoesNotExist:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ParseJobSerializer(job).data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"], url_path="jobs/stats")
+    def job_stats(self, request: Request) -> Response:
+        """
+        Return the depth of the parse job queue and the time jobs wait before running.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: A JSON response containing the statistics of the queue.
+        """
+        return Response(get_parse_job_queue().stats(), status=status.HTTP_200_OK)
+
+    @staticmethod
+    def parse_group(
+        expressions: List[str], deadline: Optional[float] = None, profile: bool = False
+    ) -> Response:
+        """
+        Resolve and parse a list of expressions with the parse cache and the parser pool.
+
+        Args:
+            expressions (List[str]): The expressions to be parsed, in the order they were defined.
+            deadline (Optional[float]): The deadline of the request, computed from the request timeout by default.
+            profile (bool): Whether the expressions are parsed from scratch under the profiler, whose profile is
+                returned along with them.
+
+        Returns:
+            Response: A response containing the original and parsed expressions,
+                or an error response if there was a problem with the input or server.
+        """
+        try:
+            data = {"expressions": expressions}
+            if profile:
+                data["parsed_expressions"], data["profile"] = profile_expressions(
+                    expressions, deadline
+                )
+            else:
+                data["parsed_expressions"] = get_parse_cache().get_or_parse(
+                    expressions,
+                    lambda expressions: get_parser_pool().parse_expressions(
+                        expressions, deadline
+                    ),
+                )
+            return Response(data, status=status.HTTP_200_OK)
         except LaTeXParsingError as e:
             return Response(
                 {"detail": f"LaTeX parsing error - {e}"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        except ParserTimeoutError as e:
+            return Response(
+                {"detail": f"LaTeX parsing timeout - {e}"},
+                status=status.HTTP_408_REQUEST_TIMEOUT,
+            )
+        except ParserPoolSaturatedError as e:
+            return Response(
+                {"detail": f"Service unavailable - {e}"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "1"},
+            )
+        except ParserPoolError as e:
+            return Response(
+                {"detail": f"Service unavailable - {e}"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
         except Exception as e:
             return Response(
                 {"detail": f"Internal server error - {e}"},
@@ -0,0 +1,121 @@
+"""
+EquationSamplerAPIViewSet is a view that samples equations over a viewport and returns points to be rendered.
+
+The view accepts POST requests with the equations and the viewport in the request body.
+- With POST request, either all the equations of a graph or a single parsed equation are compiled to NumPy and evaluated
+  on evenly spaced samples of the viewport, and the x and y arrays of the samples are returned in the response, for a
+  polyline or a scatter rendering depending on the line style of each equation. With the adaptive option, the samples
+  are refined where the curve turns or breaks, within the resolution as a budget of points and a given tolerance.
+"""
+
+from functools import partial
+from typing import Callable
+
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+
+from ..enums.line_style_type import LineStyle
+from ..models.equation import Equation
+from ..serializers.equation_sample import EquationSampleSerializer
+from ..services.api_renderer import APIRenderer
+from ..services.equation_sampler import Samples, SamplingError, adaptive_sample_equation, sample_equation
+from ..services.msgpack_renderer import MessagePackRenderer
+
+
+class EquationSamplerAPIViewSet(ViewSet):
+    """A class used to represent a view for equation sampler."""
+
+    renderer_classes = [APIRenderer, MessagePackRenderer]
+
+    @action(detail=False, methods=["post"])
+    def sample(self, request: Request) -> Response:
+        """
+        Sample a parsed equation, or every equation of a graph, over a viewport.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: A JSON response containing the x and y arrays of the samples of each equation,
+                or an error response if there was a problem with the input or server.
+        """
+        serializer = EquationSampleSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        viewport = {
+            key: serializer.validated_data.get(key)
+            for key in ["x_min", "x_max", "resolution", "y_min", "y_max"]
+        }
+        if serializer.validated_data["adaptive"]:
+            sample = partial(
+                adaptive_sample_equation,
+                tolerance=serializer.validated_data.get("tolerance"),
+            )
+        else:
+            sample = sample_equation
+        try:
+            if "parsed_equation" in serializer.validated_data:
+                parsed_equation = serializer.validated_data["parsed_equation"]
+                line_style = serializer.validated_data["line_style"]
+                samples = sample(
+                    parsed_equation, line_style=LineStyle(line_style), **viewport
+                )
+                data = {
+                    "parsed_equation": parsed_equation,
+                    "line_style": line_style,
+                    **samples,
+                }
+                return Response(data, status=status.HTTP_200_OK)
+            graph = serializer.validated_data["graph"]
+            equations = Equation.objects.filter(graph=graph).order_by("id")
+            data = {
+                "graph": graph.id,
+                "equations": [
+                    self.sample_stored_equation(equation, viewport, sample)
+                    for equation in equations
+                ],
+            }
+            return Response(data, status=status.HTTP_200_OK)
+        except SamplingError as e:
+            return Response(
+                {"detail": f"Sampling error - {e}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {"detail": f"Internal server error - {e}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @staticmethod
+    def sample_stored_equation(
+        equation: Equation, viewport: dict, sample: Callable[..., Samples]
+    ) -> dict:
+        """
+        Sample an equation of a graph, reporting a sampling error for this equation only.
+
+        Args:
+            equation (Equation): The equation to be sampled.
+            viewport (dict): The bounds and resolution of the viewport.
+            sample (Callable[..., Samples]): The sampling function, uniform or adaptive.
+
+        Returns:
+            dict: The samples of the equation, or the detail of the sampling error.
+        """
+        data = {
+            "id": equation.id,
+            "parsed_equation": equation.parsed_equation,
+            "line_style": equation.line_style,
+        }
+        try:
+            samples = sample(
+                equation.parsed_equation,
+                line_style=LineStyle(equation.line_style),
+                **viewport,
+            )
+            return data | samples
+        except SamplingError as e:
+            return data | {"detail": f"Sampling error - {e}"}
@@ -2,23 +2,247 @@
 GraphAPIViewSet is a view that creates a new graph with the specified data.
 
 The view accepts GET, POST, PUT and DELETE requests with graph data in the request body.
-- With GET request, all the graphs in the database are fetched and returned as a list of graph objects.
+- With GET request, all the graphs in the database are fetched and returned as a list of graph objects, paginated with
+  a cursor along their name and id.
 - With POST request, the graph data is validated using the GraphSerializer, and if valid, a new graph object is
   created and saved to the database.
 - With PUT request, the graph with the specified graph_id will be updated according to the new graph data.
 - With DELETE request, the graph with the specified graph_id will be deleted from the database.
+- With POST request on the equations of the graph with the specified graph_id, a list of equations is created, updated
+  and deleted at once in a single transaction.
+- With POST request on the save of the graph with the specified graph_id, only the equations added, changed and removed
+  since a version of the graph are written, and the save is rejected when the graph was saved since that version.
+
+The graphs are returned with an ETag header, computed from the version and updated time of the graphs, which change
+whenever a graph or its equations are written, and a graph with a Last-Modified header as well. A conditional request
+on unchanged graphs gets a 304 response without the graphs being fetched or serialized again. The graph details are
+served from the graph cache until the graph or one of its equations is written, and the counters of the cache are
+returned by GET requests on /api/viewset/graphs/cache/stats/.
+
+The graphs can be filtered by owner with the owner query parameter. With the nested query parameter, GET requests
+return the graphs along with their equations, which are fetched with a single additional query whatever the number of
+graphs and equations.
+
+The changes made to the equations of a graph are pushed to its editors over server-sent events, see the graph_events
+module of the views.
+
+The view is asynchronous: the graphs are listed, fetched and deleted with the asynchronous ORM, and the serializers
+validate and write in a thread, so that a request waiting for the database does not hold a worker.
+
+The number of SQL queries of every action is bounded by its query budget, checked in the tests, so that the listing of
+the graphs keeps making the same number of queries whatever the number of graphs and equations.
 """
 
-from rest_framework.viewsets import ModelViewSet
+from typing import Optional
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max, Prefetch, QuerySet, Sum
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
 
+from ..models.equation import Equation
 from ..models.graph import Graph
-from ..serializers.graph import GraphSerializer
+from ..serializers.equation import EquationSerializer
+from ..serializers.equation_bulk import EquationBulkSerializer
+from ..serializers.graph import GraphDetailSerializer, GraphSerializer
+from ..serializers.graph_patch import GraphPatchSerializer
 from ..services.api_renderer import APIRenderer
+from ..services.async_viewset import AsyncModelViewSet
+from ..services.conditional_get import ConditionalGetMixin, Validators
+from ..services.cursor_pagination import GraphCursorPagination
+from ..services.graph_cache import GraphCacheMixin, get_graph_cache
+from ..services.graph_events import record_graph_deleted
+from ..services.msgpack_renderer import MessagePackRenderer
+from ..services.query_budget import QueryBudgetMixin
 
 
-class GraphAPIViewSet(ModelViewSet):
+class GraphAPIViewSet(
+    QueryBudgetMixin, ConditionalGetMixin, GraphCacheMixin, AsyncModelViewSet
+):
     """A class used to represent a view for graph."""
 
     queryset = Graph.objects.all()
     serializer_class = GraphSerializer
-    renderer_classes = [APIRenderer]
+    renderer_classes = [APIRenderer, MessagePackRenderer]
+    pagination_class = GraphCursorPagination
+    query_budgets = {
+        "list": 3,
+        "retrieve": 3,
+        "create": 1,
+        "update": 2,
+        "partial_update": 2,
+        "destroy": 4,
+        "bulk_equations": 11,
+        "save_equations": 11,
+        "cache_stats": 0,
+    }
+
+    @action(detail=True, methods=["post"], url_path="equations")
+    def bulk_equations(self, request: Request, pk: str = None) -> Response:
+        """
+        Create, update and delete many equations of a graph in a single transaction.
+
+        The equations with an id are updated, the ones without are created, and the ids listed in "deleted" are
+        deleted. Every equation to be updated or deleted must belong to the graph.
+
+        Args:
+            request (Request): The HTTP request object, with the "equations" to upsert and the ids "deleted".
+            pk (str): The id of the graph.
+
+        Returns:
+            Response: A JSON response containing every equation of the graph after the write,
+                or an error response if the equations are invalid.
+        """
+        graph = self.get_object()
+        serializer = EquationBulkSerializer(data=request.data, context={"graph": graph})
+        serializer.is_valid(raise_exception=True)
+        equations = serializer.save()
+        return Response(
+            EquationSerializer(equations, many=True).data, status=status.HTTP_200_OK
+        )
+
+    @action(detail=True, methods=["post"], url_path="save")
+    def save_equations(self, request: Request, pk: str = None) -> Response:
+        """
+        Save the equations added, changed and removed since a version of a graph.
+
+        Only the delta is written, along with a new version of the graph. A delta that changes nothing does not write
+        anything, and leaves the version of the graph unchanged.
+
+        Args:
+            request (Request): The HTTP request object, with the "version" of the graph the delta was made on, the
+                equations "added", the changed fields of the equations "changed" and the ids "removed".
+            pk (str): The id of the graph.
+
+        Returns:
+            Response: A JSON response containing the new version of the graph and the equations added,
+                or an error response if the delta is invalid or the version is outdated.
+        """
+        graph = self.get_object()
+        serializer = GraphPatchSerializer(data=request.data, context={"graph": graph})
+        serializer.is_valid(raise_exception=True)
+        result = serializer.save()
+        data = {
+            "version": result["version"],
+            "added": EquationSerializer(result["added"], many=True).data,
+        }
+        return Response(data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"], url_path="cache/stats")
+    def cache_stats(self, request: Request) -> Response:
+        """
+        Return the number of hits and misses of the graph cache in this process, and its hit ratio.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: A JSON response containing the counters of the cache.
+        """
+        return Response(get_graph_cache().stats(), status=status.HTTP_200_OK)
+
+    def get_cached_graph_id(self) -> Optional[int]:
+        """
+        Return the id of the graph retrieved, so that its details are served from the graph cache.
+
+        Returns:
+            Optional[int]: The id of the graph, or None when the graphs are listed.
+        """
+        pk = str(self.kwargs.get("pk", ""))
+        return int(pk) if self.action == "retrieve" and pk.isdigit() else None
+
+    def get_validators(self) -> Optional[Validators]:
+        """
+        Return the version and the updated time of the graph retrieved, or the version of the graphs listed.
+
+        The graphs listed are versioned by their number, the sum of their versions and their last updated time, so
+        that adding, updating or deleting one of them changes the validators. They are sent without a modification
+        time, since deleting a graph other than the last updated one does not move it forward.
+
+        Returns:
+            Optional[Validators]: The validators of the graphs, or None if there are no graphs.
+        """
+        queryset = (
+            self.filter_queryset(self.get_queryset()).prefetch_related(None).order_by()
+        )
+        nested = self.is_nested()
+        if self.action == "retrieve":
+            try:
+                row = (
+                    queryset.filter(pk=self.kwargs["pk"])
+                    .values_list("version", "updated")
+                    .first()
+                )
+            except (TypeError, ValueError, ValidationError):
+                return None
+            if row is None:
+                return None
+            version, updated = row
+            return (
+                f"graph:{self.kwargs['pk']}:{nested}:{version}:{updated.isoformat()}",
+                updated,
+            )
+        aggregate = queryset.aggregate(
+            count=Count("id"), version=Sum("version"), updated=Max("updated")
+        )
+        if aggregate["updated"] is None:
+            return None
+        key = ":".join(
+            str(aggregate[field]) for field in ["count", "version", "updated"]
+        )
+        return f"graphs:{nested}:{key}", None
+
+    def perform_destroy(self, instance: Graph) -> None:
+        """
+        Delete a graph, and notify its subscribers that it was deleted.
+
+        Args:
+            instance (Graph): The graph to be deleted.
+        """
+        graph_id = instance.id
+        instance.delete()
+        record_graph_deleted(graph_id)
+
+    def is_nested(self) -> bool:
+        """
+        Check whether the equations of the graphs are requested along with the graphs.
+
+        Returns:
+            bool: True for a GET request with the nested query parameter set to true.
+        """
+        return self.request.method == "GET" and self.request.query_params.get(
+            "nested", ""
+        ).lower() in ["1", "true"]
+
+    def get_queryset(self) -> QuerySet:
+        """
+        Return the graphs, only the ones of the given owner when the owner query parameter is set.
+
+        The equations of the graphs are prefetched ordered by id in nested mode.
+
+        Returns:
+            QuerySet: The graphs.
+        """
+        queryset = super().get_queryset()
+        owner = self.request.query_params.get("owner")
+        if owner is not None:
+            queryset = queryset.filter(owner=owner)
+        if self.is_nested():
+            queryset = queryset.prefetch_related(
+                Prefetch("equation_set", queryset=Equation.objects.order_by("id"))
+            )
+        return queryset
+
+    def get_serializer_class(self) -> type[BaseSerializer]:
+        """
+        Return the serializer of the graphs, nesting their equations in nested mode.
+
+        Returns:
+            type[BaseSerializer]: The serializer class.
+        """
+        if self.is_nested():
+            return GraphDetailSerializer
+        return super().get_serializer_class()
@@ -0,0 +1,242 @@
+"""
+GraphEventsASGIApplication is an ASGI application that pushes the changes of a graph to its editors.
+
+The changes made to the equations of a graph are pushed over server-sent events, so that the editors do not poll the
+graph and equation views. The application accepts GET requests on /api/viewset/graphs/{graph_id}/events/, and passes
+the other requests on to the Django application it wraps.
+- With GET request, the response streams an event for every equation created, updated or deleted in the graph, with
+  the fields of the created and updated equations, until the graph is deleted or the client disconnects.
+- With the Last-Event-ID header, or the last_event_id query parameter, the events published since that event are
+  replayed first, or a graph.reset event is sent when they are no longer all kept, so that the client fetches the graph
+  again.
+
+A comment is sent when no event was published for a while, so that idle connections are kept open by the proxies. The
+stream is served by the event loop without a thread, since the streaming responses of Django are consumed synchronously.
+"""
+
+import asyncio
+import json
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.conf import settings
+from django.db import connection
+
+from ..models.graph import Graph
+from ..services.graph_events import GRAPH_DELETED, GraphEvent, get_graph_event_broker
+
+GRAPH_EVENTS_PATH = re.compile(r"^/api/viewset/graphs/(?P<graph_id>[0-9]+)/events/$")
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def format_event(event: GraphEvent) -> bytes:
+    """
+    Format an event as a server-sent event.
+
+    Args:
+        event (GraphEvent): The event.
+
+    Returns:
+        bytes: The id, type and JSON data of the event.
+    """
+    data = json.dumps(event.data, separators=(",", ":"))
+    return f"id: {event.id}\nevent: {event.type}\ndata: {data}\n\n".encode()
+
+
+def graph_exists(graph_id: int) -> bool:
+    """
+    Check whether a graph exists, closing the database connection afterwards since no request cycle of Django does.
+
+    Args:
+        graph_id (int): The id of the graph.
+
+    Returns:
+        bool: True if the graph exists.
+    """
+    try:
+        return Graph.objects.filter(id=graph_id).exists()
+    finally:
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+class GraphEventsASGIApplication:
+    """A class used to represent an ASGI application streaming the events of the graphs."""
+
+    def __init__(
+        self, application: Callable, keepalive: Optional[float] = None
+    ) -> None:
+        """
+        Initialize the application.
+
+        Args:
+            application (Callable): The ASGI application serving the other requests.
+            keepalive (Optional[float]): The number of seconds after which a comment is sent when no event was
+                published, taken from the GRAPH_EVENTS setting by default.
+        """
+        self.application = application
+        self.keepalive = (
+            settings.GRAPH_EVENTS["KEEPALIVE"] if keepalive is None else keepalive
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Stream the events of a graph, or pass the request on to the wrapped application.
+
+        Args:
+            scope (Scope): The connection scope.
+            receive (Receive): The awaitable receiving the messages of the client.
+            send (Send): The awaitable sending the messages of the response.
+        """
+        match = (
+            GRAPH_EVENTS_PATH.match(scope["path"]) if scope["type"] == "http" else None
+        )
+        if match is None:
+            await self.application(scope, receive, send)
+            return
+        if scope["method"] not in ["GET", "HEAD"]:
+            await self.send_error(
+                send, 405, "Method not allowed.", [(b"allow", b"GET, HEAD")]
+            )
+            return
+        graph_id = int(match["graph_id"])
+        async with ThreadSensitiveContext():
+            exists = await sync_to_async(graph_exists)(graph_id)
+        if not exists:
+            await self.send_error(send, 404, "Not found.")
+            return
+        await self.stream(graph_id, scope, receive, send)
+
+    async def stream(
+        self, graph_id: int, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """
+        Stream the events of a graph until it is deleted, the client disconnects or falls behind.
+
+        Args:
+            graph_id (int): The id of the graph.
+            scope (Scope): The connection scope.
+            receive (Receive): The awaitable receiving the messages of the client.
+            send (Send): The awaitable sending the messages of the response.
+        """
+        broker = get_graph_event_broker()
+        subscription = broker.subscribe(graph_id, self.last_event_id(scope))
+        headers = [
+            (b"content-type", b"text/event-stream"),
+            (b"cache-control", b"no-cache"),
+            (b"x-accel-buffering", b"no"),
+        ]
+        if settings.CORS_ALLOW_ALL_ORIGINS:
+            headers.append((b"access-control-allow-origin", b"*"))
+        disconnected = asyncio.ensure_future(self.wait_for_disconnect(receive))
+        try:
+            await send(
+                {"type": "http.response.start", "status": 200, "headers": headers}
+            )
+            if scope["method"] == "HEAD":
+                return
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": b": connected\n\n",
+                    "more_body": True,
+                }
+            )
+            while True:
+                next_event = asyncio.ensure_future(subscription.get())
+                done, _ = await asyncio.wait(
+                    [next_event, disconnected],
+                    timeout=self.keepalive,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnected in done:
+                    next_event.cancel()
+                    return
+                if next_event not in done:
+                    next_event.cancel()
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": b": keepalive\n\n",
+                            "more_body": True,
+                        }
+                    )
+                    continue
+                event = next_event.result()
+                if event is None:
+                    break
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": format_event(event),
+                        "more_body": True,
+                    }
+                )
+                if event.type == GRAPH_DELETED:
+                    break
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            disconnected.cancel()
+            broker.unsubscribe(subscription)
+
+    @staticmethod
+    def last_event_id(scope: Scope) -> Optional[int]:
+        """
+        Return the id of the last event received by a reconnecting client.
+
+        Args:
+            scope (Scope): The connection scope.
+
+        Returns:
+            Optional[int]: The id from the Last-Event-ID header or the last_event_id query parameter, or None.
+        """
+        values = [value for name, value in scope["headers"] if name == b"last-event-id"]
+        values += parse_qs(scope.get("query_string", b"").decode()).get(
+            "last_event_id", []
+        )
+        for value in values:
+            value = value.decode() if isinstance(value, bytes) else value
+            if value.strip().isdigit():
+                return int(value)
+        return None
+
+    @staticmethod
+    async def wait_for_disconnect(receive: Receive) -> None:
+        """
+        Wait until the client disconnects.
+
+        Args:
+            receive (Receive): The awaitable receiving the messages of the client.
+        """
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    @staticmethod
+    async def send_error(
+        send: Send, status: int, detail: str, headers: List[Tuple[bytes, bytes]] = None
+    ) -> None:
+        """
+        Send an error response, in the envelope of the API.
+
+        Args:
+            send (Send): The awaitable sending the messages of the response.
+            status (int): The HTTP status of the response.
+            detail (str): The detail of the error.
+            headers (List[Tuple[bytes, bytes]]): The additional headers of the response.
+        """
+        body = json.dumps(
+            {"status": status, "message": "fail", "data": {"detail": detail}}
+        ).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json")] + (headers or []),
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
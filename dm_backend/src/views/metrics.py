@@ -0,0 +1,37 @@
+"""
+The metrics view exposes the performance metrics of the server in the text format of Prometheus.
+
+The view accepts GET requests on /metrics, and returns the request latencies, SQL query counts and times, serializer
+and renderer times of every view, and the parse time of the expressions, as recorded since the server started by every
+process sharing the metrics directory. It is a plain Django view, since Prometheus expects the text format rather than
+the JSON envelope of the API, and it answers 403 to the requests neither bearing the metrics token nor coming from an
+allowed network.
+"""
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+
+from ..services.metrics import REGISTRY, metrics_allowed
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@require_GET
+def metrics(request: HttpRequest) -> HttpResponse:
+    """
+    Return the metrics of the server processes.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The metrics in the Prometheus text exposition format, or a 403 response if the request may not
+            read them.
+    """
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        REGISTRY.render(settings.METRICS["DIRECTORY"]),
+        content_type=PROMETHEUS_CONTENT_TYPE,
+    )
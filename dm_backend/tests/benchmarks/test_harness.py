@@ -0,0 +1,79 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from dm_backend.benchmarks.corpus import expression_corpus
+from dm_backend.benchmarks.harness import percentile, run_benchmarks
+from dm_backend.src.models.equation import Equation
+
+
+class PercentileTest(SimpleTestCase):
+    def test_nearest_rank(self):
+        values = list(range(100, 0, -1))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3.0], 99), 3.0)
+
+    def test_corpus_is_stable(self):
+        self.assertEqual(expression_corpus(6), expression_corpus(10)[:6])
+        self.assertEqual(expression_corpus(2), ["a0 = 1", "f1(x) = x^{2} + a0"])
+
+
+class RunBenchmarksTest(TestCase):
+    def test_runs_every_case(self):
+        results = run_benchmarks(
+            graphs=2, equations=3, requests=2, warmup=1, parse_sizes=[1, 4]
+        )
+        self.assertEqual(
+            Equation.objects.filter(graph__isnull=False).count(), 2 * 3 + 3
+        )
+        self.assertEqual(
+            [result["name"] for result in results["results"]],
+            [
+                "graph_list",
+                "graph_detail",
+                "equation_list",
+                "equation_create",
+                "parse_expressions[1]",
+                "parse_expressions[4]",
+            ],
+        )
+        for result in results["results"]:
+            self.assertEqual(sum(result["status_codes"].values()), 2)
+            self.assertTrue(
+                all(code.startswith("2") for code in result["status_codes"])
+            )
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+        self.assertEqual(results["scale"]["graphs"], 2)
+
+
+class BenchmarkCommandTest(SimpleTestCase):
+    @mock.patch("dm_backend.management.commands.benchmark.teardown_test_environment")
+    @mock.patch("dm_backend.management.commands.benchmark.setup_test_environment")
+    @mock.patch("django.db.connection.creation.destroy_test_db")
+    @mock.patch("django.db.connection.creation.create_test_db")
+    @mock.patch(
+        "dm_backend.management.commands.benchmark.run_benchmarks",
+        return_value={"results": []},
+    )
+    def test_writes_results_as_json(self, run, create, destroy, *mocks):
+        stdout = StringIO()
+        call_command(
+            "benchmark",
+            "--graphs",
+            "5",
+            "--parse-sizes",
+            "2,3",
+            "--cases",
+            "graph_list",
+            stdout=stdout,
+        )
+        self.assertEqual(json.loads(stdout.getvalue()), {"results": []})
+        self.assertEqual(run.call_args.kwargs["graphs"], 5)
+        self.assertEqual(run.call_args.kwargs["parse_sizes"], [2, 3])
+        self.assertEqual(run.call_args.kwargs["cases"], ["graph_list"])
+        create.assert_called_once()
+        destroy.assert_called_once()
@@ -0,0 +1,34 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from dm_backend.benchmarks.corpus import EXPRESSION_TYPES
+from dm_backend.benchmarks.parser import parse_group, run_parser_benchmarks
+
+
+class ParserBenchmarksTest(SimpleTestCase):
+    def test_every_type_of_the_corpus_parses(self):
+        for name, group in EXPRESSION_TYPES.items():
+            with self.subTest(name):
+                self.assertEqual(len(parse_group(group)), len(group[1]))
+
+    def test_run_parser_benchmarks(self):
+        results = run_parser_benchmarks(repeat=2, types=["variables"], functions=3)
+        [result] = results["results"]
+        self.assertEqual(result["type"], "variables")
+        self.assertEqual(result["samples"], 2 * 3)
+        self.assertLessEqual(result["p50_ms"], result["max_ms"])
+        self.assertGreater(result["stages"]["GraphSession.execute"], 0)
+        self.assertEqual(len(result["functions"]), 3)
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command(
+            "benchmark_parser", "--repeat", "1", "--types", "latex", stdout=stdout
+        )
+        self.assertEqual(
+            [result["type"] for result in json.loads(stdout.getvalue())["results"]],
+            ["latex"],
+        )
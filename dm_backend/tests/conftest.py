@@ -0,0 +1,20 @@
+import pytest
+
+from dm_backend.src.services.expression_parser import warm_up_parser
+
+
+@pytest.fixture(autouse=True)
+def query_budget(settings):
+    settings.QUERY_BUDGET = settings.QUERY_BUDGET | {"ENABLED": True, "RAISE": True}
+
+
+@pytest.fixture(autouse=True)
+def graph_events(settings):
+    settings.GRAPH_EVENTS = settings.GRAPH_EVENTS | {
+        "BACKEND": "dm_backend.src.services.graph_events.InMemoryGraphEventBroker"
+    }
+
+
+@pytest.fixture(scope="session", autouse=True)
+def warm_parser():
+    warm_up_parser()
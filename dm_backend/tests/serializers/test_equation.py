@@ -88,3 +88,15 @@ class EquationSerializerTest(TestCase):
             equation, self.validated_data | {"equation": "y = 2x"}
         )
         self.assertEqual(updated_equation.equation, "y = 2x")
+
+    def test_move_equation_parses_previous_graph_again(self):
+        """Test that the equations left in the previous graph of a moved equation are parsed again."""
+        graph = graph_recipe.make(name="other_graph")
+        data = self.validated_data | {"graph": graph}
+        serializer = EquationSerializer()
+        definition = serializer.create(data | {"equation": "a = 2"})
+        call = serializer.create(data | {"equation": "y = a x"})
+        self.assertEqual(call.parsed_equation, "y = 2*x")
+        serializer.update(definition, data | {"equation": "a = 2", "graph": self.graph})
+        call.refresh_from_db()
+        self.assertEqual(call.parsed_equation, "y = a*x")
@@ -0,0 +1,58 @@
+from django.test import TestCase
+
+from dm_backend.src.models.equation import Equation
+from dm_backend.src.serializers.equation_bulk import EquationBulkSerializer
+from dm_backend.tests.baker_recipes.equation_baker_recipe import equation_recipe
+from dm_backend.tests.baker_recipes.graph_baker_recipe import graph_recipe
+
+
+class EquationBulkSerializerTest(TestCase):
+    def setUp(self):
+        self.graph = graph_recipe.make(name="test_graph")
+        self.equation = equation_recipe.make(graph=self.graph)
+        self.data = {
+            "equation": "y = 2x",
+            "parsed_equation": "y = 2*x",
+            "color": 1,
+            "line_style": "polyline",
+            "line_width": 1,
+        }
+
+    def serializer(self, data):
+        return EquationBulkSerializer(data=data, context={"graph": self.graph})
+
+    def test_upsert_and_delete(self):
+        other = equation_recipe.make(graph=self.graph)
+        serializer = self.serializer(
+            {
+                "equations": [self.data | {"id": self.equation.id}, self.data],
+                "deleted": [other.id],
+            }
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        equations = serializer.save()
+        self.assertEqual(len(equations), 2)
+        self.assertEqual(equations[0].id, self.equation.id)
+        self.assertEqual(equations[0].parsed_equation, "y = 2*x")
+        self.assertEqual(equations[1].graph, self.graph)
+        self.assertFalse(Equation.objects.filter(id=other.id).exists())
+
+    def test_equation_of_another_graph(self):
+        other = equation_recipe.make(graph=graph_recipe.make(name="other_graph"))
+        serializer = self.serializer({"deleted": [other.id]})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn(str(other.id), str(serializer.errors["non_field_errors"]))
+
+    def test_repeated_equation(self):
+        serializer = self.serializer(
+            {
+                "equations": [self.data | {"id": self.equation.id}],
+                "deleted": [self.equation.id],
+            }
+        )
+        self.assertFalse(serializer.is_valid())
+
+    def test_invalid_equation(self):
+        serializer = self.serializer({"equations": [self.data | {"color": "red"}]})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("color", serializer.errors["equations"][0])
@@ -0,0 +1,64 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import NotFound
+
+from dm_backend.src.models.graph import Graph
+from dm_backend.src.serializers.graph_patch import GraphPatchSerializer, GraphVersionConflict
+from dm_backend.tests.baker_recipes.equation_baker_recipe import equation_recipe
+from dm_backend.tests.baker_recipes.graph_baker_recipe import graph_recipe
+
+
+class GraphPatchSerializerTest(TestCase):
+    def setUp(self):
+        self.graph = graph_recipe.make(name="test_graph", version=3)
+        self.equation = equation_recipe.make(graph=self.graph, color=1)
+
+    def save(self, data):
+        serializer = GraphPatchSerializer(data=data, context={"graph": self.graph})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        return serializer.save()
+
+    def test_changes_only_given_fields(self):
+        result = self.save(
+            {"version": 3, "changed": [{"id": self.equation.id, "color": 2}]}
+        )
+        self.assertEqual(result, {"version": 4, "added": []})
+        self.equation.refresh_from_db()
+        self.assertEqual(self.equation.color, 2)
+        self.assertEqual(Graph.objects.get(id=self.graph.id).version, 4)
+
+    def test_unchanged_delta_writes_nothing(self):
+        updated = Graph.objects.get(id=self.graph.id).updated
+        with CaptureQueriesContext(connection) as context:
+            result = self.save(
+                {"version": 3, "changed": [{"id": self.equation.id, "color": 1}]}
+            )
+        self.assertEqual(result["version"], 3)
+        for query in context.captured_queries:
+            self.assertFalse(query["sql"].startswith(("INSERT", "UPDATE", "DELETE")))
+        self.assertEqual(Graph.objects.get(id=self.graph.id).updated, updated)
+
+    def test_stale_version(self):
+        with self.assertRaises(GraphVersionConflict) as context:
+            self.save({"version": 2, "removed": [self.equation.id]})
+        self.assertIn("current version is 3", str(context.exception.detail))
+        self.assertTrue(self.graph.equation_set.filter(id=self.equation.id).exists())
+
+    def test_deleted_graph(self):
+        serializer = GraphPatchSerializer(
+            data={"version": 3, "changed": [{"id": self.equation.id, "color": 2}]},
+            context={"graph": self.graph},
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        Graph.objects.filter(id=self.graph.id).delete()
+        with self.assertRaises(NotFound):
+            serializer.save()
+
+    def test_equation_of_another_graph(self):
+        other = equation_recipe.make(graph=graph_recipe.make(name="other_graph"))
+        serializer = GraphPatchSerializer(
+            data={"version": 3, "changed": [{"id": other.id, "color": 2}]},
+            context={"graph": self.graph},
+        )
+        self.assertFalse(serializer.is_valid())
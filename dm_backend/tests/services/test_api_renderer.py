@@ -0,0 +1,61 @@
+import datetime
+import decimal
+import json
+import uuid
+
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.response import Response
+
+from dm_backend.src.services.api_renderer import APIRenderer
+
+
+def render(data, status=200, pagination=None, accepted_media_type=None):
+    response = Response(data, status=status)
+    if pagination is not None:
+        response.pagination = pagination
+    return APIRenderer().render(
+        data, accepted_media_type, {"response": response, "indent": None}
+    )
+
+
+class APIRendererTest(SimpleTestCase):
+    data = {
+        "id": 1,
+        "equation": "y = \\sin(x) \u00b7 \u2028",
+        "x": [0.0, 0.1, 1.5, -2.25, 1e15],
+        "nested": [{"a": None, "b": True}, (1, 2)],
+        2: "integer key",
+        "created": datetime.datetime(2023, 4, 1, 12, 30, 15, 123456),
+        "date": datetime.date(2023, 4, 1),
+        "ratio": decimal.Decimal("0.25"),
+        "uuid": uuid.UUID(int=1),
+        "detail": gettext_lazy("Not found."),
+    }
+
+    def test_same_output_as_json_renderer(self):
+        pagination = {"next": "http://testserver/?cursor=b", "previous": None}
+        for status, extra in [(200, {}), (404, {}), (200, {"pagination": pagination})]:
+            with self.subTest(status=status, **extra):
+                content = render(self.data, status, **extra)
+                with override_settings(API_JSON_ENCODER="json"):
+                    self.assertEqual(content, render(self.data, status, **extra))
+
+    def test_envelope(self):
+        content = json.loads(render([1, 2], pagination={"next": None}))
+        self.assertEqual(
+            content,
+            {"status": 200, "message": "success", "data": [1, 2], "next": None},
+        )
+
+    def test_float_exponents_are_equal(self):
+        content = json.loads(render([1e300, 1e-7]))
+        self.assertEqual(content["data"], [1e300, 1e-7])
+
+    def test_falls_back_on_unsupported_data(self):
+        content = render({"big": 2**70})
+        self.assertEqual(json.loads(content)["data"], {"big": 2**70})
+
+    def test_indented_on_request(self):
+        content = render({"id": 1}, accepted_media_type="application/json; indent=2")
+        self.assertIn(b'\n  "status": 200', content)
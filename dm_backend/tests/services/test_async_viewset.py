@@ -0,0 +1,67 @@
+import asyncio
+
+from django.test import AsyncClient, TestCase
+
+from dm_backend.src.views.equation import EquationAPIViewSet
+from dm_backend.src.views.equation_parser import EquationParserAPIViewSet
+from dm_backend.src.views.graph import GraphAPIViewSet
+from dm_backend.tests.baker_recipes.equation_baker_recipe import equation_recipe
+from dm_backend.tests.baker_recipes.graph_baker_recipe import graph_recipe
+
+
+class AsyncViewSetTest(TestCase):
+    def setUp(self):
+        self.client = AsyncClient()
+        self.graph = graph_recipe.make(name="a", owner="test_owner")
+        self.equation = equation_recipe.make(graph=self.graph, equation="y = x")
+
+    def test_views_are_coroutine_functions(self):
+        for viewset, actions in [
+            (GraphAPIViewSet, {"get": "list"}),
+            (EquationAPIViewSet, {"get": "retrieve"}),
+            (EquationParserAPIViewSet, {"post": "parse_expressions"}),
+        ]:
+            view = viewset.as_view(actions)
+            self.assertTrue(asyncio.iscoroutinefunction(view))
+            self.assertIs(view.cls, viewset)
+            self.assertTrue(view.csrf_exempt)
+
+    async def test_list(self):
+        response = await self.client.get("/api/viewset/graphs/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [graph["id"] for graph in response.json()["data"]], [self.graph.id]
+        )
+
+    async def test_retrieve(self):
+        response = await self.client.get(f"/api/viewset/equations/{self.equation.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["equation"], "y = x")
+
+    async def test_retrieve_missing(self):
+        response = await self.client.get("/api/viewset/graphs/999/")
+        self.assertEqual(response.status_code, 404)
+
+    async def test_create_update_and_destroy(self):
+        url = "/api/viewset/graphs/"
+        payload = {"name": "b", "owner": "test_owner"}
+        response = await self.client.post(url, payload, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        url = f"{url}{response.json()['data']['id']}/"
+        response = await self.client.patch(
+            url, {"name": "c"}, content_type="application/json"
+        )
+        self.assertEqual(response.json()["data"]["name"], "c")
+        response = await self.client.delete(url)
+        self.assertEqual(response.status_code, 204)
+        response = await self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_synchronous_action(self):
+        response = await self.client.post(
+            f"/api/viewset/graphs/{self.graph.id}/save/",
+            {"version": self.graph.version},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["version"], self.graph.version)
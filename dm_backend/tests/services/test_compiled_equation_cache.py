@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from dm_backend.src.services.compiled_equation_cache import (
+    CompiledEquationCache,
+    get_compiled_equation_cache,
+    normalize_equation,
+)
+
+
+class NormalizeEquationTest(TestCase):
+    def test_removes_whitespace(self):
+        self.assertEqual(normalize_equation(" y =  2*x\t+ 1 "), "y=2*x+1")
+
+
+class CompiledEquationCacheTest(TestCase):
+    def test_compiles_once(self):
+        cache = CompiledEquationCache()
+        compile = mock.Mock(return_value=abs)
+        self.assertIs(cache.get_or_compile("y = x", compile), abs)
+        self.assertIs(cache.get_or_compile("y=x", compile), abs)
+        compile.assert_called_once_with("y=x")
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_failures_are_not_cached(self):
+        cache = CompiledEquationCache()
+        compile = mock.Mock(side_effect=ValueError)
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                cache.get_or_compile("y = ?", compile)
+        self.assertEqual(compile.call_count, 2)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_evicts_least_recently_used(self):
+        cache = CompiledEquationCache(max_entries=2)
+        compile = mock.Mock(side_effect=lambda key: key)
+        cache.get_or_compile("a", compile)
+        cache.get_or_compile("b", compile)
+        cache.get_or_compile("a", compile)
+        cache.get_or_compile("c", compile)
+        cache.get_or_compile("a", compile)
+        cache.get_or_compile("b", compile)
+        self.assertEqual(compile.call_count, 4)
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["evictions"], 2)
+        self.assertEqual(stats["hit_ratio"], 2 / 6)
+
+    def test_prewarm(self):
+        cache = CompiledEquationCache(max_entries=2)
+
+        def compile(key):
+            if key == "invalid":
+                raise ValueError(key)
+            return key
+
+        self.assertEqual(cache.prewarm(["a", "invalid", "b", "c"], compile), 2)
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertEqual(cache.get_or_compile("b", compile), "b")
+
+    def test_clear(self):
+        cache = CompiledEquationCache()
+        cache.get_or_compile("a", str)
+        cache.clear()
+        self.assertEqual(
+            cache.stats(),
+            {
+                "entries": 0,
+                "max_entries": 1024,
+                "hits": 0,
+                "misses": 0,
+                "evictions": 0,
+                "hit_ratio": 0.0,
+            },
+        )
+
+    @override_settings(COMPILED_EQUATION_CACHE={"max_entries": 3, "prewarm": 0})
+    def test_cache_from_settings(self):
+        self.assertEqual(get_compiled_equation_cache().max_entries, 3)
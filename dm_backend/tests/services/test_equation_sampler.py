@@ -0,0 +1,157 @@
+import math
+
+import numpy as np
+from django.test import TestCase
+
+from dm_backend.src.enums.line_style_type import LineStyle
+from dm_backend.src.services.compiled_equation_cache import get_compiled_equation_cache
+from dm_backend.src.services.equation_sampler import (
+    ADAPTIVE_INITIAL_POINTS,
+    SamplingError,
+    adaptive_sample_equation,
+    compile_equation,
+    get_compiled_equation,
+    prewarm_compiled_equations,
+    sample_equation,
+    split_equation,
+)
+from dm_backend.tests.baker_recipes.equation_baker_recipe import equation_recipe
+from dm_backend.tests.baker_recipes.graph_baker_recipe import graph_recipe
+
+
+class SplitEquationTest(TestCase):
+    def test_supported_forms(self):
+        test_cases = [
+            ("y_func(x) = x/2", ("x", " x/2")),
+            ("f_func(t) = t^2", ("t", " t^2")),
+            ("y = 2*x + 1", ("x", " 2*x + 1")),
+            ("sin(x)", ("x", "sin(x)")),
+        ]
+        for parsed_equation, expected_output in test_cases:
+            with self.subTest(parsed_equation=parsed_equation):
+                self.assertEqual(split_equation(parsed_equation), expected_output)
+
+    def test_unsupported_forms(self):
+        for parsed_equation in ["x = 2", "a = b = c", "f(x, y) = x + y"]:
+            with self.subTest(parsed_equation=parsed_equation):
+                with self.assertRaises(SamplingError):
+                    split_equation(parsed_equation)
+
+
+class CompileEquationTest(TestCase):
+    def test_compile(self):
+        function = compile_equation("f_func(t) = t^2 + e^0 + pi")
+        self.assertAlmostEqual(function(2.0), 5 + math.pi)
+
+    def test_rejects_unknown_names(self):
+        for parsed_equation in ["y = a*x", "y = x.real", "y = __import__(x)", "y = x;"]:
+            with self.subTest(parsed_equation=parsed_equation):
+                with self.assertRaises(SamplingError):
+                    compile_equation(parsed_equation)
+
+    def test_rejects_oversized_powers(self):
+        for parsed_equation in [
+            "y = 9^9^9^2",
+            "y = x + 10^1001",
+            "y = x^(9^9^9)",
+            "y = (2^1000)^(2^10)",
+        ]:
+            with self.subTest(parsed_equation=parsed_equation):
+                with self.assertRaisesMessage(SamplingError, "too large"):
+                    compile_equation(parsed_equation)
+
+    def test_compiles_bounded_powers(self):
+        self.assertEqual(compile_equation("y = 2^10 * x")(2.0), 2048.0)
+        self.assertEqual(compile_equation("y = 0.5^(10^9) + x")(2.0), 2.0)
+
+
+class SampleEquationTest(TestCase):
+    def test_polyline_samples(self):
+        samples = sample_equation("y = 2*x + 1", -1, 1, 3)
+        self.assertEqual(samples, {"x": [-1.0, 0.0, 1.0], "y": [-1.0, 1.0, 3.0]})
+
+    def test_polyline_breaks_on_undefined_values(self):
+        samples = sample_equation("y = sqrt(x)", -1, 1, 3)
+        self.assertEqual(samples["y"], [None, 0.0, 1.0])
+
+    def test_constant_equation(self):
+        samples = sample_equation("y = 3", 0, 1, 4)
+        self.assertEqual(samples["y"], [3.0] * 4)
+
+    def test_scatter_drops_undefined_and_hidden_points(self):
+        samples = sample_equation(
+            "y_func(x) = 1/x", -2, 2, 5, LineStyle.DOTTED, y_min=-1, y_max=1
+        )
+        self.assertEqual(
+            samples, {"x": [-2.0, -1.0, 1.0, 2.0], "y": [-0.5, -1.0, 1.0, 0.5]}
+        )
+
+
+class AdaptiveSampleEquationTest(TestCase):
+    def test_line_keeps_initial_points(self):
+        samples = adaptive_sample_equation("y = 2*x + 1", -10, 10, 1000)
+        self.assertEqual(len(samples["x"]), ADAPTIVE_INITIAL_POINTS)
+
+    def test_within_tolerance(self):
+        samples = adaptive_sample_equation("y = sin(x)", -10, 10, 1000, tolerance=1e-3)
+        x = np.linspace(-10, 10, 10001)
+        interpolated = np.interp(x, samples["x"], samples["y"])
+        self.assertLess(np.max(np.abs(interpolated - np.sin(x))), 1e-3)
+        self.assertLess(len(samples["x"]), 1000)
+
+    def test_respects_budget(self):
+        samples = adaptive_sample_equation("y = sin(x)", -10, 10, 100, tolerance=1e-9)
+        self.assertLessEqual(len(samples["x"]), 100)
+
+    def test_samples_are_sorted(self):
+        samples = adaptive_sample_equation("y = x^3 - x", -2, 2, 500)
+        self.assertEqual(samples["x"], sorted(samples["x"]))
+
+    def test_breaks_at_asymptotes(self):
+        samples = adaptive_sample_equation(
+            "y_func(x) = 1/x", -10, 10, 2000, y_min=-10, y_max=10
+        )
+        self.assertEqual(samples["y"].count(None), 1)
+        gap = samples["y"].index(None)
+        self.assertLess(samples["x"][gap - 1], 0)
+        self.assertGreater(samples["x"][gap + 1], 0)
+        self.assertLess(len(samples["x"]), 400)
+
+    def test_scatter_drops_breaks(self):
+        samples = adaptive_sample_equation(
+            "y_func(x) = 1/x", -10, 10, 2000, LineStyle.DOTTED, y_min=-10, y_max=10
+        )
+        self.assertNotIn(None, samples["y"])
+        self.assertTrue(all(-10 <= y <= 10 for y in samples["y"]))
+
+
+class CompiledEquationTest(TestCase):
+    def setUp(self):
+        get_compiled_equation_cache().clear()
+
+    def test_sampling_reuses_compiled_equation(self):
+        sample_equation("y = x^2", -1, 1, 3)
+        sample_equation("y = x ^ 2", -2, 2, 5)
+        stats = get_compiled_equation_cache().stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_prewarm_most_frequent_equations(self):
+        graph = graph_recipe.make()
+        equation_recipe.make(graph=graph, parsed_equation="y = x", _quantity=3)
+        equation_recipe.make(graph=graph, parsed_equation="y = x^2", _quantity=2)
+        equation_recipe.make(graph=graph, parsed_equation="y = x^3")
+        self.assertEqual(prewarm_compiled_equations(2), 2)
+        cache = get_compiled_equation_cache()
+        self.assertEqual(cache.stats()["entries"], 2)
+        get_compiled_equation("y = x^2")
+        self.assertEqual(cache.stats()["hits"], 1)
+        get_compiled_equation("y = x^3")
+        self.assertEqual(cache.stats()["misses"], 3)
+
+    def test_prewarm_skips_oversized_equations(self):
+        graph = graph_recipe.make()
+        equation_recipe.make(graph=graph, parsed_equation="y = 9^9^9^2", _quantity=2)
+        equation_recipe.make(graph=graph, parsed_equation="y = x")
+        self.assertEqual(prewarm_compiled_equations(2), 1)
+        self.assertEqual(get_compiled_equation_cache().stats()["entries"], 1)
@@ -0,0 +1,47 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from dm_backend.src.services import expression_parser
+from dm_backend.src.services.expression_parser import (
+    SUB_RULES,
+    WARM_UP_EXPRESSIONS,
+    graph_session_template,
+    new_graph_session,
+    parse_expression,
+    warm_up_parser,
+)
+
+
+class GraphSessionTemplateTest(SimpleTestCase):
+    def test_sessions_are_cloned_from_template(self):
+        env = {"a": "2"}
+        first, second = new_graph_session(env), new_graph_session()
+        self.assertEqual(first.get_sub_rules(), SUB_RULES)
+        first.add_sub_rule("x", "y")
+        parse_expression(first, "b = 3")
+        self.assertEqual(second.get_sub_rules(), SUB_RULES)
+        self.assertEqual(graph_session_template().get_sub_rules(), SUB_RULES)
+        self.assertEqual(graph_session_template().get_env(), {})
+        self.assertEqual(env, {"a": "2"})
+        self.assertEqual(parse_expression(second, "c = 4"), "c = 4")
+        self.assertNotIn("b", second.get_env())
+
+    def test_template_is_created_once(self):
+        self.assertIs(graph_session_template(), graph_session_template())
+
+    @mock.patch.object(expression_parser, "_warmed_up", False)
+    def test_warm_up_parser_once(self):
+        with mock.patch.object(
+            expression_parser,
+            "parse_expressions",
+            wraps=expression_parser.parse_expressions,
+        ) as parse_expressions:
+            warm_up_parser()
+            warm_up_parser()
+        parse_expressions.assert_called_once_with(WARM_UP_EXPRESSIONS)
+
+    @mock.patch.object(expression_parser, "_warmed_up", False)
+    @mock.patch.object(expression_parser, "WARM_UP_EXPRESSIONS", ["2$x$"])
+    def test_warm_up_never_fails(self):
+        warm_up_parser()
@@ -0,0 +1,132 @@
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from dm_backend.src.models.equation import Equation
+from dm_backend.src.services.async_viewset import AsyncModelViewSet
+from dm_backend.src.services.graph_cache import (
+    GraphCache,
+    get_graph_cache,
+    invalidate_graph_cache,
+    reset_graph_cache,
+)
+from dm_backend.tests.baker_recipes.equation_baker_recipe import equation_recipe
+from dm_backend.tests.baker_recipes.graph_baker_recipe import graph_recipe
+
+
+class GraphCacheTest(TestCase):
+    def setUp(self):
+        caches["graphs"].clear()
+        self.cache = GraphCache("graphs")
+
+    def test_invalidates_every_response_of_graph(self):
+        first, second = self.cache.generation(1), self.cache.generation(2)
+        self.cache.set(1, first, "a", ({"id": 1}, None))
+        self.cache.set(1, first, "b", ([], {"next": None}))
+        self.cache.set(2, second, "a", ({"id": 2}, None))
+        self.assertEqual(self.cache.get(1, first, "b"), ([], {"next": None}))
+        self.cache.invalidate(1)
+        generation = self.cache.generation(1)
+        self.assertNotEqual(generation, first)
+        self.assertIsNone(self.cache.get(1, generation, "a"))
+        self.assertIsNone(self.cache.get(1, generation, "b"))
+        self.assertEqual(self.cache.get(2, second, "a"), ({"id": 2}, None))
+        self.assertEqual(
+            self.cache.stats(),
+            {"hits": 2, "misses": 2, "hit_ratio": 0.5, "invalidations": 1},
+        )
+
+    def test_skips_responses_read_before_invalidation(self):
+        generation = self.cache.generation(1)
+        self.cache.invalidate(1)
+        self.assertFalse(self.cache.set(1, generation, "a", ({"id": 1}, None)))
+        self.assertIsNone(self.cache.get(1, generation, "a"))
+        self.assertIsNone(self.cache.get(1, self.cache.generation(1), "a"))
+
+    def test_model_signals_invalidate_graph(self):
+        graph_cache = get_graph_cache()
+        graph = graph_recipe.make()
+        generation = graph_cache.generation(graph.id)
+        graph_cache.set(graph.id, generation, "a", ({"id": graph.id}, None))
+        equation = equation_recipe.make(graph=graph)
+        generation = graph_cache.generation(graph.id)
+        self.assertIsNone(graph_cache.get(graph.id, generation, "a"))
+        graph_cache.set(graph.id, generation, "a", ({"id": graph.id}, None))
+        equation.delete()
+        self.assertIsNone(
+            graph_cache.get(graph.id, graph_cache.generation(graph.id), "a")
+        )
+
+
+class GraphCacheMixinTest(TestCase):
+    def setUp(self):
+        caches["graphs"].clear()
+        reset_graph_cache("GRAPH_CACHE")
+        self.client = APIClient()
+        self.graph = graph_recipe.make()
+        self.equation = equation_recipe.make(graph=self.graph)
+        self.graph_url = f"/api/viewset/graphs/{self.graph.id}/"
+        self.equations_url = f"/api/viewset/equations/?graph={self.graph.id}"
+
+    def test_serves_graph_from_cache_until_written(self):
+        self.client.get(self.graph_url, {"nested": "true"})
+        with self.assertNumQueries(1):
+            response = self.client.get(self.graph_url, {"nested": "true"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["equations"][0]["id"], self.equation.id)
+        self.client.put(self.graph_url, {"name": "renamed", "owner": "owner"})
+        response = self.client.get(self.graph_url, {"nested": "true"})
+        self.assertEqual(response.data["name"], "renamed")
+
+    def test_serves_equations_of_graph_from_cache_until_written(self):
+        self.client.get(self.equations_url)
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.equations_url, HTTP_ACCEPT="application/msgpack"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.post(
+            f"/api/viewset/graphs/{self.graph.id}/equations/",
+            {"equations": [{"equation": "y = 2x", "color": 0, "line_width": 1}]},
+            format="json",
+        )
+        response = self.client.get(self.equations_url)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(
+            [equation["id"] for equation in response.data],
+            list(Equation.objects.order_by("id").values_list("id", flat=True)),
+        )
+
+    def test_does_not_store_response_read_before_write(self):
+        retrieve = AsyncModelViewSet.retrieve
+
+        async def retrieve_then_write(viewset, request, *args, **kwargs):
+            response = await retrieve(viewset, request, *args, **kwargs)
+            await sync_to_async(invalidate_graph_cache)(self.graph.id)
+            return response
+
+        with mock.patch.object(AsyncModelViewSet, "retrieve", retrieve_then_write):
+            self.client.get(self.graph_url)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.graph_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cache_stats(self):
+        self.client.get(self.graph_url)
+        self.client.get(self.graph_url)
+        response = self.client.get("/api/viewset/graphs/cache/stats/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["hits"], 1)
+        self.assertEqual(response.data["misses"], 1)
+        self.assertEqual(response.data["hit_ratio"], 0.5)
+
+    @override_settings(GRAPH_CACHE=settings.GRAPH_CACHE | {"ENABLED": False})
+    def test_disabled_cache(self):
+        self.client.get(self.graph_url)
+        with self.assertNumQueries(2):
+            self.client.get(self.graph_url)
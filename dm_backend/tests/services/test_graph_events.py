@@ -0,0 +1,189 @@
+import asyncio
+import threading
+from unittest import skipUnless
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from dm_backend.src.services.graph_events import (
+    EQUATION_CREATED,
+    EQUATION_DELETED,
+    EQUATION_UPDATED,
+    GRAPH_RESET,
+    GraphChanges,
+    GraphEvent,
+    InMemoryGraphEventBroker,
+    PostgresGraphEventBroker,
+    get_graph_event_broker,
+    parse_notification,
+    record_equation_changes,
+    reset_graph_event_broker,
+)
+from dm_backend.tests.baker_recipes.equation_baker_recipe import equation_recipe
+from dm_backend.tests.baker_recipes.graph_baker_recipe import graph_recipe
+
+
+async def received_events(broker, graph_id, last_event_id=0):
+    subscription = broker.subscribe(graph_id, last_event_id)
+    events = []
+    try:
+        while True:
+            events.append(await asyncio.wait_for(subscription.get(), 0.05))
+    except asyncio.TimeoutError:
+        return events
+    finally:
+        broker.unsubscribe(subscription)
+
+
+class InMemoryGraphEventBrokerTest(SimpleTestCase):
+    async def test_fans_out_to_subscribers_of_the_graph(self):
+        broker = InMemoryGraphEventBroker()
+        first, second = broker.subscribe(1), broker.subscribe(1)
+        other = broker.subscribe(2)
+        threading.Thread(
+            target=broker.publish, args=(1, EQUATION_CREATED, {"id": 3})
+        ).start()
+        for subscription in [first, second]:
+            event = await asyncio.wait_for(subscription.get(), 1)
+            self.assertEqual(
+                (event.graph_id, event.type, event.data),
+                (1, EQUATION_CREATED, {"id": 3}),
+            )
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(other.get(), 0.05)
+        self.assertEqual(broker.subscribers(1), 2)
+        broker.unsubscribe(first)
+        self.assertEqual(broker.subscribers(1), 1)
+
+    async def test_replays_missed_events(self):
+        broker = InMemoryGraphEventBroker()
+        for i in range(3):
+            broker.publish(1, EQUATION_UPDATED, {"id": i})
+        events = await received_events(broker, 1, last_event_id=1)
+        self.assertEqual([event.data["id"] for event in events], [1, 2])
+
+    async def test_resets_when_missed_events_are_dropped(self):
+        broker = InMemoryGraphEventBroker(history=2)
+        for i in range(4):
+            broker.publish(1, EQUATION_UPDATED, {"id": i})
+        events = await received_events(broker, 1, last_event_id=1)
+        self.assertEqual([event.type for event in events], [GRAPH_RESET])
+        self.assertEqual(events[0].id, 4)
+        events = await received_events(broker, 2, last_event_id=1)
+        self.assertEqual([event.type for event in events], [GRAPH_RESET])
+        events = await received_events(broker, 1, last_event_id=10)
+        self.assertEqual([event.type for event in events], [GRAPH_RESET])
+
+    async def test_drops_least_recently_changed_graphs(self):
+        broker = InMemoryGraphEventBroker(max_graphs=1)
+        broker.publish(1, EQUATION_UPDATED, {"id": 1})
+        broker.publish(2, EQUATION_UPDATED, {"id": 2})
+        events = await received_events(broker, 1, last_event_id=0)
+        self.assertEqual([event.type for event in events], [GRAPH_RESET])
+
+    async def test_closes_subscription_falling_behind(self):
+        broker = InMemoryGraphEventBroker(max_pending=2)
+        subscription = broker.subscribe(1)
+        for i in range(3):
+            broker.publish(1, EQUATION_UPDATED, {"id": i})
+        await asyncio.sleep(0)
+        self.assertEqual((await subscription.get()).data, {"id": 0})
+        self.assertEqual((await subscription.get()).data, {"id": 1})
+        self.assertIsNone(await subscription.get())
+        self.assertIsNone(await subscription.get())
+
+
+class ParseNotificationTest(SimpleTestCase):
+    def test_parses_payload(self):
+        self.assertEqual(
+            parse_notification(
+                '12:{"graph_id":1,"type":"equation.deleted","data":{"id":3}}'
+            ),
+            GraphEvent(12, 1, EQUATION_DELETED, {"id": 3}),
+        )
+
+
+@skipUnless(connection.vendor == "postgresql", "LISTEN and NOTIFY require PostgreSQL")
+class PostgresGraphEventBrokerTest(TransactionTestCase):
+    def setUp(self):
+        self.publisher = PostgresGraphEventBroker(channel="test_graph_events")
+        self.subscriber = PostgresGraphEventBroker(channel="test_graph_events")
+        self.assertTrue(self.publisher.listen(timeout=5))
+        self.assertTrue(self.subscriber.listen(timeout=5))
+
+    def tearDown(self):
+        self.publisher.stop()
+        self.subscriber.stop()
+
+    async def test_delivers_events_to_every_process(self):
+        subscription = self.subscriber.subscribe(1)
+        await sync_to_async(self.publisher.publish)(1, EQUATION_UPDATED, {"id": 3})
+        event = await asyncio.wait_for(subscription.get(), 5)
+        self.assertEqual((event.graph_id, event.data), (1, {"id": 3}))
+        await sync_to_async(self.subscriber.publish)(1, EQUATION_DELETED, {"id": 3})
+        replayed = await received_events(self.publisher, 1, last_event_id=event.id)
+        self.assertEqual([event.type for event in replayed], [EQUATION_DELETED])
+
+
+class GraphChangesTest(SimpleTestCase):
+    def test_coalesces_changes_per_equation(self):
+        changes = GraphChanges()
+        changes.record(1, EQUATION_CREATED, [1, 2])
+        changes.record(1, EQUATION_UPDATED, [1, 3])
+        changes.record(1, EQUATION_DELETED, [2, 3])
+        self.assertEqual(
+            changes.equations, {1: {1: EQUATION_CREATED, 3: EQUATION_DELETED}}
+        )
+
+
+class RecordEquationChangesTest(TestCase):
+    def setUp(self):
+        reset_graph_event_broker("GRAPH_EVENTS")
+        self.graph = graph_recipe.make()
+        self.equation = equation_recipe.make(graph=self.graph, equation="y = x")
+
+    def events(self):
+        return async_to_sync(received_events)(get_graph_event_broker(), self.graph.id)
+
+    def test_publishes_committed_fields_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record_equation_changes(self.graph.id, EQUATION_CREATED, [self.equation.id])
+            record_equation_changes(self.graph.id, EQUATION_UPDATED, [self.equation.id])
+            self.equation.parsed_equation = "y = x"
+            self.equation.save()
+            self.assertEqual(get_graph_event_broker()._last_id, 0)
+        events = self.events()
+        self.assertEqual([event.type for event in events], [EQUATION_CREATED])
+        self.assertEqual(
+            events[0].data,
+            {
+                "id": self.equation.id,
+                "equation": "y = x",
+                "parsed_equation": "y = x",
+                "color": self.equation.color,
+                "line_style": self.equation.line_style,
+                "line_width": self.equation.line_width,
+                "graph": self.graph.id,
+            },
+        )
+
+    def test_rolled_back_changes_are_not_published(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    record_equation_changes(
+                        self.graph.id, EQUATION_DELETED, [self.equation.id]
+                    )
+                    raise ValueError
+            except ValueError:
+                pass
+            record_equation_changes(self.graph.id, EQUATION_UPDATED, [self.equation.id])
+        self.assertEqual([event.type for event in self.events()], [EQUATION_UPDATED])
+
+    def test_deleted_equations_are_published_by_id(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record_equation_changes(self.graph.id, EQUATION_DELETED, [self.equation.id])
+        self.assertEqual(
+            [event.data for event in self.events()], [{"id": self.equation.id}]
+        )
@@ -0,0 +1,137 @@
+from unittest import mock
+
+from django.test import TestCase
+from sympy.parsing.latex import LaTeXParsingError
+
+from dm_backend.src.models.equation import Equation
+from dm_backend.src.services import graph_parser
+from dm_backend.src.services.graph_parser import (
+    parse_valid_expressions,
+    update_parsed_equations,
+)
+from dm_backend.src.services.parser_pool import (
+    ParserPoolSaturatedError,
+    ParserTimeoutError,
+)
+from dm_backend.tests.baker_recipes.equation_baker_recipe import equation_recipe
+from dm_backend.tests.baker_recipes.graph_baker_recipe import graph_recipe
+
+
+class ParseValidExpressionsTest(TestCase):
+    def test_valid_expressions(self):
+        self.assertEqual(
+            parse_valid_expressions(["f(x) = x^2", "y = f(x) + 1"]),
+            ["f_func(x) = x^2", "y = x^2 + 1"],
+        )
+
+    def test_skips_invalid_expressions(self):
+        self.assertEqual(
+            parse_valid_expressions(["a = 2", "$x", "y = a*x"]),
+            ["a = 2", None, "y = 2*x"],
+        )
+
+    def test_shares_deadline(self):
+        with mock.patch.object(
+            graph_parser, "parse_expressions", side_effect=LaTeXParsingError
+        ) as parse:
+            parse_valid_expressions(["$x", "$y"], deadline=123.0)
+        self.assertEqual(parse.call_count, 3)
+        for call in parse.call_args_list:
+            self.assertEqual(call.args[1], 123.0)
+
+    def test_stops_at_timed_out_expression(self):
+        def parse(expressions, deadline):
+            if len(expressions) > 1:
+                raise ParserTimeoutError("request deadline exceeded")
+            return ["a = 2"]
+
+        with mock.patch.object(graph_parser, "parse_expressions", side_effect=parse):
+            self.assertEqual(
+                parse_valid_expressions(["a = 2", "b = 3", "y = a*x"]), ["a = 2"]
+            )
+
+
+class UpdateParsedEquationsTest(TestCase):
+    def setUp(self):
+        self.graph = graph_recipe.make()
+        self.definition = equation_recipe.make(graph=self.graph, equation="f(x) = x^2")
+        self.call = equation_recipe.make(graph=self.graph, equation="y = f(x) + 1")
+
+    def parsed_equations(self):
+        return list(
+            self.graph.equation_set.order_by("id").values_list(
+                "parsed_equation", flat=True
+            )
+        )
+
+    def test_parses_equations(self):
+        equations = update_parsed_equations(self.graph)
+        self.assertEqual(
+            [equation.id for equation in equations], [self.definition.id, self.call.id]
+        )
+        self.assertEqual(self.parsed_equations(), ["f_func(x) = x^2", "y = x^2 + 1"])
+
+    def test_skips_unchanged_equations(self):
+        update_parsed_equations(self.graph)
+        with mock.patch.object(graph_parser, "parse_valid_expressions") as parse:
+            update_parsed_equations(self.graph)
+        parse.assert_not_called()
+
+    def test_parses_equations_after_changed_definition(self):
+        update_parsed_equations(self.graph)
+        Equation.objects.filter(id=self.definition.id).update(equation="f(x) = x^3")
+        update_parsed_equations(self.graph)
+        self.assertEqual(self.parsed_equations(), ["f_func(x) = x^3", "y = x^3 + 1"])
+
+    def test_keeps_parsed_equation_of_invalid_equation(self):
+        Equation.objects.filter(id=self.definition.id).update(
+            equation="$x", parsed_equation="x"
+        )
+        Equation.objects.filter(id=self.call.id).update(equation="y = 2x")
+        update_parsed_equations(self.graph)
+        self.assertEqual(self.parsed_equations(), ["x", "y = 2*x"])
+
+    def test_skips_equations_changed_while_parsing(self):
+        def parse_and_change(expressions):
+            Equation.objects.filter(id=self.definition.id).update(equation="f(x) = x^3")
+            return ["f_func(x) = x^2", "y = x^2 + 1"]
+
+        with mock.patch.object(
+            graph_parser, "parse_valid_expressions", side_effect=parse_and_change
+        ):
+            update_parsed_equations(self.graph)
+        self.assertFalse(self.graph.equation_set.exclude(source_hash="").exists())
+        update_parsed_equations(self.graph)
+        self.assertEqual(self.parsed_equations(), ["f_func(x) = x^3", "y = x^3 + 1"])
+
+    def test_keeps_source_hash_of_timed_out_equations(self):
+        with mock.patch.object(
+            graph_parser, "parse_valid_expressions", return_value=["f_func(x) = x^2"]
+        ):
+            update_parsed_equations(self.graph)
+        self.definition.refresh_from_db()
+        self.call.refresh_from_db()
+        self.assertEqual(self.definition.parsed_equation, "f_func(x) = x^2")
+        self.assertNotEqual(self.definition.source_hash, "")
+        self.assertEqual(self.call.source_hash, "")
+        update_parsed_equations(self.graph)
+        self.assertEqual(self.parsed_equations(), ["f_func(x) = x^2", "y = x^2 + 1"])
+
+    def test_keeps_parsed_equation_too_long_for_its_column(self):
+        Equation.objects.filter(id=self.call.id).update(parsed_equation="y = f(x)")
+        with mock.patch.object(
+            graph_parser,
+            "parse_valid_expressions",
+            return_value=["f_func(x) = x^2", "y = " + "x" * 1000],
+        ):
+            update_parsed_equations(self.graph)
+        self.assertEqual(self.parsed_equations(), ["f_func(x) = x^2", "y = f(x)"])
+
+    def test_parser_pool_unavailable(self):
+        with mock.patch.object(
+            graph_parser,
+            "parse_valid_expressions",
+            side_effect=ParserPoolSaturatedError,
+        ):
+            update_parsed_equations(self.graph)
+        self.assertFalse(self.graph.equation_set.exclude(source_hash="").exists())
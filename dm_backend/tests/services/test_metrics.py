@@ -0,0 +1,195 @@
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from dm_backend.src.services.metrics import (
+    REGISTRY,
+    REQUEST_QUERIES,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    RequestMetrics,
+    _request_metrics,
+    measure,
+)
+from dm_backend.src.services.parse_cache import get_parse_cache
+from dm_backend.src.services.session_prefix_store import get_prefix_store
+from dm_backend.tests.baker_recipes.equation_baker_recipe import equation_recipe
+from dm_backend.tests.baker_recipes.graph_baker_recipe import graph_recipe
+
+
+def sample(name, text=None, **labels):
+    for line in (REGISTRY.render() if text is None else text).splitlines():
+        metric, _, value = line.rpartition(" ")
+        if metric.startswith(name + "{") or metric == name:
+            if all(f'{key}="{label}"' in metric for key, label in labels.items()):
+                return float(value)
+    return None
+
+
+class HistogramTest(SimpleTestCase):
+    def test_render(self):
+        histogram = Histogram("latency_seconds", "The latency.", ["view"], [0.1, 1])
+        histogram.observe(0.05, view='a"b')
+        histogram.observe(0.5, view='a"b')
+        self.assertEqual(
+            histogram.render(),
+            "# HELP latency_seconds The latency.\n"
+            "# TYPE latency_seconds histogram\n"
+            'latency_seconds_bucket{view="a\\"b",le="0.1"} 1\n'
+            'latency_seconds_bucket{view="a\\"b",le="1.0"} 2\n'
+            'latency_seconds_bucket{view="a\\"b",le="+Inf"} 2\n'
+            'latency_seconds_sum{view="a\\"b"} 0.55\n'
+            'latency_seconds_count{view="a\\"b"} 2\n',
+        )
+
+    def test_labels_are_checked(self):
+        histogram = Histogram("latency_seconds", "The latency.", ["view"])
+        with self.assertRaises(ValueError):
+            histogram.observe(1)
+
+    def test_measure(self):
+        metrics = RequestMetrics()
+        token = _request_metrics.set(metrics)
+        try:
+            with measure("renderer"):
+                pass
+        finally:
+            _request_metrics.reset(token)
+        self.assertGreater(metrics.renderer_time, 0)
+        with measure("renderer"):
+            pass
+
+
+class MetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        REGISTRY.clear()
+        self.client = APIClient()
+        self.graph = graph_recipe.make()
+        equation_recipe.make(graph=self.graph, _quantity=2)
+
+    def test_records_requests(self):
+        self.client.get(f"/api/viewset/graphs/{self.graph.id}/", {"nested": "true"})
+        self.client.get("/api/viewset/graphs/999/")
+        self.client.get("/missing/")
+        labels = {"view": "graph-detail", "method": "GET"}
+        self.assertEqual(
+            sample("http_request_duration_seconds_count", status="200", **labels), 1
+        )
+        self.assertEqual(
+            sample("http_request_duration_seconds_count", status="404", **labels), 1
+        )
+        self.assertEqual(
+            sample("http_request_duration_seconds_count", view="unmatched"), 1
+        )
+        self.assertEqual(sample("http_request_db_queries_sum", view="graph-detail"), 5)
+        self.assertGreater(
+            sample("http_request_serializer_duration_seconds_sum", view="graph-detail"),
+            0,
+        )
+        self.assertGreater(
+            sample("http_request_renderer_duration_seconds_sum", view="graph-detail"),
+            0,
+        )
+        self.assertEqual(sample("http_requests_in_progress"), 0)
+
+    async def test_records_asynchronous_requests(self):
+        await self.async_client.get("/api/viewset/equations/")
+        self.assertEqual(
+            sample("http_request_duration_seconds_count", view="equation-list"), 1
+        )
+        self.assertEqual(REQUEST_QUERIES.samples()[-1][-1], 1)
+
+    def test_records_parse_time_of_expressions(self):
+        get_parse_cache().clear()
+        get_prefix_store().clear()
+        self.client.post(
+            "/api/viewset/equations/parser/parse_expressions/",
+            {"expressions": ["a = 2", "y = a x"]},
+            format="json",
+        )
+        self.assertEqual(sample("parser_expression_duration_seconds_count"), 2)
+
+    def test_metrics_endpoint(self):
+        self.client.get("/api/viewset/graphs/")
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            response["Content-Type"].startswith("text/plain; version=0.0.4")
+        )
+        self.assertIn(
+            b'http_request_duration_seconds_count{view="graph-list",method="GET",'
+            b'status="200"} 1',
+            response.content,
+        )
+        self.assertEqual(self.client.post("/metrics").status_code, 405)
+
+    def test_metrics_endpoint_access(self):
+        options = {"ALLOWED_NETWORKS": ["10.0.0.0/8"], "TOKEN": "secret"}
+        with override_settings(METRICS=settings.METRICS | options):
+            self.assert_metrics_access()
+
+    def assert_metrics_access(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        response = self.client.get("/metrics", REMOTE_ADDR="10.1.2.3")
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, 403)
+
+
+class SharedMetricsTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def registry(self):
+        registry = MetricsRegistry()
+        registry.register(Histogram("latency_seconds", "The latency.", ["view"], [1]))
+        registry.register(Gauge("in_progress", "The requests in progress."))
+        return registry
+
+    def write_snapshot(self, pid, registry):
+        path = os.path.join(self.directory, f"metrics-{pid}-other.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(registry.snapshot(), file)
+
+    def test_adds_up_processes(self):
+        registry, other = self.registry(), self.registry()
+        registry.metrics[0].observe(0.5, view="a")
+        registry.metrics[1].inc()
+        other.metrics[0].observe(2, view="a")
+        other.metrics[0].observe(0.5, view="b")
+        other.metrics[1].inc(2)
+        self.write_snapshot(os.getppid(), other)
+        text = registry.render(self.directory)
+        self.assertEqual(sample("latency_seconds_count", text, view="a"), 2)
+        self.assertEqual(sample("latency_seconds_bucket", text, view="a", le="1.0"), 1)
+        self.assertEqual(sample("latency_seconds_sum", text, view="a"), 2.5)
+        self.assertEqual(sample("latency_seconds_count", text, view="b"), 1)
+        self.assertEqual(sample("in_progress", text), 3)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    def test_skips_gauges_of_exited_processes(self):
+        registry, other = self.registry(), self.registry()
+        other.metrics[0].observe(0.5, view="a")
+        other.metrics[1].inc(2)
+        self.write_snapshot(2**22 + 1, other)
+        text = registry.render(self.directory)
+        self.assertEqual(sample("latency_seconds_count", text, view="a"), 1)
+        self.assertIsNone(sample("in_progress", text))
+
+    def test_writes_at_most_once_per_interval(self):
+        registry = self.registry()
+        registry.sync(self.directory, 60)
+        registry.metrics[1].inc()
+        registry.sync(self.directory, 60)
+        (filename,) = os.listdir(self.directory)
+        with open(os.path.join(self.directory, filename), encoding="utf-8") as file:
+            self.assertEqual(json.load(file)["in_progress"], [])
@@ -0,0 +1,74 @@
+import json
+
+import msgpack
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from dm_backend.src.services.msgpack_renderer import (
+    TYPED_ARRAY_FLOAT64,
+    TYPED_ARRAY_INT64,
+    pack_typed_arrays,
+    unpack_typed_array,
+)
+from dm_backend.tests.baker_recipes.equation_baker_recipe import equation_recipe
+from dm_backend.tests.baker_recipes.graph_baker_recipe import graph_recipe
+
+
+def unpack(content):
+    return msgpack.unpackb(content, ext_hook=unpack_typed_array)
+
+
+class PackTypedArraysTest(TestCase):
+    def test_numeric_lists_are_typed_arrays(self):
+        data = pack_typed_arrays(
+            {"x": [0.0, 0.5, 1.0, 1.5], "colors": [1, 2, 3, 4], "ids": [1, 2]}
+        )
+        self.assertEqual(data["x"].code, TYPED_ARRAY_FLOAT64)
+        self.assertEqual(data["colors"].code, TYPED_ARRAY_INT64)
+        self.assertEqual(data["ids"], [1, 2])
+
+    def test_mixed_lists_are_kept(self):
+        data = pack_typed_arrays({"y": [None, 1.0, 2.0, 3.0], "z": [1, 2.0, 3, 4]})
+        self.assertEqual(data, {"y": [None, 1.0, 2.0, 3.0], "z": [1, 2.0, 3, 4]})
+
+    def test_round_trip(self):
+        data = {"x": [0.0, 0.5, 1.0, 1.5], "colors": [1, -2, 2**40, 4]}
+        self.assertEqual(unpack(msgpack.packb(pack_typed_arrays(data))), data)
+
+
+class MessagePackRendererTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.graph = graph_recipe.make(name="test_graph")
+        equation_recipe.make(graph=self.graph, color=16711680, line_width=2)
+
+    def test_negotiated_by_accept_header(self):
+        response = self.client.get(
+            "/api/viewset/equations/", HTTP_ACCEPT="application/msgpack"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        content = unpack(response.content)
+        self.assertEqual(content["status"], 200)
+        self.assertEqual(content["message"], "success")
+        self.assertEqual(content["data"][0]["color"], 16711680)
+        self.assertEqual(content["data"][0]["line_width"], 2)
+
+    def test_same_envelope_as_json(self):
+        url = f"/api/viewset/graphs/{self.graph.id}/"
+        json_content = json.loads(self.client.get(url).content)
+        msgpack_content = unpack(self.client.get(url, {"format": "msgpack"}).content)
+        self.assertEqual(msgpack_content, json_content)
+
+    def test_error_envelope(self):
+        response = self.client.get(
+            "/api/viewset/graphs/999/", HTTP_ACCEPT="application/msgpack"
+        )
+        content = unpack(response.content)
+        self.assertEqual(content["status"], 404)
+        self.assertEqual(content["message"], "fail")
+
+    def test_json_is_the_default(self):
+        response = self.client.get("/api/viewset/graphs/")
+        self.assertEqual(response["Content-Type"], "application/json")
@@ -0,0 +1,118 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from dm_backend.src.services import parse_cache
+from dm_backend.src.services.parse_cache import (
+    DjangoParseCacheBackend,
+    LocMemParseCacheBackend,
+    ParseResultCache,
+    get_parse_cache,
+)
+
+
+class LocMemParseCacheBackendTest(TestCase):
+    def test_get_missing_key(self):
+        backend = LocMemParseCacheBackend()
+        self.assertIsNone(backend.get("missing"))
+
+    def test_set_and_get(self):
+        backend = LocMemParseCacheBackend()
+        backend.set("key", ["x"])
+        self.assertEqual(backend.get("key"), ["x"])
+
+    def test_evicts_least_recently_used(self):
+        backend = LocMemParseCacheBackend(max_entries=2)
+        backend.set("a", ["a"])
+        backend.set("b", ["b"])
+        backend.get("a")
+        backend.set("c", ["c"])
+        self.assertEqual(backend.get("a"), ["a"])
+        self.assertIsNone(backend.get("b"))
+        self.assertEqual(backend.get("c"), ["c"])
+
+    def test_expires_entries(self):
+        backend = LocMemParseCacheBackend(timeout=10)
+        with mock.patch.object(parse_cache.time, "monotonic", return_value=100):
+            backend.set("key", ["x"])
+        with mock.patch.object(parse_cache.time, "monotonic", return_value=105):
+            self.assertEqual(backend.get("key"), ["x"])
+        with mock.patch.object(parse_cache.time, "monotonic", return_value=110):
+            self.assertIsNone(backend.get("key"))
+
+    def test_clear(self):
+        backend = LocMemParseCacheBackend()
+        backend.set("key", ["x"])
+        backend.clear()
+        self.assertIsNone(backend.get("key"))
+
+
+class DjangoParseCacheBackendTest(TestCase):
+    def test_set_and_get(self):
+        backend = DjangoParseCacheBackend()
+        backend.set("key", ["x"])
+        self.assertEqual(backend.get("key"), ["x"])
+        backend.clear()
+        self.assertIsNone(backend.get("key"))
+
+    def test_clear_keeps_other_entries(self):
+        backend = DjangoParseCacheBackend()
+        backend.set("key", ["x"])
+        backend.cache.set("other", "value")
+        self.addCleanup(backend.cache.delete, "other")
+        backend.clear()
+        self.assertIsNone(backend.get("key"))
+        self.assertEqual(backend.cache.get("other"), "value")
+        backend.set("key", ["y"])
+        self.assertEqual(DjangoParseCacheBackend().get("key"), ["y"])
+
+
+class ParseResultCacheTest(TestCase):
+    def setUp(self):
+        self.cache = ParseResultCache(LocMemParseCacheBackend())
+        self.parse = mock.Mock(side_effect=lambda expressions: list(expressions))
+
+    def test_make_key_depends_on_order(self):
+        self.assertNotEqual(
+            ParseResultCache.make_key(["x = 1", "y = 2"]),
+            ParseResultCache.make_key(["y = 2", "x = 1"]),
+        )
+
+    def test_make_key_depends_on_sub_rules(self):
+        self.assertNotEqual(
+            ParseResultCache.make_key(["x"], {"a": "b"}),
+            ParseResultCache.make_key(["x"], {"a": "c"}),
+        )
+
+    def test_get_or_parse_counts_hits_and_misses(self):
+        first = self.cache.get_or_parse(["x = 1"], self.parse)
+        second = self.cache.get_or_parse(["x = 1"], self.parse)
+        self.assertEqual(first, second)
+        self.parse.assert_called_once_with(["x = 1"])
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 1, "hit_ratio": 0.5})
+
+    def test_failures_are_not_cached(self):
+        self.parse.side_effect = ValueError("invalid")
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                self.cache.get_or_parse(["$x"], self.parse)
+        self.assertEqual(self.parse.call_count, 2)
+
+    def test_clear_resets_counters(self):
+        self.cache.get_or_parse(["x = 1"], self.parse)
+        self.cache.clear()
+        self.assertEqual(self.cache.stats(), {"hits": 0, "misses": 0, "hit_ratio": 0.0})
+
+
+class GetParseCacheTest(TestCase):
+    @override_settings(
+        PARSE_CACHE={
+            "BACKEND": "dm_backend.src.services.parse_cache.DjangoParseCacheBackend",
+            "OPTIONS": {"timeout": 60},
+        }
+    )
+    def test_backend_from_settings(self):
+        cache = get_parse_cache()
+        self.assertIsInstance(cache.backend, DjangoParseCacheBackend)
+        self.assertEqual(cache.backend.timeout, 60)
+        self.assertIs(get_parse_cache(), cache)
@@ -0,0 +1,190 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.db import IntegrityError, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from dm_backend.src.enums.parse_job_status import ParseJobStatus
+from dm_backend.src.models.parse_job import ParseJob
+from dm_backend.src.services import parse_job_queue
+from dm_backend.src.services.parse_cache import get_parse_cache
+from dm_backend.src.services.parse_job_queue import ParseJobQueue, execute_parse_job
+from dm_backend.src.services.parser_pool import ParserPoolSaturatedError
+
+
+class ExecuteParseJobTest(TestCase):
+    def setUp(self):
+        get_parse_cache().clear()
+
+    def test_parsed_expressions(self):
+        self.assertEqual(
+            execute_parse_job(["x = 2", "x ^ x"]),
+            (
+                200,
+                {
+                    "expressions": ["x = 2", "x ^ x"],
+                    "parsed_expressions": ["x = 2", "2^2"],
+                },
+            ),
+        )
+
+    def test_parsing_error(self):
+        status_code, result = execute_parse_job(["$x"])
+        self.assertEqual(status_code, 400)
+        self.assertIn("LaTeX parsing error", result["detail"])
+
+
+class ParseJobQueueTest(TestCase):
+    def setUp(self):
+        get_parse_cache().clear()
+        self.queue = ParseJobQueue(workers=0, poll_interval=0.01, max_wait=0.1)
+
+    def test_submit_runs_job_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = self.queue.submit(["x = 2"])
+        job.refresh_from_db()
+        self.assertEqual(job.status, ParseJobStatus.SUCCEEDED.value)
+        self.assertEqual(job.status_code, 200)
+        self.assertEqual(job.result["parsed_expressions"], ["x = 2"])
+        self.assertIsNotNone(job.finished)
+
+    def test_failed_job(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = self.queue.submit(["$x"])
+        job.refresh_from_db()
+        self.assertEqual(job.status, ParseJobStatus.FAILED.value)
+        self.assertEqual(job.status_code, 400)
+
+    def test_dedupes_active_jobs(self):
+        first = self.queue.submit(["x = 2"])
+        second = self.queue.submit(["x = 2"])
+        self.assertEqual(first.id, second.id)
+        self.assertNotEqual(self.queue.submit(["x = 3"]).id, first.id)
+        self.assertEqual(ParseJob.objects.count(), 2)
+
+    def test_active_jobs_are_unique(self):
+        job = self.queue.submit(["x = 2"])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ParseJob.objects.create(key=job.key, expressions=job.expressions)
+        ParseJob.objects.filter(id=job.id).update(status=ParseJobStatus.FAILED.value)
+        self.assertNotEqual(self.queue.submit(["x = 2"]).id, job.id)
+
+    def test_submit_returns_job_submitted_concurrently(self):
+        job = self.queue.submit(["x = 2"])
+        with mock.patch.object(
+            self.queue, "find_active", side_effect=[None, job]
+        ) as find_active:
+            self.assertEqual(self.queue.submit(["x = 2"]).id, job.id)
+        self.assertEqual(find_active.call_count, 2)
+        self.assertEqual(ParseJob.objects.count(), 1)
+
+    def test_purges_expired_jobs(self):
+        jobs = [self.queue.submit([f"x = {i}"]) for i in range(3)]
+        expired = timezone.now() - timedelta(seconds=self.queue.retention + 1)
+        ParseJob.objects.filter(id__in=[jobs[0].id, jobs[1].id]).update(
+            status=ParseJobStatus.SUCCEEDED.value, finished=expired
+        )
+        ParseJob.objects.filter(id=jobs[1].id).update(finished=timezone.now())
+        self.assertEqual(self.queue.purge(), 1)
+        self.assertEqual(
+            list(ParseJob.objects.order_by("id").values_list("id", flat=True)),
+            [jobs[1].id, jobs[2].id],
+        )
+
+    def test_sweep_runs_abandoned_jobs(self):
+        job = self.queue.submit(["x = 2"])
+        stale = timezone.now() - timedelta(seconds=self.queue.stale_after + 1)
+        ParseJob.objects.filter(id=job.id).update(
+            status=ParseJobStatus.RUNNING.value, started=stale
+        )
+        self.queue.sweep()
+        job.refresh_from_db()
+        self.assertEqual(job.status, ParseJobStatus.SUCCEEDED.value)
+
+    def test_claims_oldest_pending_job(self):
+        first = self.queue.submit(["x = 2"])
+        self.queue.submit(["x = 3"])
+        self.assertEqual(self.queue.claim().id, first.id)
+        self.assertEqual(
+            ParseJob.objects.get(id=first.id).status, ParseJobStatus.RUNNING.value
+        )
+
+    def test_claims_abandoned_job(self):
+        job = self.queue.submit(["x = 2"])
+        stale = timezone.now() - timedelta(seconds=self.queue.stale_after + 1)
+        ParseJob.objects.filter(id=job.id).update(
+            status=ParseJobStatus.RUNNING.value, started=stale
+        )
+        self.assertEqual(self.queue.claim().id, job.id)
+        self.assertIsNone(self.queue.claim())
+
+    def test_requeues_job_when_parser_pool_is_saturated(self):
+        job = self.queue.submit(["x = 2"])
+        with mock.patch.object(
+            parse_job_queue, "execute_parse_job", side_effect=ParserPoolSaturatedError
+        ):
+            self.queue.run(self.queue.claim())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ParseJobStatus.PENDING.value)
+        self.assertIsNone(job.started)
+
+    def test_wait_times_out(self):
+        job = self.queue.submit(["x = 2"])
+        self.assertEqual(
+            async_to_sync(self.queue.wait)(job.id, 10).status,
+            ParseJobStatus.PENDING.value,
+        )
+
+    def test_wait_for_non_finite_timeout(self):
+        job = self.queue.submit(["x = 2"])
+        for timeout in [float("nan"), float("inf")]:
+            with self.subTest(timeout=timeout):
+                start = time.monotonic()
+                self.assertEqual(
+                    async_to_sync(self.queue.wait)(job.id, timeout).status,
+                    ParseJobStatus.PENDING.value,
+                )
+                self.assertLess(time.monotonic() - start, 5)
+
+    def test_wait_missing_job(self):
+        with self.assertRaises(ParseJob.DoesNotExist):
+            async_to_sync(self.queue.wait)(999, 0)
+
+    def test_stats(self):
+        self.queue.submit(["x = 2"])
+        job = self.queue.submit(["x = 3"])
+        created = timezone.now() - timedelta(seconds=10)
+        ParseJob.objects.filter(id=job.id).update(
+            created=created,
+            started=created + timedelta(seconds=4),
+            status=ParseJobStatus.RUNNING.value,
+        )
+        stats = self.queue.stats()
+        self.assertEqual(stats["pending"], 1)
+        self.assertEqual(stats["running"], 1)
+        self.assertEqual(stats["average_wait"], 4)
+        self.assertGreaterEqual(stats["oldest_pending_wait"], 0)
+
+
+class ParseJobQueueWorkerTest(TransactionTestCase):
+    def test_worker_threads_run_jobs(self):
+        queue = ParseJobQueue(workers=2, poll_interval=0.05, max_wait=10)
+        jobs = [queue.submit([f"x = {i}"]) for i in range(4)]
+        for job in jobs:
+            job = async_to_sync(queue.wait)(job.id, 10)
+            self.assertEqual(job.status, ParseJobStatus.SUCCEEDED.value)
+        queue.shutdown()
+
+    def test_sweeper_runs_pending_jobs_at_startup(self):
+        job = ParseJob.objects.create(key="key", expressions=["x = 2"])
+        queue = ParseJobQueue(workers=1, poll_interval=0.05, sweep_interval=60)
+        queue.start()
+        try:
+            job = async_to_sync(queue.wait)(job.id, 10)
+            self.assertEqual(job.status, ParseJobStatus.SUCCEEDED.value)
+        finally:
+            queue.shutdown()
+        self.assertIsNone(queue._sweeper)
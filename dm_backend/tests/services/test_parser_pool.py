@@ -0,0 +1,102 @@
+import time
+from unittest import mock
+
+from django.test import TestCase
+from sympy.parsing.latex import LaTeXParsingError
+
+from dm_backend.src.services import parser_pool
+from dm_backend.src.services.expression_parser import parse_expressions
+from dm_backend.src.services.parser_pool import (
+    ParserPool,
+    ParserPoolSaturatedError,
+    ParserTimeoutError,
+    execute_with_deadline,
+)
+
+
+class ExecuteWithDeadlineTest(TestCase):
+    def test_execute(self):
+        steps, max_rss, durations = execute_with_deadline(
+            None, ["a = 2", "a + 1"], 5, None
+        )
+        self.assertEqual(
+            [parsed for _, parsed in steps], parse_expressions(["a = 2", "a + 1"])
+        )
+        self.assertEqual(steps[0][0], {"a": "2"})
+        self.assertGreater(max_rss, 0)
+        self.assertEqual(len(durations), 2)
+
+    def test_expression_timeout(self):
+        with self.assertRaises(ParserTimeoutError):
+            execute_with_deadline(None, ["x ^ x"], 1e-6, None)
+
+    def test_deadline_exceeded(self):
+        with self.assertRaises(ParserTimeoutError):
+            execute_with_deadline(None, ["x ^ x"], 5, time.time() - 1)
+
+    def test_parsing_error(self):
+        with self.assertRaises(LaTeXParsingError):
+            execute_with_deadline(None, ["$x"], 5, None)
+
+
+class ParserPoolTest(TestCase):
+    def setUp(self):
+        self.pool = ParserPool(workers=1, max_pending=1, max_tasks_per_worker=2)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_inline_execute(self):
+        pool = ParserPool(workers=0)
+        self.assertEqual(
+            pool.parse_expressions(["b = 3", "b ^ 2"]),
+            parse_expressions(["b = 3", "b ^ 2"]),
+        )
+
+    def test_execute_in_worker(self):
+        steps = self.pool.execute_expressions({"c": "2"}, ["c + 1"])
+        self.assertEqual(steps[0][1], parse_expressions(["c = 2", "c + 1"])[1])
+
+    def test_parsing_error_in_worker(self):
+        with self.assertRaises(LaTeXParsingError):
+            self.pool.execute_expressions(None, ["$x"])
+
+    def test_request_timeout(self):
+        future = self.pool.submit(time.sleep, 0.5)
+        with self.assertRaises(ParserTimeoutError):
+            self.pool.result(future, time.time() + 0.01)
+
+    def test_saturated(self):
+        self.pool.submit(time.sleep, 0.5)
+        self.pool.submit(time.sleep, 0.5)
+        with self.assertRaises(ParserPoolSaturatedError):
+            self.pool.execute_expressions(None, ["x"])
+
+    def test_slots_are_released(self):
+        for _ in range(3):
+            self.pool.execute_expressions(None, ["x"])
+        self.assertTrue(self.pool._slots.acquire(blocking=False))
+
+    def test_recycle_after_max_tasks(self):
+        for _ in range(3):
+            self.pool.execute_expressions(None, ["x"])
+        self.assertEqual(self.pool.recycled, 1)
+
+    def test_recycle_on_memory_growth(self):
+        self.pool.max_worker_memory = 1
+        self.pool.execute_expressions(None, ["x"])
+        self.assertEqual(self.pool.recycled, 1)
+
+    def test_recycle_when_workers_die(self):
+        with mock.patch.object(
+            parser_pool.ProcessPoolExecutor,
+            "submit",
+            side_effect=parser_pool.BrokenProcessPool,
+        ):
+            with self.assertRaises(parser_pool.ParserPoolError):
+                self.pool.execute_expressions(None, ["x"])
+        self.assertEqual(self.pool.recycled, 1)
+
+    def test_map_keeps_order(self):
+        pool = ParserPool(workers=2)
+        self.assertEqual(pool.map(lambda item: item * 2, [3, 1, 2]), [6, 2, 4])
@@ -0,0 +1,77 @@
+import os
+import pstats
+import tempfile
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from dm_backend.src.services.parse_cache import get_parse_cache
+from dm_backend.src.services.parser_profiler import STAGES, profile_with_deadline
+
+URL = "/api/viewset/equations/parser/parse_expressions/"
+EXPRESSIONS = ["f(x) = x^{2}", "y = f(x) + 1"]
+
+
+class ProfileWithDeadlineTest(SimpleTestCase):
+    def test_profiles_the_stages_of_the_session(self):
+        with tempfile.TemporaryDirectory() as directory:
+            parsed_expressions, profile = profile_with_deadline(
+                EXPRESSIONS, None, None, 5, directory
+            )
+            self.assertGreater(pstats.Stats(profile["file"]).total_calls, 0)
+            self.assertEqual(os.path.dirname(profile["file"]), directory)
+        self.assertEqual(parsed_expressions, ["f_func(x) = x^2", "y = x^2 + 1"])
+        self.assertEqual(set(profile["stages"]), set(STAGES.values()))
+        self.assertGreater(profile["stages"]["GraphSession.force_resolve_function"], 0)
+        self.assertEqual(
+            [item["expression"] for item in profile["expressions"]], EXPRESSIONS
+        )
+        self.assertEqual(len(profile["functions"]), 5)
+        self.assertGreaterEqual(
+            profile["total"], profile["functions"][-1]["cumulative"]
+        )
+
+
+class ProfilingRequestTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        get_parse_cache().clear()
+
+    def post(self, **headers):
+        return self.client.post(
+            URL, {"expressions": EXPRESSIONS}, format="json", **headers
+        )
+
+    @override_settings(
+        PARSER_PROFILING=settings.PARSER_PROFILING | {"ALLOW_HEADER": True}
+    )
+    def test_profiles_on_header(self):
+        response = self.post(HTTP_X_PARSER_PROFILE="1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["parsed_expressions"]), 2)
+        self.assertIn("GraphSession.execute", response.data["profile"]["stages"])
+        self.assertIsNone(response.data["profile"]["file"])
+        self.assertNotIn("profile", self.post().data)
+
+    def test_ignores_header_unless_allowed(self):
+        response = self.post(HTTP_X_PARSER_PROFILE="1")
+        self.assertNotIn("profile", response.data)
+
+    @override_settings(
+        PARSER_PROFILING=settings.PARSER_PROFILING | {"ENABLED": True},
+        PARSER_POOL=settings.PARSER_POOL | {"workers": 0},
+    )
+    def test_profiles_every_request_without_cache(self):
+        self.post()
+        response = self.post()
+        self.assertEqual(len(response.data["profile"]["expressions"]), 2)
+        self.assertEqual(get_parse_cache().stats()["hits"], 0)
+
+    @override_settings(PARSER_PROFILING=settings.PARSER_PROFILING | {"ENABLED": True})
+    def test_invalid_expression(self):
+        response = self.client.post(
+            URL, {"expressions": ["2$x$ + 3 = 0"]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,109 @@
+import subprocess
+import sys
+import textwrap
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from dm_backend.src.services.query_budget import (
+    QueryBudgetExceeded,
+    QueryRecorder,
+    normalize_sql,
+)
+from dm_backend.src.views.graph import GraphAPIViewSet
+from dm_backend.tests.baker_recipes.graph_baker_recipe import graph_recipe
+
+
+class QueryRecorderTest(SimpleTestCase):
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql(
+                "SELECT * FROM t WHERE a = 'x''y' AND b IN (%s, %s, %s) LIMIT 21"
+            ),
+            "SELECT * FROM t WHERE a = ? AND b IN (...) LIMIT ?",
+        )
+
+    def test_repeated_shapes_without_savepoints(self):
+        recorder = QueryRecorder()
+        for sql in [
+            'SAVEPOINT "s1"',
+            "SELECT * FROM equation WHERE graph_id = 1",
+            "SELECT * FROM equation WHERE graph_id = 2",
+            "SELECT * FROM graph",
+            'RELEASE SAVEPOINT "s1"',
+        ]:
+            recorder.record(sql)
+        self.assertEqual(len(recorder.queries), 3)
+        self.assertEqual(
+            recorder.repeated(2), {"SELECT * FROM equation WHERE graph_id = ?": 2}
+        )
+
+    def test_logs_repeated_queries(self):
+        viewset = GraphAPIViewSet(action="list")
+        recorder = QueryRecorder(
+            [f"SELECT * FROM equation WHERE graph_id = {i}" for i in range(3)]
+        )
+        with self.assertLogs("dm_backend.src.services.query_budget", "WARNING") as logs:
+            viewset.check_query_budget(recorder)
+        self.assertIn(
+            "GraphAPIViewSet.list made the same query 3 times", logs.output[0]
+        )
+
+
+class QueryRecorderInstallationTest(SimpleTestCase):
+    def test_installed_before_the_views_are_imported(self):
+        code = textwrap.dedent(
+            """
+            import sys
+            from types import SimpleNamespace
+
+            import django
+
+            django.setup()
+
+            from django.db.backends.signals import connection_created
+
+            connection = SimpleNamespace(execute_wrappers=[])
+            connection_created.send(sender=None, connection=connection)
+            print([wrapper.__name__ for wrapper in connection.execute_wrappers])
+            print(any(name.startswith("dm_backend.src.views") for name in sys.modules))
+            """
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        wrappers, views_imported = result.stdout.splitlines()
+        self.assertIn("record_queries", wrappers)
+        self.assertEqual(views_imported, "False")
+
+
+class QueryBudgetMixinTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        graph_recipe.make(_quantity=3)
+
+    @mock.patch.object(GraphAPIViewSet, "query_budgets", {"list": 1})
+    def test_fails_over_budget(self):
+        with self.assertRaisesRegex(
+            QueryBudgetExceeded,
+            "GraphAPIViewSet.list made 2 queries, over its budget of 1",
+        ):
+            self.client.get("/api/viewset/graphs/")
+
+    @mock.patch.object(GraphAPIViewSet, "query_budgets", {"list": 1})
+    def test_logs_over_budget(self):
+        with self.settings(QUERY_BUDGET=settings.QUERY_BUDGET | {"RAISE": False}):
+            with self.assertLogs("dm_backend.src.services.query_budget", "WARNING"):
+                response = self.client.get("/api/viewset/graphs/")
+        self.assertEqual(response.status_code, 200)
+
+    @mock.patch.object(GraphAPIViewSet, "query_budgets", {"list": 1})
+    def test_disabled(self):
+        with self.settings(QUERY_BUDGET=settings.QUERY_BUDGET | {"ENABLED": False}):
+            response = self.client.get("/api/viewset/graphs/")
+        self.assertEqual(response.status_code, 200)
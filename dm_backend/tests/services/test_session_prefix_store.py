@@ -0,0 +1,63 @@
+from unittest import mock
+
+from django.test import TestCase
+from sympy.parsing.latex import LaTeXParsingError
+
+from dm_backend.src.services.expression_parser import execute_expressions, parse_expressions
+from dm_backend.src.services.session_prefix_store import SessionPrefixStore
+
+
+class SessionPrefixStoreTest(TestCase):
+    def setUp(self):
+        self.store = SessionPrefixStore()
+        self.expressions = ["f(x) = x*2", "a = 3", "f(a)"]
+
+    def parse_counting(self, expressions):
+        execute = mock.Mock(wraps=execute_expressions)
+        parsed_expressions = self.store.parse_expressions(expressions, execute)
+        count = sum(len(call.args[1]) for call in execute.call_args_list)
+        return parsed_expressions, count
+
+    def test_prefix_keys_are_chained(self):
+        keys = SessionPrefixStore.prefix_keys(self.expressions)
+        self.assertEqual(len(keys), 3)
+        self.assertEqual(keys[:2], SessionPrefixStore.prefix_keys(self.expressions[:2]))
+        self.assertNotEqual(keys[2], SessionPrefixStore.prefix_keys(["f(a)"])[0])
+
+    def test_parse_matches_full_parse(self):
+        parsed_expressions, count = self.parse_counting(self.expressions)
+        self.assertEqual(parsed_expressions, parse_expressions(self.expressions))
+        self.assertEqual(count, 3)
+
+    def test_parse_only_changed_tail(self):
+        self.parse_counting(self.expressions)
+        changed = self.expressions[:2] + ["f(a) + a"]
+        parsed_expressions, count = self.parse_counting(changed)
+        self.assertEqual(parsed_expressions, parse_expressions(changed))
+        self.assertEqual(count, 1)
+
+    def test_parse_known_prefix(self):
+        self.parse_counting(self.expressions)
+        parsed_expressions, count = self.parse_counting(self.expressions[:2])
+        self.assertEqual(parsed_expressions, parse_expressions(self.expressions[:2]))
+        self.assertEqual(count, 0)
+
+    def test_snapshots_are_not_modified(self):
+        self.parse_counting(["a = 3"])
+        self.parse_counting(["a = 3", "a = 4"])
+        parsed_expressions, _ = self.parse_counting(["a = 3", "a"])
+        self.assertEqual(parsed_expressions, parse_expressions(["a = 3", "a"]))
+
+    def test_failed_expression_is_not_stored(self):
+        with self.assertRaises(LaTeXParsingError):
+            self.store.parse_expressions(["a = 3", "$a"])
+        keys = SessionPrefixStore.prefix_keys(["a = 3", "$a"])
+        self.assertIsNone(self.store.get(keys[0]))
+        self.assertIsNone(self.store.get(keys[1]))
+
+    def test_evicts_least_recently_used(self):
+        store = SessionPrefixStore(max_entries=2)
+        store.parse_expressions(self.expressions)
+        keys = SessionPrefixStore.prefix_keys(self.expressions)
+        self.assertIsNone(store.get(keys[0]))
+        self.assertEqual(store.longest_prefix(keys)[0], 3)
@@ -0,0 +1,36 @@
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from dm_backend.src.services.startup import warm_up_server
+
+
+class WarmUpServerTest(SimpleTestCase):
+    @override_settings(COMPILED_EQUATION_CACHE=settings.COMPILED_EQUATION_CACHE | {"prewarm": 5}, PARSER_WARM_UP=True)
+    def test_warms_up_the_sampler_and_the_parser(self):
+        with mock.patch(
+            "dm_backend.src.services.equation_sampler.prewarm_compiled_equations"
+        ) as prewarm, mock.patch(
+            "dm_backend.src.services.expression_parser.warm_up_parser"
+        ) as warm_up_parser, mock.patch(
+            "dm_backend.src.services.startup.connections"
+        ) as connections:
+            warm_up_server()
+        prewarm.assert_called_once_with(5)
+        connections.close_all.assert_called_once_with()
+        warm_up_parser.assert_called_once_with()
+
+    @override_settings(COMPILED_EQUATION_CACHE=settings.COMPILED_EQUATION_CACHE | {"prewarm": 0}, PARSER_WARM_UP=False)
+    def test_skips_the_disabled_warm_ups(self):
+        with mock.patch(
+            "dm_backend.src.services.equation_sampler.prewarm_compiled_equations"
+        ) as prewarm, mock.patch(
+            "dm_backend.src.services.expression_parser.warm_up_parser"
+        ) as warm_up_parser, mock.patch(
+            "dm_backend.src.services.startup.connections"
+        ) as connections:
+            warm_up_server()
+        prewarm.assert_not_called()
+        connections.close_all.assert_not_called()
+        warm_up_parser.assert_not_called()
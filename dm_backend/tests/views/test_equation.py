@@ -36,6 +36,59 @@ class EquationAPIViewSetTest(TestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]["id"], equation.id)
 
+    def test_create_equation_parses_graph(self):
+        equation_recipe.make(graph=self.graph, equation="f(x) = 2x")
+        payload = self.valid_payload | {"equation": "y = f(x)"}
+        del payload["parsed_equation"]
+        response = self.client.post(self.url, payload)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["parsed_equation"], "y = 2*x")
+
+    def test_delete_equation_parses_graph(self):
+        definition = equation_recipe.make(graph=self.graph, equation="a = 2")
+        self.client.post(self.url, self.valid_payload | {"equation": "y = a*x"})
+        self.client.delete(self.url_id(definition.id))
+        equation = Equation.objects.get(graph=self.graph)
+        self.assertEqual(equation.parsed_equation, "y = a*x")
+
+    def test_get_equations_of_graph(self):
+        equations = equation_recipe.make(graph=self.graph, _quantity=3)
+        equation_recipe.make(graph=graph_recipe.make(name="other_graph"))
+        response = self.client.get(self.url, {"graph": self.graph.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [equation["id"] for equation in response.data],
+            [equation.id for equation in equations],
+        )
+
+    def test_get_equations_of_graph_conditionally(self):
+        equation = equation_recipe.make(graph=self.graph)
+        url = f"{self.url}?graph={self.graph.id}"
+        etag = self.client.get(url).headers["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.client.patch(self.url_id(equation.id), {"color": 2}, format="json")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["color"], 2)
+        self.assertNotIn("ETag", self.client.get(self.url).headers)
+
+    def test_get_equations_of_invalid_graph(self):
+        response = self.client.get(self.url, {"graph": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["message"], "fail")
+        self.assertIn("graph", response.data)
+
+    def test_get_equations_by_page(self):
+        equations = equation_recipe.make(graph=self.graph, _quantity=5)
+        response = self.client.get(self.url, {"page_size": 2})
+        ids = [equation["id"] for equation in response.data]
+        while response.json()["next"] is not None:
+            response = self.client.get(response.json()["next"])
+            ids += [equation["id"] for equation in response.data]
+        self.assertEqual(ids, [equation.id for equation in equations])
+
     def test_get_equation(self):
         equation = equation_recipe.make(**(self.valid_payload | {"graph": self.graph}))
         response = self.client.get(self.url_id(equation.id))
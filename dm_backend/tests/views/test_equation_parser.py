@@ -1,15 +1,25 @@
 import json
+import time
+from unittest import mock
 
-from django.test import TestCase
+from django.conf import settings
+from django.test import TestCase, override_settings
 from latexvm.graph_session import GraphSession
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from dm_backend.src.services.expression_parser import parse_expressions
+from dm_backend.src.services.parse_cache import get_parse_cache
+from dm_backend.src.services.parser_pool import ParserPool, get_parser_pool
+from dm_backend.src.services.session_prefix_store import get_prefix_store
+
 
 class EquationAPITest(TestCase):
     def setUp(self):
         self.client = APIClient()
         self.url = "/api/viewset/equations/parser/parse_expressions/"
+        get_parse_cache().clear()
+        get_prefix_store().clear()
 
     def test_get_parsed_expressions(self):
         test_cases = [
@@ -19,6 +29,7 @@ class EquationAPITest(TestCase):
         ]
         for i, test_case in enumerate(test_cases):
             graph_session = GraphSession.new()
+            graph_session.add_sub_rule(r"\*\*", "^")
             expected_output = []
             for expression in test_case:
                 graph_session.execute(expression)
@@ -58,3 +69,181 @@ class EquationAPITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
         self.assertEqual(response.json()["message"], "fail")
         self.assertTrue("Internal server error" in response.data["detail"])
+
+    def test_repeated_expressions_are_cached(self):
+        payload = json.dumps({"expressions": ["a = 2", "a + 1"]})
+        first = self.client.post(self.url, payload, content_type="application/json")
+        with mock.patch.object(
+            ParserPool, "execute_expressions"
+        ) as execute_expressions:
+            second = self.client.post(
+                self.url, payload, content_type="application/json"
+            )
+        execute_expressions.assert_not_called()
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(get_parse_cache().stats()["hits"], 1)
+
+    def test_changed_expression_reuses_prefix(self):
+        self.client.post(
+            self.url,
+            json.dumps({"expressions": ["f(x) = x*2", "a = 3", "f(a)"]}),
+            content_type="application/json",
+        )
+        with mock.patch.object(
+            ParserPool,
+            "execute_expressions",
+            autospec=True,
+            side_effect=ParserPool.execute_expressions,
+        ) as execute_expressions:
+            response = self.client.post(
+                self.url,
+                json.dumps({"expressions": ["f(x) = x*2", "a = 3", "f(a) + 1"]}),
+                content_type="application/json",
+            )
+        execute_expressions.assert_called_once()
+        self.assertEqual(execute_expressions.call_args.args[2], ["f(a) + 1"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["parsed_expressions"],
+            parse_expressions(["f(x) = x*2", "a = 3", "f(a) + 1"]),
+        )
+
+    @override_settings(PARSER_POOL=settings.PARSER_POOL | {"expression_timeout": 1e-6})
+    def test_get_parsing_timeout(self):
+        payload = {"expressions": ["x = 2", "x ^ x"]}
+        response = self.client.post(
+            self.url, json.dumps(payload), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_408_REQUEST_TIMEOUT)
+        self.assertEqual(response.json()["message"], "fail")
+        self.assertTrue("LaTeX parsing timeout" in response.data["detail"])
+
+    @override_settings(
+        PARSER_POOL=settings.PARSER_POOL | {"workers": 1, "max_pending": 0}
+    )
+    def test_get_parser_pool_saturated(self):
+        pool = get_parser_pool()
+        pool.submit(time.sleep, 0.5)
+        payload = {"expressions": ["x = 2"]}
+        response = self.client.post(
+            self.url, json.dumps(payload), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.json()["message"], "fail")
+        self.assertEqual(response["Retry-After"], "1")
+
+
+class EquationParserBatchAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = "/api/viewset/equations/parser/parse_batch/"
+        get_parse_cache().clear()
+        get_prefix_store().clear()
+
+    def post(self, payload):
+        return self.client.post(
+            self.url, json.dumps(payload), content_type="application/json"
+        )
+
+    def test_parse_batch(self):
+        graphs = {
+            "1": ["y(x) = x / 2"],
+            "2": ["x = 2", "x ^ x"],
+            "3": ["double(x) = x*(2)", "double(3)"],
+        }
+        response = self.post({"graphs": graphs})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["message"], "success")
+        results = response.data["results"]
+        self.assertEqual(list(results.keys()), list(graphs.keys()))
+        for graph_id, expressions in graphs.items():
+            with self.subTest(graph_id=graph_id):
+                self.assertEqual(results[graph_id]["status"], status.HTTP_200_OK)
+                self.assertEqual(results[graph_id]["expressions"], expressions)
+                self.assertEqual(
+                    results[graph_id]["parsed_expressions"],
+                    parse_expressions(expressions),
+                )
+
+    def test_parse_batch_with_failing_graph(self):
+        response = self.post({"graphs": {"1": ["x = 2", "$x ^ x"], "2": ["x = 3"]}})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(results["1"]["status"], status.HTTP_400_BAD_REQUEST)
+        self.assertTrue("LaTeX parsing error" in results["1"]["detail"])
+        self.assertEqual(results["2"]["status"], status.HTTP_200_OK)
+        self.assertEqual(results["2"]["parsed_expressions"], ["x = 3"])
+
+    @override_settings(PARSER_POOL=settings.PARSER_POOL | {"workers": 0})
+    def test_parse_batch_inline(self):
+        response = self.post({"graphs": {"1": ["x = 2"], "2": ["x = 3"]}})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"]["2"]["parsed_expressions"], ["x = 3"])
+
+    def test_parse_batch_internal_server_error(self):
+        response = self.post({"graphs": ["x = 2"]})
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(response.json()["message"], "fail")
+        self.assertTrue("Internal server error" in response.data["detail"])
+
+
+@override_settings(PARSE_JOBS=settings.PARSE_JOBS | {"workers": 0, "max_wait": 1})
+class EquationParserJobAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = "/api/viewset/equations/parser/jobs/"
+        get_parse_cache().clear()
+        get_prefix_store().clear()
+
+    def submit(self, payload):
+        return self.client.post(
+            self.url, json.dumps(payload), content_type="application/json"
+        )
+
+    def test_submit_and_poll_job(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.submit({"expressions": ["x = 2", "x ^ x"]})
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.json()["message"], "success")
+        self.assertEqual(response.data["status"], "pending")
+        response = self.client.get(f"{self.url}{response.data['id']}/", {"wait": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "succeeded")
+        self.assertEqual(response.data["status_code"], status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["result"]["parsed_expressions"],
+            parse_expressions(["x = 2", "x ^ x"]),
+        )
+
+    def test_submit_duplicate_job(self):
+        first = self.submit({"expressions": ["x = 2"]})
+        second = self.submit({"expressions": ["x = 2"]})
+        self.assertEqual(first.data["id"], second.data["id"])
+
+    def test_submit_invalid_job(self):
+        response = self.submit({"expressions": "x = 2"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["message"], "fail")
+
+    def test_poll_job_with_invalid_wait(self):
+        job = self.submit({"expressions": ["x = 2"]})
+        for wait in ["nan", "inf", "-inf", "soon"]:
+            with self.subTest(wait=wait):
+                response = self.client.get(
+                    f"{self.url}{job.data['id']}/", {"wait": wait}
+                )
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(response.json()["message"], "fail")
+
+    def test_poll_nonexistent_job(self):
+        response = self.client.get(f"{self.url}999/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json()["message"], "fail")
+
+    def test_job_stats(self):
+        self.submit({"expressions": ["x = 2"]})
+        response = self.client.get(f"{self.url}stats/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["pending"], 1)
+        self.assertEqual(response.data["running"], 0)
@@ -0,0 +1,107 @@
+import json
+
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from dm_backend.tests.baker_recipes.equation_baker_recipe import equation_recipe
+from dm_backend.tests.baker_recipes.graph_baker_recipe import graph_recipe
+
+
+class EquationSamplerAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = "/api/viewset/equations/sampler/sample/"
+        self.viewport = {"x_min": -1, "x_max": 1, "resolution": 3}
+
+    def post(self, payload):
+        return self.client.post(
+            self.url, json.dumps(payload), content_type="application/json"
+        )
+
+    def test_sample_parsed_equation(self):
+        response = self.post(self.viewport | {"parsed_equation": "y = x^2"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["message"], "success")
+        self.assertEqual(response.data["line_style"], "polyline")
+        self.assertEqual(response.data["x"], [-1.0, 0.0, 1.0])
+        self.assertEqual(response.data["y"], [1.0, 0.0, 1.0])
+
+    def test_sample_parsed_equation_adaptively(self):
+        payload = self.viewport | {
+            "parsed_equation": "y = x^2",
+            "adaptive": True,
+            "tolerance": 0.01,
+            "resolution": 100,
+        }
+        response = self.post(payload)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(len(response.data["x"]), 100)
+        self.assertEqual(response.data["x"][0], -1.0)
+        self.assertEqual(response.data["x"][-1], 1.0)
+
+    def test_sample_graph(self):
+        graph = graph_recipe.make()
+        solid = equation_recipe.make(graph=graph, parsed_equation="y = x")
+        dotted = equation_recipe.make(
+            graph=graph, parsed_equation="y_func(x) = 1/x", line_style="scatter"
+        )
+        invalid = equation_recipe.make(graph=graph, parsed_equation="x = 2")
+        response = self.post(self.viewport | {"graph": graph.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        equations = response.data["equations"]
+        self.assertEqual(
+            [equation["id"] for equation in equations],
+            [solid.id, dotted.id, invalid.id],
+        )
+        self.assertEqual(equations[0]["y"], [-1.0, 0.0, 1.0])
+        self.assertEqual(equations[1]["x"], [-1.0, 1.0])
+        self.assertTrue("Sampling error" in equations[2]["detail"])
+
+    def test_sample_invalid_equation(self):
+        response = self.post(self.viewport | {"parsed_equation": "y = a*x"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["message"], "fail")
+        self.assertTrue("Sampling error" in response.data["detail"])
+
+    def test_sample_oversized_power(self):
+        response = self.post(self.viewport | {"parsed_equation": "y = 9^9^9^2"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue("too large" in response.data["detail"])
+
+    def test_sample_invalid_request(self):
+        test_cases = [
+            self.viewport,
+            self.viewport | {"parsed_equation": "y = x", "graph": 1},
+            self.viewport | {"parsed_equation": "y = x", "x_min": 2},
+            self.viewport | {"parsed_equation": "y = x", "resolution": 1},
+        ]
+        for i, payload in enumerate(test_cases):
+            with self.subTest(test_number=i, input=payload):
+                response = self.post(payload)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(response.json()["message"], "fail")
+
+    def test_sample_non_finite_viewport(self):
+        test_cases = [
+            {"x_min": "nan"},
+            {"x_max": "inf"},
+            {"y_min": "-inf", "y_max": 1},
+            {"y_min": -1, "y_max": "nan"},
+            {"adaptive": True, "tolerance": "nan"},
+            {"adaptive": True, "tolerance": "inf"},
+        ]
+        for i, fields in enumerate(test_cases):
+            with self.subTest(test_number=i, input=fields):
+                response = self.post(
+                    self.viewport | {"parsed_equation": "y = x"} | fields
+                )
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(response.json()["message"], "fail")
+
+    def test_sample_long_parsed_equation(self):
+        parsed_equation = "y = " + " + ".join(["x"] * 100)
+        self.assertGreater(len(parsed_equation), 100)
+        response = self.post(self.viewport | {"parsed_equation": parsed_equation})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["y"], [-100.0, 0.0, 100.0])
@@ -1,8 +1,13 @@
+from base64 import b64decode, b64encode
+from urllib.parse import parse_qs, urlencode, urlparse
+
 from django.test import TestCase
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from dm_backend.src.models.equation import Equation
 from dm_backend.src.models.graph import Graph
+from dm_backend.tests.baker_recipes.equation_baker_recipe import equation_recipe
 from dm_backend.tests.baker_recipes.graph_baker_recipe import graph_recipe
 
 
@@ -30,6 +35,63 @@ class GraphAPIViewSetTest(TestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]["id"], graph.id)
 
+    def test_get_graphs_of_owner(self):
+        graph_recipe.make(owner="other_owner")
+        graphs = [
+            graph_recipe.make(**(self.valid_payload | {"name": name}))
+            for name in ["b", "a"]
+        ]
+        response = self.client.get(self.url, {"owner": self.valid_payload["owner"]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [graph["id"] for graph in response.data],
+            [graphs[1].id, graphs[0].id],
+        )
+
+    def test_get_graphs_by_page(self):
+        graphs = [
+            graph_recipe.make(**(self.valid_payload | {"name": name}))
+            for name in ["c", "a", "b"]
+        ]
+        graphs.append(graph_recipe.make(name="a", owner="other_owner"))
+        expected = [graphs[1].id, graphs[3].id, graphs[2].id, graphs[0].id]
+        response = self.client.get(self.url, {"page_size": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([graph["id"] for graph in response.data], expected[:3])
+        self.assertIsNone(response.json()["previous"])
+        with self.assertNumQueries(2):
+            response = self.client.get(response.json()["next"])
+        self.assertEqual([graph["id"] for graph in response.data], expected[3:])
+        self.assertIsNone(response.json()["next"])
+        response = self.client.get(response.json()["previous"])
+        self.assertEqual([graph["id"] for graph in response.data], expected[:3])
+
+    def test_get_graphs_of_the_same_name_by_page(self):
+        graphs = [graph_recipe.make(name="a", owner=str(i)) for i in range(5)]
+        graphs.append(graph_recipe.make(name="b", owner="0"))
+        expected = [graph.id for graph in graphs]
+        response = self.client.get(self.url, {"page_size": 2})
+        pages = [[graph["id"] for graph in response.data]]
+        while response.json()["next"]:
+            cursor = parse_qs(urlparse(response.json()["next"]).query)["cursor"][0]
+            self.assertNotIn("o", parse_qs(b64decode(cursor).decode()))
+            with self.assertNumQueries(2):
+                response = self.client.get(response.json()["next"])
+            pages.append([graph["id"] for graph in response.data])
+        self.assertEqual(pages, [expected[:2], expected[2:4], expected[4:]])
+        response = self.client.get(response.json()["previous"])
+        self.assertEqual([graph["id"] for graph in response.data], expected[2:4])
+        response = self.client.get(response.json()["previous"])
+        self.assertEqual([graph["id"] for graph in response.data], expected[:2])
+        self.assertIsNone(response.json()["previous"])
+
+    def test_get_graphs_with_invalid_cursor(self):
+        for position in ["a", '["a"]', '["a","b"]']:
+            with self.subTest(position=position):
+                cursor = b64encode(urlencode({"p": position}).encode()).decode()
+                response = self.client.get(self.url, {"cursor": cursor})
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_get_graph(self):
         graph = graph_recipe.make(**self.valid_payload)
         response = self.client.get(self.url_id(graph.id))
@@ -37,6 +99,75 @@ class GraphAPIViewSetTest(TestCase):
         self.assertEqual(response.json()["message"], "success")
         self.assertEqual(response.data["name"], graph.name)
 
+    def test_get_nested_graph(self):
+        graph = graph_recipe.make(**self.valid_payload)
+        equations = equation_recipe.make(graph=graph, _quantity=5)
+        equation_recipe.make(graph=graph_recipe.make())
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url_id(graph.id), {"nested": "true"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["name"], graph.name)
+        self.assertEqual(
+            [equation["id"] for equation in response.data["equations"]],
+            [equation.id for equation in equations],
+        )
+        self.assertEqual(response.data["equations"][0]["graph"], graph.id)
+
+    def test_get_all_nested_graphs(self):
+        for graph in graph_recipe.make(_quantity=3):
+            equation_recipe.make(graph=graph, _quantity=2)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {"nested": "true"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        for graph in response.data:
+            self.assertEqual(len(graph["equations"]), 2)
+
+    def test_get_graph_not_nested_by_default(self):
+        graph = graph_recipe.make(**self.valid_payload)
+        response = self.client.get(self.url_id(graph.id))
+        self.assertNotIn("equations", response.data)
+
+    def test_get_graph_conditionally(self):
+        graph = graph_recipe.make(**self.valid_payload)
+        response = self.client.get(self.url_id(graph.id))
+        etag = response.headers["ETag"]
+        self.assertIn("Last-Modified", response.headers)
+        self.assertIn("no-cache", response.headers["Cache-Control"])
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url_id(graph.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+        response = self.client.get(
+            self.url_id(graph.id), HTTP_ACCEPT="application/msgpack"
+        )
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_graph_etag_changes_with_its_equations(self):
+        graph = graph_recipe.make(**self.valid_payload)
+        list_etag = self.client.get(self.url).headers["ETag"]
+        etag = self.client.get(self.url_id(graph.id)).headers["ETag"]
+        self.client.post(
+            "/api/viewset/equations/",
+            {"equation": "y = x", "color": 0, "line_width": 1, "graph": graph.id},
+        )
+        response = self.client.get(self.url_id(graph.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_graph_list_is_validated_by_etag_only(self):
+        graphs = graph_recipe.make(_quantity=2)
+        response = self.client.get(self.url)
+        self.assertNotIn("Last-Modified", response.headers)
+        list_etag = response.headers["ETag"]
+        Graph.objects.filter(id=graphs[0].id).delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
     def test_get_nonexistent_graph(self):
         response = self.client.get(self.url_id(999))
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -95,3 +226,109 @@ class GraphAPIViewSetTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(response.json()["message"], "fail")
         self.assertEqual(response.data["detail"], "Not found.")
+
+
+class GraphBulkEquationsAPITest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.graph = graph_recipe.make(name="test_graph")
+        self.url = f"/api/viewset/graphs/{self.graph.id}/equations/"
+        self.equation = {
+            "equation": "y = 2x",
+            "parsed_equation": "y = 2*x",
+            "color": 1,
+            "line_style": "polyline",
+            "line_width": 1,
+        }
+
+    def test_bulk_equations(self):
+        updated, deleted = equation_recipe.make(graph=self.graph, _quantity=2)
+        payload = {
+            "equations": [self.equation | {"id": updated.id}]
+            + [self.equation | {"color": color} for color in range(40)],
+            "deleted": [deleted.id],
+        }
+        with self.assertNumQueries(14):
+            response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["message"], "success")
+        self.assertEqual(len(response.data), 41)
+        self.assertEqual(response.data[0]["id"], updated.id)
+        self.assertEqual(response.data[0]["parsed_equation"], "y = 2*x")
+        self.assertEqual(self.graph.equation_set.count(), 41)
+        self.assertFalse(Equation.objects.filter(id=deleted.id).exists())
+
+    def test_bulk_equations_invalid(self):
+        equation = equation_recipe.make(graph=self.graph)
+        payload = {
+            "equations": [self.equation, self.equation | {"line_style": "wavy"}],
+            "deleted": [equation.id],
+        }
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["message"], "fail")
+        self.assertEqual(self.graph.equation_set.count(), 1)
+
+    def test_bulk_equations_nonexistent_graph(self):
+        response = self.client.post(
+            "/api/viewset/graphs/999/equations/", {}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class GraphSaveAPITest(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.graph = graph_recipe.make(name="test_graph")
+        self.url = f"/api/viewset/graphs/{self.graph.id}/save/"
+        self.equation = {
+            "equation": "y = 2x",
+            "parsed_equation": "y = 2*x",
+            "color": 1,
+            "line_style": "polyline",
+            "line_width": 1,
+        }
+
+    def test_save_delta(self):
+        changed, removed, unchanged = equation_recipe.make(
+            graph=self.graph, _quantity=3
+        )
+        payload = {
+            "version": 0,
+            "added": [self.equation],
+            "changed": [{"id": changed.id, "equation": "y = 3x"}],
+            "removed": [removed.id],
+        }
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["message"], "success")
+        self.assertEqual(response.data["version"], 1)
+        added = Equation.objects.get(id=response.data["added"][0]["id"])
+        self.assertEqual(added.graph, self.graph)
+        changed.refresh_from_db()
+        self.assertEqual(changed.parsed_equation, "y = 3*x")
+        self.assertEqual(
+            set(self.graph.equation_set.values_list("id", flat=True)),
+            {changed.id, unchanged.id, added.id},
+        )
+        response = self.client.get(f"/api/viewset/graphs/{self.graph.id}/")
+        self.assertEqual(response.data["version"], 1)
+
+    def test_save_stale_version(self):
+        self.client.post(
+            self.url, {"version": 0, "added": [self.equation]}, format="json"
+        )
+        response = self.client.post(
+            self.url, {"version": 0, "added": [self.equation]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.json()["message"], "fail")
+        self.assertIn("current version is 1", response.data["detail"])
+        self.assertEqual(self.graph.equation_set.count(), 1)
+
+    def test_save_invalid_delta(self):
+        response = self.client.post(
+            self.url, {"version": 0, "removed": [999]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["message"], "fail")
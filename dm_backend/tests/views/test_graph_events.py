@@ -0,0 +1,197 @@
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from dm_backend.src.services.graph_events import (
+    EQUATION_CREATED,
+    EQUATION_DELETED,
+    EQUATION_UPDATED,
+    GRAPH_DELETED,
+    get_graph_event_broker,
+    reset_graph_event_broker,
+)
+from dm_backend.src.services.session_prefix_store import SessionPrefixStore
+from dm_backend.src.views.graph_events import GraphEventsASGIApplication
+from dm_backend.tests.baker_recipes.equation_baker_recipe import equation_recipe
+from dm_backend.tests.baker_recipes.graph_baker_recipe import graph_recipe
+from dm_backend.tests.services.test_graph_events import received_events
+
+
+class ASGIClient:
+    def __init__(self, application):
+        self.application = application
+        self.disconnect = asyncio.Event()
+        self.messages = []
+
+    async def request(self, path, method="GET", headers=(), query_string=b""):
+        scope = {
+            "type": "http",
+            "path": path,
+            "method": method,
+            "headers": list(headers),
+            "query_string": query_string,
+        }
+        await self.application(scope, self.receive, self.send)
+
+    async def receive(self):
+        await self.disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        self.messages.append(message)
+
+    @property
+    def status(self):
+        return self.messages[0]["status"]
+
+    @property
+    def body(self):
+        return b"".join(message.get("body", b"") for message in self.messages[1:])
+
+
+@override_settings(GRAPH_EVENTS=settings.GRAPH_EVENTS | {"KEEPALIVE": 0.05})
+class GraphEventsASGIApplicationTest(TestCase):
+    def setUp(self):
+        reset_graph_event_broker("GRAPH_EVENTS")
+        self.graph = graph_recipe.make()
+        self.url = f"/api/viewset/graphs/{self.graph.id}/events/"
+
+        async def django_application(scope, receive, send):
+            await send({"type": "http.response.start", "status": 204, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        self.application = GraphEventsASGIApplication(django_application)
+
+    async def stream(self, client, *publish, **kwargs):
+        request = asyncio.ensure_future(client.request(self.url, **kwargs))
+        await asyncio.sleep(0.01)
+        for event in publish:
+            get_graph_event_broker().publish(self.graph.id, *event)
+        await asyncio.sleep(0.1)
+        client.disconnect.set()
+        await asyncio.wait_for(request, 1)
+
+    def test_passes_other_requests_on(self):
+        client = ASGIClient(self.application)
+        async_to_sync(client.request)("/api/viewset/graphs/")
+        self.assertEqual(client.status, 204)
+
+    def test_missing_graph(self):
+        client = ASGIClient(self.application)
+        async_to_sync(client.request)("/api/viewset/graphs/999/events/")
+        self.assertEqual(client.status, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(json.loads(client.body)["data"]["detail"], "Not found.")
+
+    def test_method_not_allowed(self):
+        client = ASGIClient(self.application)
+        async_to_sync(client.request)(self.url, method="POST")
+        self.assertEqual(client.status, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_streams_events_until_disconnect(self):
+        client = ASGIClient(self.application)
+        async_to_sync(self.stream)(
+            client, (EQUATION_UPDATED, {"id": 1}), (EQUATION_DELETED, {"id": 2})
+        )
+        self.assertEqual(client.status, status.HTTP_200_OK)
+        self.assertIn(
+            (b"content-type", b"text/event-stream"), client.messages[0]["headers"]
+        )
+        body = client.body.decode()
+        self.assertIn('id: 1\nevent: equation.updated\ndata: {"id":1}\n\n', body)
+        self.assertIn('id: 2\nevent: equation.deleted\ndata: {"id":2}\n\n', body)
+        self.assertIn(": keepalive\n\n", body)
+        self.assertEqual(get_graph_event_broker().subscribers(self.graph.id), 0)
+
+    def test_stream_ends_when_graph_is_deleted(self):
+        client = ASGIClient(self.application)
+        async_to_sync(self.stream)(client, (GRAPH_DELETED, {"id": self.graph.id}))
+        self.assertIn("event: graph.deleted", client.body.decode())
+        self.assertEqual(
+            client.messages[-1], {"type": "http.response.body", "body": b""}
+        )
+
+    def test_replays_events_after_last_event_id(self):
+        broker = get_graph_event_broker()
+        for i in range(3):
+            broker.publish(self.graph.id, EQUATION_UPDATED, {"id": i})
+        client = ASGIClient(self.application)
+        async_to_sync(self.stream)(client, headers=[(b"last-event-id", b"2")])
+        body = client.body.decode()
+        self.assertNotIn("id: 2\n", body)
+        self.assertIn("id: 3\n", body)
+
+
+class GraphEventsPublishingTest(TestCase):
+    def setUp(self):
+        reset_graph_event_broker("GRAPH_EVENTS")
+        self.client = APIClient()
+        self.graph = graph_recipe.make()
+        self.equation = equation_recipe.make(
+            graph=self.graph,
+            equation="x = 1",
+            parsed_equation="x = 1",
+            source_hash=SessionPrefixStore.prefix_keys(["x = 1"])[0],
+        )
+
+    def events(self, graph_id=None):
+        return async_to_sync(received_events)(
+            get_graph_event_broker(), graph_id or self.graph.id
+        )
+
+    def test_equation_views_publish_changes(self):
+        payload = {
+            "equation": "y = x",
+            "parsed_equation": "y = x",
+            "color": 0,
+            "line_style": "polyline",
+            "line_width": 1,
+            "graph": self.graph.id,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/viewset/equations/", payload)
+        created_id = response.data["id"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/viewset/equations/{self.equation.id}/")
+        events = self.events()
+        self.assertEqual(
+            [(event.type, event.data["id"]) for event in events],
+            [
+                (EQUATION_CREATED, created_id),
+                (EQUATION_DELETED, self.equation.id),
+                (EQUATION_UPDATED, created_id),
+            ],
+        )
+        self.assertEqual(events[0].data["parsed_equation"], "y = 1")
+        self.assertEqual(events[2].data["parsed_equation"], "y = x")
+
+    def test_save_publishes_delta(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f"/api/viewset/graphs/{self.graph.id}/save/",
+                {
+                    "version": self.graph.version,
+                    "added": [{"equation": "y = 2x", "color": 0, "line_width": 1}],
+                    "changed": [{"id": self.equation.id, "equation": "x = 2"}],
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        events = self.events()
+        self.assertEqual(
+            [(event.type, event.data["id"]) for event in events],
+            [
+                (EQUATION_UPDATED, self.equation.id),
+                (EQUATION_CREATED, response.data["added"][0]["id"]),
+            ],
+        )
+        self.assertEqual(events[0].data["parsed_equation"], "x = 2")
+
+    def test_graph_deletion_is_published(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/viewset/graphs/{self.graph.id}/")
+        self.assertEqual([event.type for event in self.events()], [GRAPH_DELETED])
@@ -19,16 +19,22 @@ from rest_framework import routers
 
 from .src.views.equation import EquationAPIViewSet
 from .src.views.equation_parser import EquationParserAPIViewSet
+from .src.views.equation_sampler import EquationSamplerAPIViewSet
 from .src.views.graph import GraphAPIViewSet
+from .src.views.metrics import metrics
 
 router = routers.DefaultRouter()
 router.register(r"api/viewset/equations", EquationAPIViewSet)
 router.register(
     r"api/viewset/equations/parser", EquationParserAPIViewSet, basename="parser"
 )
+router.register(
+    r"api/viewset/equations/sampler", EquationSamplerAPIViewSet, basename="sampler"
+)
 router.register(r"api/viewset/graphs", GraphAPIViewSet)
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics, name="metrics"),
     path("", include(router.urls)),
 ]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "dm_backend.settings")
 
 application = get_wsgi_application()
+
+# Pre-warm the sampler and the parser before serving the first request, in the master process with --preload
+from dm_backend.src.services.startup import warm_up_server  # noqa: E402
+
+warm_up_server()
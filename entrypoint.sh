@@ -3,4 +3,10 @@ set -e
 
 poetry run python manage.py migrate
 
+# The metrics snapshots of the previous server processes are not the ones of this server
+if [ -n "$METRICS_DIRECTORY" ]; then
+    rm -rf "$METRICS_DIRECTORY"
+    mkdir -p "$METRICS_DIRECTORY"
+fi
+
 exec "$@"
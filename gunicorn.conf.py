@@ -0,0 +1,23 @@
+"""
+Gunicorn configuration of dm_backend, loaded from the working directory of the server.
+
+The command line of the Docker image sets the workers and the binding, this file only hooks into the life of the
+workers.
+"""
+
+from typing import Any
+
+
+def post_worker_init(worker: Any) -> None:
+    """
+    Start the sweeper of the parse job queue in a worker, once the application is loaded.
+
+    The sweeper is started after the worker is forked from the master, which loads the application with --preload,
+    since the threads of the master are not forked along with it.
+
+    Args:
+        worker (Any): The gunicorn worker.
+    """
+    from dm_backend.src.services.parse_job_queue import get_parse_job_queue
+
+    get_parse_job_queue().start()